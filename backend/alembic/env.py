@@ -17,7 +17,12 @@ from app.core.config import settings
 from app.users.models import User, Parent, Student, SessionEnrollment
 from app.skills.models import Skill
 from app.sessions.models import Session
-from app.videos.models import Video
+from app.videos.models import Video, VideoMetadata, VideoProgress, VideoViewCounter
+from app.idempotency.models import IdempotencyRecord
+from app.jobs.models import OutboxJob
+from app.reminders.models import SessionReminder
+from app.tags.models import Tag, StudentTag, SkillTag
+from app.reports.models import ReportWeek, ReportSkillWeek, ReportSessionWeek, ReportDirtyWeek, ReportWatermark
 
 # this is the Alembic Config object
 config = context.config
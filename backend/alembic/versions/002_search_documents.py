@@ -0,0 +1,60 @@
+"""Add full-text search documents
+
+Revision ID: 002_search
+Revises: 001_initial
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002_search'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite uses an FTS5 table created at application startup instead
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.create_table(
+        'search_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False, server_default=''),
+        sa.Column('document', postgresql.TSVECTOR(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kind', 'ref_id', name='uq_search_documents_kind_ref_id')
+    )
+    op.create_index(
+        'ix_search_documents_document', 'search_documents', ['document'],
+        unique=False, postgresql_using='gin'
+    )
+
+    # Backfill existing rows (cancelled sessions are not searchable)
+    for kind, table, title_column, where in (
+        ('skill', 'skills', 'name', ''),
+        ('session', 'sessions', 'title', "WHERE status IS DISTINCT FROM 'cancelled'"),
+        ('video', 'videos', 'title', ''),
+    ):
+        op.execute(f"""
+            INSERT INTO search_documents (kind, ref_id, title, body, document)
+            SELECT '{kind}', id, {title_column}, coalesce(description, ''),
+                   setweight(to_tsvector('english', {title_column}), 'A') ||
+                   setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            FROM {table} {where}
+        """)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_search_documents_document', table_name='search_documents')
+    op.drop_table('search_documents')
@@ -0,0 +1,24 @@
+"""Add session schedule indexes
+
+Revision ID: 003_session_schedule
+Revises: 002_search
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003_session_schedule'
+down_revision = '002_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sessions_status_schedule', 'sessions', ['status', 'schedule'], unique=False)
+    op.create_index('ix_sessions_skill_id_schedule', 'sessions', ['skill_id', 'schedule'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_skill_id_schedule', table_name='sessions')
+    op.drop_index('ix_sessions_status_schedule', table_name='sessions')
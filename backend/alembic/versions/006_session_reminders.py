@@ -0,0 +1,45 @@
+"""Add session reminders and user contact email
+
+Revision ID: 006_session_reminders
+Revises: 005_outbox_jobs
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_session_reminders'
+down_revision = '005_outbox_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('email', sa.String(), nullable=True))
+    op.create_table(
+        'session_reminders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('recipient', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('claimed_by', sa.String(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'kind', 'recipient', name='uq_session_reminders_session_kind_recipient')
+    )
+    op.create_index(op.f('ix_session_reminders_id'), 'session_reminders', ['id'], unique=False)
+    op.create_index('ix_session_reminders_status', 'session_reminders', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_reminders_status', table_name='session_reminders')
+    op.drop_index(op.f('ix_session_reminders_id'), table_name='session_reminders')
+    op.drop_table('session_reminders')
+    op.drop_column('users', 'email')
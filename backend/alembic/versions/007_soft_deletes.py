@@ -0,0 +1,34 @@
+"""Add soft-delete columns and live-row partial indexes
+
+Revision ID: 007_soft_deletes
+Revises: 006_session_reminders
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_soft_deletes'
+down_revision = '006_session_reminders'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('skills', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('sessions', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.drop_index('ix_sessions_status_schedule', table_name='sessions')
+    op.create_index(
+        'ix_sessions_status_schedule', 'sessions', ['status', 'schedule'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index('ix_videos_skill_id', 'videos', ['skill_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_videos_skill_id', table_name='videos')
+    op.drop_index('ix_sessions_status_schedule', table_name='sessions')
+    op.create_index('ix_sessions_status_schedule', 'sessions', ['status', 'schedule'], unique=False)
+    op.drop_column('sessions', 'deleted_at')
+    op.drop_column('skills', 'deleted_at')
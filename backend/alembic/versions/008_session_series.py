@@ -0,0 +1,53 @@
+"""Add recurring session series
+
+Revision ID: 008_session_series
+Revises: 007_soft_deletes
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_session_series'
+down_revision = '007_soft_deletes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'session_series',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.Column('volunteer_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('meeting_link', sa.String(), nullable=True),
+        sa.Column('dtstart', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('rrule', sa.String(), nullable=False),
+        sa.Column('timezone', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('materialized_until', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+        sa.ForeignKeyConstraint(['volunteer_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_session_series_id'), 'session_series', ['id'], unique=False)
+    op.create_index(op.f('ix_session_series_skill_id'), 'session_series', ['skill_id'], unique=False)
+    op.create_index(op.f('ix_session_series_volunteer_id'), 'session_series', ['volunteer_id'], unique=False)
+    op.add_column('sessions', sa.Column('series_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_sessions_series_id', 'sessions', 'session_series', ['series_id'], ['id'])
+    op.create_index('ix_sessions_series_id_schedule', 'sessions', ['series_id', 'schedule'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_series_id_schedule', table_name='sessions')
+    op.drop_constraint('fk_sessions_series_id', 'sessions', type_='foreignkey')
+    op.drop_column('sessions', 'series_id')
+    op.drop_index(op.f('ix_session_series_volunteer_id'), table_name='session_series')
+    op.drop_index(op.f('ix_session_series_skill_id'), table_name='session_series')
+    op.drop_index(op.f('ix_session_series_id'), table_name='session_series')
+    op.drop_table('session_series')
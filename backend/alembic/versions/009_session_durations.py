@@ -0,0 +1,52 @@
+"""Add session durations and overlap-probe indexes
+
+Revision ID: 009_session_durations
+Revises: 008_session_series
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_session_durations'
+down_revision = '008_session_series'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing sessions were shown as one hour long everywhere
+    op.add_column('sessions', sa.Column('duration_minutes', sa.Integer(), server_default='60', nullable=False))
+    op.add_column('sessions', sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE sessions SET ends_at = schedule + make_interval(mins => duration_minutes)")
+    op.alter_column('sessions', 'ends_at', nullable=False)
+    op.add_column('session_series', sa.Column('duration_minutes', sa.Integer(), server_default='60', nullable=False))
+
+    op.add_column('session_enrollments', sa.Column('starts_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('session_enrollments', sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        "UPDATE session_enrollments SET starts_at = sessions.schedule, ends_at = sessions.ends_at "
+        "FROM sessions WHERE sessions.id = session_enrollments.session_id"
+    )
+    op.alter_column('session_enrollments', 'starts_at', nullable=False)
+    op.alter_column('session_enrollments', 'ends_at', nullable=False)
+
+    op.create_index(
+        'ix_sessions_volunteer_schedule', 'sessions', ['volunteer_id', 'schedule', 'ends_at'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_session_enrollments_student_starts', 'session_enrollments',
+        ['student_id', 'starts_at', 'ends_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_enrollments_student_starts', table_name='session_enrollments')
+    op.drop_index('ix_sessions_volunteer_schedule', table_name='sessions')
+    op.drop_column('session_enrollments', 'ends_at')
+    op.drop_column('session_enrollments', 'starts_at')
+    op.drop_column('session_series', 'duration_minutes')
+    op.drop_column('sessions', 'ends_at')
+    op.drop_column('sessions', 'duration_minutes')
@@ -0,0 +1,26 @@
+"""Add suitable age ranges to skills
+
+Revision ID: 010_skill_age_ranges
+Revises: 009_session_durations
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_skill_age_ranges'
+down_revision = '009_session_durations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Null means no bound, so existing skills stay open to every age
+    op.add_column('skills', sa.Column('min_age', sa.Integer(), nullable=True))
+    op.add_column('skills', sa.Column('max_age', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('skills', 'max_age')
+    op.drop_column('skills', 'min_age')
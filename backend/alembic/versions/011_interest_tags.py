@@ -0,0 +1,134 @@
+"""Add interest tags for students and skills, backfilled from free text
+
+Revision ID: 011_interest_tags
+Revises: 010_skill_age_ranges
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+import json
+import re
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+
+# revision identifiers, used by Alembic.
+revision = '011_interest_tags'
+down_revision = '010_skill_age_ranges'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Frozen copies of app.tags.services.parse_interests and name_tags, so
+# later changes there do not alter what this migration does
+_SEPARATORS = re.compile(r"[,;\n]+")
+_SPACES = re.compile(r"\s+")
+_WORD_BREAKS = re.compile(r"[\s,;/&:()\[\]-]+")
+_FILLER_WORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+
+def _normalize(values):
+    names = {}
+    for value in values:
+        name = _SPACES.sub(" ", str(value)).strip(" \t#.-_'\"").lower()
+        if name and len(name) <= 50:
+            names.setdefault(name)
+    return list(names)[:20]
+
+
+def _parse_interests(text):
+    if not text or not text.strip():
+        return []
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = None
+    if isinstance(value, list):
+        return _normalize(value)
+    if isinstance(value, str):
+        text = value
+    return _normalize(_SEPARATORS.split(text))
+
+
+def _name_tags(name):
+    return _normalize([name, *(w for w in _WORD_BREAKS.split(name) if w.lower() not in _FILLER_WORDS)])
+
+
+tags = sa.table('tags', sa.column('id', sa.Integer), sa.column('name', sa.String))
+
+
+def _backfill(bind, source_sql, link_table, owner_column, parse):
+    """Keyset-paginate the owners and tag each batch with a few set-based statements."""
+    links = sa.table(link_table, sa.column(owner_column, sa.Integer), sa.column('tag_id', sa.Integer))
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(source_sql), {'after': last_id, 'limit': BATCH_SIZE}).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        parsed = [(owner_id, parse(text)) for owner_id, text in rows]
+        names = sorted({name for _, owner_names in parsed for name in owner_names})
+        if not names:
+            continue
+        bind.execute(insert(tags).on_conflict_do_nothing(index_elements=['name']), [{'name': n} for n in names])
+        ids = dict(bind.execute(sa.select(tags.c.name, tags.c.id).where(tags.c.name.in_(names))).all())
+        bind.execute(
+            insert(links).on_conflict_do_nothing(),
+            [{owner_column: owner_id, 'tag_id': ids[name]} for owner_id, owner_names in parsed for name in owner_names]
+        )
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_tags_id'), 'tags', ['id'], unique=False)
+    op.create_table(
+        'student_tags',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id', 'tag_id')
+    )
+    op.create_index('ix_student_tags_tag_student', 'student_tags', ['tag_id', 'student_id'], unique=False)
+    op.create_table(
+        'skill_tags',
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('skill_id', 'tag_id')
+    )
+    op.create_index('ix_skill_tags_tag_skill', 'skill_tags', ['tag_id', 'skill_id'], unique=False)
+
+    if context.is_offline_mode():
+        # Parsing the free text needs a live connection
+        op.execute("-- Run this migration online to backfill student_tags and skill_tags")
+        return
+    bind = op.get_bind()
+    _backfill(
+        bind,
+        "SELECT id, interests FROM students WHERE id > :after AND interests IS NOT NULL ORDER BY id LIMIT :limit",
+        'student_tags', 'student_id', _parse_interests
+    )
+    # A skill teaches its name and each word of it, as new skills do by default
+    _backfill(
+        bind,
+        "SELECT id, name FROM skills WHERE id > :after AND deleted_at IS NULL ORDER BY id LIMIT :limit",
+        'skill_tags', 'skill_id', _name_tags
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_skill_tags_tag_skill', table_name='skill_tags')
+    op.drop_table('skill_tags')
+    op.drop_index('ix_student_tags_tag_student', table_name='student_tags')
+    op.drop_table('student_tags')
+    op.drop_index(op.f('ix_tags_id'), table_name='tags')
+    op.drop_table('tags')
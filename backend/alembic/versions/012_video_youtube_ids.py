@@ -0,0 +1,106 @@
+"""Add canonical YouTube video IDs with a per-skill unique index
+
+Revision ID: 012_video_youtube_ids
+Revises: 011_interest_tags
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+import re
+from urllib.parse import parse_qs, urlsplit
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_video_youtube_ids'
+down_revision = '011_interest_tags'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Frozen copy of app.videos.youtube.parse_video_id
+_VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+_HOSTS = re.compile(r"(?:www\.|m\.|music\.)?(youtube\.com|youtube-nocookie\.com|youtu\.be)")
+_PATH = re.compile(r"/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})(?:[/?#]|$)")
+_SHORT_PATH = re.compile(r"/([A-Za-z0-9_-]{11})(?:[/?#]|$)")
+
+
+def _parse_video_id(url):
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    host = _HOSTS.fullmatch((parts.hostname or "").lower())
+    if not host:
+        return None
+    if host.group(1) == "youtu.be":
+        match = _SHORT_PATH.match(parts.path)
+        return match.group(1) if match else None
+    if parts.path.rstrip("/") == "/watch":
+        values = parse_qs(parts.query).get("v", [])
+        return values[0] if values and _VIDEO_ID.fullmatch(values[0]) else None
+    match = _PATH.match(parts.path)
+    return match.group(1) if match else None
+
+
+videos = sa.table(
+    'videos',
+    sa.column('id', sa.Integer),
+    sa.column('youtube_url', sa.String),
+    sa.column('youtube_id', sa.String)
+)
+
+
+def _backfill(bind):
+    """Parse every URL once, in keyset-paginated batches, storing the ID and canonical URL."""
+    statement = (
+        sa.update(videos)
+        .where(videos.c.id == sa.bindparam('row_id'))
+        .values(youtube_id=sa.bindparam('video_id'), youtube_url=sa.bindparam('url'))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(videos.c.id, videos.c.youtube_url)
+            .where(videos.c.id > last_id)
+            .order_by(videos.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        parsed = [(row.id, _parse_video_id(row.youtube_url)) for row in rows]
+        updates = [
+            {'row_id': row_id, 'video_id': video_id, 'url': f"https://www.youtube.com/watch?v={video_id}"}
+            for row_id, video_id in parsed if video_id
+        ]
+        if updates:
+            bind.execute(statement, updates)
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('youtube_id', sa.String(length=11), nullable=True))
+    op.create_index('ix_videos_youtube_id', 'videos', ['youtube_id'], unique=False)
+    if context.is_offline_mode():
+        # Parsing the URLs needs a live connection
+        op.execute("-- Run this migration online to backfill videos.youtube_id")
+    else:
+        _backfill(op.get_bind())
+    # Existing duplicates keep their rows; only the oldest entry per skill keeps the ID
+    op.execute(
+        "UPDATE videos SET youtube_id = NULL WHERE youtube_id IS NOT NULL AND EXISTS ("
+        "SELECT 1 FROM videos AS older WHERE older.skill_id = videos.skill_id "
+        "AND older.youtube_id = videos.youtube_id AND older.id < videos.id)"
+    )
+    op.create_index(
+        'uq_videos_skill_youtube_id', 'videos', ['skill_id', 'youtube_id'], unique=True,
+        postgresql_where=sa.text('youtube_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_videos_skill_youtube_id', table_name='videos')
+    op.drop_index('ix_videos_youtube_id', table_name='videos')
+    op.drop_column('videos', 'youtube_id')
@@ -0,0 +1,39 @@
+"""Add the video metadata cache
+
+Revision ID: 013_video_metadata
+Revises: 012_video_youtube_ids
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_video_metadata'
+down_revision = '012_video_youtube_ids'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing videos are filled in by: python -m app.videos.enrichment
+    op.create_table(
+        'video_metadata',
+        sa.Column('youtube_id', sa.String(length=11), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('author_name', sa.String(), nullable=True),
+        sa.Column('thumbnail_url', sa.String(), nullable=True),
+        sa.Column('duration_seconds', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('next_fetch_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('youtube_id')
+    )
+    op.create_index('ix_video_metadata_next_fetch_at', 'video_metadata', ['next_fetch_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_metadata_next_fetch_at', table_name='video_metadata')
+    op.drop_table('video_metadata')
@@ -0,0 +1,49 @@
+"""Add video progress and sharded view counters
+
+Revision ID: 014_video_progress
+Revises: 013_video_metadata
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014_video_progress'
+down_revision = '013_video_metadata'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'video_progress',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('position_seconds', sa.Integer(), nullable=False),
+        sa.Column('furthest_seconds', sa.Integer(), nullable=False),
+        sa.Column('duration_seconds', sa.Integer(), nullable=True),
+        sa.Column('watched_seconds', sa.Integer(), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_event_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('student_id', 'video_id')
+    )
+    op.create_index('ix_video_progress_video_id', 'video_progress', ['video_id'], unique=False)
+    op.create_table(
+        'video_view_counters',
+        sa.Column('video_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False),
+        sa.Column('watched_seconds', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('video_id', 'shard')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('video_view_counters')
+    op.drop_index('ix_video_progress_video_id', table_name='video_progress')
+    op.drop_table('video_progress')
@@ -0,0 +1,35 @@
+"""Add session attendance check-ins
+
+Revision ID: 015_session_attendance
+Revises: 014_video_progress
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015_session_attendance'
+down_revision = '014_video_progress'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'session_attendance',
+        sa.Column('enrollment_id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('checked_in_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['enrollment_id'], ['session_enrollments.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('enrollment_id')
+    )
+    op.create_index('ix_session_attendance_session_id', 'session_attendance', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_attendance_session_id', table_name='session_attendance')
+    op.drop_table('session_attendance')
@@ -0,0 +1,79 @@
+"""Add weekly report rollups and change watermark indexes
+
+Revision ID: 016_weekly_reports
+Revises: 015_session_attendance
+Create Date: 2026-10-19 00:00:00.000000
+
+The rollups start empty; the first refresh run (or
+``python -m app.reports.rollups rebuild``) fills them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016_weekly_reports'
+down_revision = '015_session_attendance'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'report_weeks',
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('sessions', sa.Integer(), nullable=False),
+        sa.Column('sessions_completed', sa.Integer(), nullable=False),
+        sa.Column('active_volunteers', sa.Integer(), nullable=False),
+        sa.Column('enrollments', sa.Integer(), nullable=False),
+        sa.Column('unique_students', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('week_start')
+    )
+    op.create_table(
+        'report_skill_weeks',
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.Column('skill_name', sa.String(), nullable=False),
+        sa.Column('sessions', sa.Integer(), nullable=False),
+        sa.Column('sessions_completed', sa.Integer(), nullable=False),
+        sa.Column('enrollments', sa.Integer(), nullable=False),
+        sa.Column('unique_students', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('week_start', 'skill_id')
+    )
+    op.create_table(
+        'report_session_weeks',
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('session_id')
+    )
+    op.create_table(
+        'report_dirty_weeks',
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('week_start')
+    )
+    op.create_table(
+        'report_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('changes_through', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Change watermarks, and the week recompute's sessions -> enrollments join
+    op.create_index('ix_sessions_created_at', 'sessions', ['created_at'], unique=False)
+    op.create_index('ix_sessions_updated_at', 'sessions', ['updated_at'], unique=False)
+    op.create_index('ix_session_enrollments_enrolled_at', 'session_enrollments', ['enrolled_at'], unique=False)
+    op.create_index(
+        op.f('ix_session_enrollments_session_id'), 'session_enrollments', ['session_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_session_enrollments_session_id'), table_name='session_enrollments')
+    op.drop_index('ix_session_enrollments_enrolled_at', table_name='session_enrollments')
+    op.drop_index('ix_sessions_updated_at', table_name='sessions')
+    op.drop_index('ix_sessions_created_at', table_name='sessions')
+    op.drop_table('report_watermarks')
+    op.drop_table('report_dirty_weeks')
+    op.drop_table('report_session_weeks')
+    op.drop_table('report_skill_weeks')
+    op.drop_table('report_weeks')
@@ -0,0 +1,29 @@
+"""Add a live-session schedule index for unfiltered time-window listings
+
+Revision ID: 017_session_schedule_live
+Revises: 016_weekly_reports
+Create Date: 2026-10-19 00:00:00.000000
+
+``ix_sessions_status_schedule`` leads with status, so a time-window
+listing without a status filter could use it for neither the range nor
+the ``ORDER BY schedule``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '017_session_schedule_live'
+down_revision = '016_weekly_reports'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_sessions_schedule_live', 'sessions', ['schedule'], unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_schedule_live', table_name='sessions')
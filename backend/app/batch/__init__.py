@@ -0,0 +1 @@
+"""Batch request microservice package."""
@@ -0,0 +1,45 @@
+"""
+Batch routers - run several GET requests in one HTTP call.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from app.db.database import get_db, DBSessionRoute
+from app.core.security import verify_clerk_token
+from app.users.services import UserService
+from app.batch.schemas import BatchRequest, BatchResponse
+from app.batch.services import BatchService
+
+router = APIRouter(prefix="/batch", tags=["batch"], route_class=DBSessionRoute)
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    clerk_user: dict = Depends(verify_clerk_token),
+    db: Session = Depends(get_db)
+):
+    """
+    Run up to 20 GET requests against the API in one round-trip.
+    The token is verified once and the user and database session are
+    shared by every sub-request; each result keeps its own status code.
+    Sub-requests share one database session, so their queries run one at
+    a time. Streaming endpoints (exports) cannot be batched.
+    """
+    # Resolved here, once: sub-requests must not look it up concurrently
+    # on the shared session
+    clerk_id = clerk_user.get("sub") or clerk_user.get("id")
+    if not clerk_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token format"
+        )
+    user = UserService(db).get_by_clerk_id(clerk_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found. Please complete registration."
+        )
+
+    batch_service = BatchService(request, db, clerk_user, user)
+    return BatchResponse(responses=await batch_service.execute(batch.requests))
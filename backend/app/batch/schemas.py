@@ -0,0 +1,52 @@
+"""
+Pydantic schemas for batch requests.
+"""
+from pydantic import BaseModel, Field, validator
+from typing import Any, List, Optional
+
+MAX_BATCH_SIZE = 20
+
+# Streaming endpoints: a batch would buffer their whole body in memory
+STREAMING_PATH_PREFIXES = ("/api/v1/exports/",)
+
+
+class BatchItem(BaseModel):
+    """A single GET request to run inside a batch."""
+    id: Optional[str] = Field(None, max_length=100, description="Client-chosen ID echoed in the response")
+    method: str = Field("GET", description="HTTP method (only GET is supported)")
+    path: str = Field(..., max_length=2000, description="API path including query string, e.g. /api/v1/skills/?limit=10")
+
+    @validator('method')
+    def validate_method(cls, v):
+        if v.upper() != "GET":
+            raise ValueError('Only GET requests can be batched')
+        return "GET"
+
+    @validator('path')
+    def validate_path(cls, v):
+        if not v.startswith('/api/v1/'):
+            raise ValueError('Path must start with /api/v1/')
+        path = v.split('?')[0]
+        if path.rstrip('/') == '/api/v1/batch':
+            raise ValueError('Batch requests cannot be nested')
+        if (path.rstrip('/') + '/').startswith(STREAMING_PATH_PREFIXES):
+            raise ValueError('Streaming endpoints cannot be batched')
+        return v
+
+
+class BatchRequest(BaseModel):
+    """Schema for a batch of GET requests."""
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BatchItemResponse(BaseModel):
+    """Result of one batched request."""
+    id: Optional[str]
+    path: str
+    status: int
+    body: Any
+
+
+class BatchResponse(BaseModel):
+    """Results in the same order as the submitted requests."""
+    responses: List[BatchItemResponse]
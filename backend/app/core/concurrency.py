@@ -0,0 +1,302 @@
+"""
+Adaptive concurrency limiting and load shedding.
+
+Each worker admits at most ``limit`` requests at once. The limit follows the
+gradient algorithm: it compares recent response times with each route's
+long-term baseline and shrinks when requests start queueing inside the app
+(typically waiting on a slow database), growing again once latency
+recovers. Baselines are kept per route because routes differ by orders of
+magnitude (a cached lookup against a database query), so comparing a mixed
+window with any single figure would read the mix itself as queueing.
+Requests over the limit wait briefly in a priority queue and are shed with
+503 + Retry-After when the wait runs out or the queue is full.
+
+Lanes:
+
+* ``health`` - health checks are never queued or shed, so the load balancer
+  keeps seeing the worker as alive while it sheds.
+* ``auth`` - sign-in and registration get a reserved share above the limit
+  and are dequeued before everything else.
+* ``default`` - everything else.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional
+from app.core.config import settings
+
+LANE_HEALTH = "health"
+LANE_AUTH = "auth"
+LANE_DEFAULT = "default"
+LANES = (LANE_HEALTH, LANE_AUTH, LANE_DEFAULT)
+
+HEALTH_PATHS = ("/health", "/api/v1/health")
+AUTH_PATHS = {
+    "/api/v1/users/register",
+    "/api/v1/users/me",
+    "/api/v1/users/parents/register",
+}
+
+# Gradient algorithm tuning
+SAMPLE_WINDOW_SECONDS = 0.25  # Response times are averaged over this window
+MIN_WINDOW_SAMPLES = 5
+LONG_WINDOW = 100  # Windows over which a route's baseline drifts upwards
+MAX_ROUTES = 1000  # Route baselines kept; requests beyond share one
+SMOOTHING = 0.2  # Weight of each new limit estimate
+RTT_TOLERANCE = 1.5  # Latency growth accepted before the limit shrinks
+SHED_RATE_WINDOW = 60  # Seconds covered by the reported shed rate
+
+
+def lane_for(path: str) -> str:
+    """Priority lane for a request path."""
+    if path.startswith(HEALTH_PATHS):
+        return LANE_HEALTH
+    if path in AUTH_PATHS:
+        return LANE_AUTH
+    return LANE_DEFAULT
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Gradient-based concurrency limit with a bounded priority queue.
+
+    Only used from the event loop thread, so plain counters are safe.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 200,
+        max_queue: int = 50,
+        queue_timeout: float = 0.5,
+        auth_reserve: int = 4,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.auth_reserve = auth_reserve
+
+        self.in_flight = 0
+        self.queues: Dict[str, Deque[asyncio.Future]] = {LANE_AUTH: deque(), LANE_DEFAULT: deque()}
+        self.admitted = {lane: 0 for lane in LANES}
+        self.shed = {lane: 0 for lane in LANES}
+        self._shed_times: Deque[float] = deque()
+
+        self.short_rtt: Optional[float] = None
+        self.rtt_ratio: Optional[float] = None  # Recent response times over their routes' baselines
+        self._baselines: Dict[Hashable, float] = {}
+        self._window_start = time.monotonic()
+        self._window_routes: Dict[Hashable, List] = {}  # route -> [total rtt, count]
+        self._window_count = 0
+        self._window_peak_in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def _capacity(self, lane: str) -> int:
+        limit = int(self.limit)
+        return limit + self.auth_reserve if lane == LANE_AUTH else limit
+
+    async def acquire(self, lane: str) -> bool:
+        """Take a slot, waiting up to ``queue_timeout``; False means shed."""
+        if lane == LANE_HEALTH:
+            self.admitted[lane] += 1
+            return True
+        if self.in_flight < self._capacity(lane) and not self.queues[lane]:
+            self._admit(lane)
+            return True
+        if self.queue_depth >= self.max_queue:
+            self._record_shed(lane)
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.queues[lane].append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the wait ran out; the slot is ours
+                return True
+            waiter.cancel()
+            self._remove_waiter(lane, waiter)
+            self._record_shed(lane)
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                waiter.cancel()
+                self._remove_waiter(lane, waiter)
+            raise
+
+    def release(self, rtt: Optional[float], route: Hashable = None) -> None:
+        """Return a slot and record the request's response time for its route."""
+        self.in_flight -= 1
+        if rtt is not None:
+            self._sample(rtt, route)
+        self._wake()
+
+    def _admit(self, lane: str) -> None:
+        self.in_flight += 1
+        self.admitted[lane] += 1
+        if self.in_flight > self._window_peak_in_flight:
+            self._window_peak_in_flight = self.in_flight
+
+    def _wake(self) -> None:
+        for lane in (LANE_AUTH, LANE_DEFAULT):
+            queue = self.queues[lane]
+            while queue and self.in_flight < self._capacity(lane):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._admit(lane)
+                waiter.set_result(True)
+
+    def _remove_waiter(self, lane: str, waiter: asyncio.Future) -> None:
+        try:
+            self.queues[lane].remove(waiter)
+        except ValueError:
+            pass
+
+    def _record_shed(self, lane: str) -> None:
+        now = time.monotonic()
+        self.shed[lane] += 1
+        self._shed_times.append(now)
+        while self._shed_times and self._shed_times[0] < now - SHED_RATE_WINDOW:
+            self._shed_times.popleft()
+
+    def _sample(self, rtt: float, route: Hashable) -> None:
+        if route not in self._baselines and len(self._baselines) >= MAX_ROUTES:
+            route = None
+        totals = self._window_routes.get(route)
+        if totals is None:
+            totals = self._window_routes[route] = [0.0, 0]
+        totals[0] += rtt
+        totals[1] += 1
+        self._window_count += 1
+        now = time.monotonic()
+        if now - self._window_start < SAMPLE_WINDOW_SECONDS or self._window_count < MIN_WINDOW_SAMPLES:
+            return
+        self._update_limit(self._window_routes, self._window_peak_in_flight)
+        self._window_start = now
+        self._window_routes = {}
+        self._window_count = 0
+        self._window_peak_in_flight = self.in_flight
+
+    def _update_limit(self, routes: Dict[Hashable, List], peak_in_flight: int) -> None:
+        # Compare each route's mean with that route's baseline, weighted by
+        # its share of the window. A baseline follows the route's window
+        # means: it drops at once and only drifts up slowly, so a sustained
+        # overload does not quickly become the norm.
+        weighted_ratio = 0.0
+        total_rtt = 0.0
+        for route, (total, count) in routes.items():
+            mean = total / count
+            baseline = self._baselines.get(route)
+            if baseline is None or mean < baseline:
+                self._baselines[route] = mean
+            else:
+                self._baselines[route] = baseline + (mean - baseline) / LONG_WINDOW
+            weighted_ratio += (mean / baseline if baseline else 1.0) * count
+            total_rtt += total
+        self.rtt_ratio = weighted_ratio / self._window_count
+        self.short_rtt = total_rtt / self._window_count
+
+        # Far below the limit, latency says nothing about the limit itself
+        if peak_in_flight < self.limit / 2:
+            return
+
+        gradient = max(0.5, min(1.0, RTT_TOLERANCE / self.rtt_ratio))
+        queue_size = math.sqrt(self.limit)
+        estimate = self.limit * gradient + queue_size
+        limit = self.limit * (1 - SMOOTHING) + estimate * SMOOTHING
+        self.limit = max(float(self.min_limit), min(float(self.max_limit), limit))
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait, from the current drain rate."""
+        rtt = self.short_rtt or 0.0
+        drain = rtt * (self.queue_depth + 1) / max(self.limit, 1.0)
+        return max(1, math.ceil(drain))
+
+    def stats(self) -> Dict:
+        """Current limit, load and shedding counters."""
+        now = time.monotonic()
+        recent_shed = sum(1 for stamp in self._shed_times if stamp >= now - SHED_RATE_WINDOW)
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": {lane: len(queue) for lane, queue in self.queues.items()},
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+            "shed_per_second": round(recent_shed / SHED_RATE_WINDOW, 3),
+            "rtt_ms": round(self.short_rtt * 1000, 2) if self.short_rtt is not None else None,
+            "rtt_ratio": round(self.rtt_ratio, 3) if self.rtt_ratio is not None else None,
+        }
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    ASGI middleware applying an ``AdaptiveConcurrencyLimiter``.
+
+    Batched sub-requests run inside their batch request's slot, and paths in
+    ``exempt_paths`` (long-running streams) are neither limited nor sampled.
+    """
+
+    def __init__(self, app, limiter: AdaptiveConcurrencyLimiter, exempt_paths=()):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("state", {}).get("batch"):
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        if self.exempt_paths and path.startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        lane = lane_for(path)
+        if not await self.limiter.acquire(lane):
+            await self._shed(send)
+            return
+        if lane == LANE_HEALTH:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # The router has put the matched endpoint into the scope by now
+            self.limiter.release(time.monotonic() - started, scope.get("endpoint"))
+
+    async def _shed(self, send) -> None:
+        body = b'{"detail":"Server is overloaded, please retry"}'
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(self.limiter.retry_after()).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# One limiter per worker process
+concurrency_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=settings.CONCURRENCY_INITIAL_LIMIT,
+    min_limit=settings.CONCURRENCY_MIN_LIMIT,
+    max_limit=settings.CONCURRENCY_MAX_LIMIT,
+    max_queue=settings.CONCURRENCY_MAX_QUEUE,
+    queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT,
+    auth_reserve=settings.CONCURRENCY_AUTH_RESERVE,
+)
@@ -24,6 +24,110 @@ class Settings(BaseSettings):
     AWS_REGION: str = "us-east-1"
     RDS_ENDPOINT: str = ""
     
+    # Calendar feeds: HMAC key for feed URLs (feeds are disabled while unset)
+    # and how long another worker's changes can take to show up in a feed
+    CALENDAR_FEED_SECRET: str = ""
+    FEED_CACHE_SECONDS: int = 60
+    
+    # Skill autocomplete (full rebuild interval, picks up other workers' writes)
+    AUTOCOMPLETE_REFRESH_SECONDS: int = 300
+    
+    # Dashboards (per-user cache lifetime)
+    DASHBOARD_CACHE_SECONDS: int = 30
+    
+    # Rate limiting (format documented in app/core/ratelimit.py)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: str = (
+        "POST /api/v1/users/register=5/minute:token:ip;"
+        "POST /api/v1/users/parents/register=5/minute:token:user;"
+        "POST /api/v1/users/students=20/minute:token:user;"
+        "POST /api/v1/sessions/enroll=30/minute:sliding:user"
+    )
+    RATE_LIMIT_REDIS_URL: str = ""  # Share counters across workers; in-memory when empty
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Key by X-Forwarded-For (behind a load balancer)
+    RATE_LIMIT_IP_CEILING_FACTOR: int = 5  # User-keyed limits also cap each IP at this multiple
+    
+    # Adaptive concurrency limit per worker (requests over it queue, then get 503)
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_INITIAL_LIMIT: int = 20
+    CONCURRENCY_MIN_LIMIT: int = 4
+    CONCURRENCY_MAX_LIMIT: int = 200
+    CONCURRENCY_MAX_QUEUE: int = 50
+    CONCURRENCY_QUEUE_TIMEOUT: float = 0.5  # Seconds a request may wait for a slot
+    CONCURRENCY_AUTH_RESERVE: int = 4  # Extra slots only sign-in/registration may use
+    
+    # Idempotency-Key support for POST requests
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # How long a stored response is replayed
+    IDEMPOTENCY_LEASE_SECONDS: int = 60  # After this a stuck in-progress key can be reclaimed
+    
+    # Background jobs (transactional outbox)
+    JOB_WORKER_ENABLED: bool = True  # Run workers in the API process (or: python -m app.jobs.worker)
+    JOB_WORKER_THREADS: int = 2
+    JOB_BATCH_SIZE: int = 20  # Jobs claimed per query
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: int = 300  # A running job is requeued if its worker is silent this long
+    JOB_MAX_ATTEMPTS: int = 8
+    JOB_RETRY_BASE_SECONDS: float = 5.0  # Doubles per attempt, with jitter
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    JOB_RETENTION_HOURS: int = 72  # Finished jobs are kept this long
+    REAP_BATCH_SIZE: int = 500  # Sessions or videos of a deleted skill removed per job
+    
+    # Notifications
+    NOTIFICATION_SENDER: str = "log"  # "log" (development) or "smtp"
+    NOTIFICATION_FROM: str = "no-reply@nonprofit-learning.org"
+    NOTIFICATION_BATCH_SIZE: int = 50  # Messages sent per SMTP connection
+    NOTIFICATION_WORKERS: int = 4  # Batches sent in parallel
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_USE_TLS: bool = False
+    
+    # Session reminders (24h and 1h before each session)
+    REMINDERS_ENABLED: bool = True  # Run the scheduler in the API process (or: python -m app.reminders.scheduler)
+    REMINDER_INTERVAL_SECONDS: int = 60
+    REMINDER_BATCH_SIZE: int = 500  # Sessions planned per transaction
+    REMINDER_MAX_ATTEMPTS: int = 3
+    
+    # Recurring session series
+    SERIES_HORIZON_DAYS: int = 56  # Occurrences are stored as sessions this far ahead
+    SERIES_REFRESH_HOURS: int = 24  # How often each series' horizon is rolled forward
+    CALENDAR_MAX_DAYS: int = 366  # Longest window one calendar query may expand
+    
+    # Session attendance (app/sessions/attendance.py)
+    ATTENDANCE_OPEN_MINUTES: int = 15  # Check-in opens this long before a session starts
+    ATTENDANCE_ROSTER_TTL_SECONDS: int = 60  # Cached rosters are reloaded after this long
+    ATTENDANCE_FLUSH_SECONDS: float = 0.5  # Also the most a crash can lose
+    ATTENDANCE_BATCH_SIZE: int = 500  # Rows per multi-row INSERT
+    ATTENDANCE_MAX_PENDING: int = 20000  # Queued check-ins before new ones are refused with 503
+    
+    # Video metadata enrichment (app/videos/enrichment.py)
+    VIDEO_OEMBED_URL: str = "https://www.youtube.com/oembed"
+    VIDEO_METADATA_CONCURRENCY: int = 16  # Requests in flight per process
+    VIDEO_METADATA_RATE_PER_SECOND: float = 100.0  # Request rate cap per process
+    VIDEO_METADATA_MAX_RETRIES: int = 3
+    VIDEO_METADATA_TIMEOUT_SECONDS: float = 10.0
+    VIDEO_METADATA_BATCH_SIZE: int = 500  # Videos per backfill batch
+    VIDEO_METADATA_TTL_DAYS: int = 30  # Cached metadata is refreshed after this long
+    
+    # Video progress (write-behind buffer, app/videos/progress.py)
+    VIDEO_PROGRESS_FLUSH_SECONDS: float = 5.0  # Also the most a crash can lose
+    VIDEO_PROGRESS_MAX_PENDING: int = 50000  # Buffered (student, video) entries before events are dropped
+    VIDEO_VIEW_COUNTER_SHARDS: int = 8  # Counter rows per video
+    
+    # Recommendations
+    RECOMMENDATION_REFRESH_SECONDS: int = 600  # Full index rebuild interval; changes apply incrementally
+    
+    # Weekly reports (rollups, app/reports/rollups.py)
+    REPORT_REFRESH_MINUTES: int = 15  # Rollups catch up with changes this often
+    REPORT_WATERMARK_LAG_SECONDS: int = 60  # Changes newer than this wait for the next refresh
+    REPORT_REBUILD_CHUNK_WEEKS: int = 8  # Weeks recomputed per transaction
+    REPORT_MAX_WEEKS: int = 156  # Longest range one report request may cover
+    
+    # Exports
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per server-side cursor batch
+    
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
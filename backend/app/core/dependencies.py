@@ -3,7 +3,8 @@ Dependency injection for FastAPI routes.
 Handles role-based access control and user authentication.
 """
 from typing import Optional
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, Request, status, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.core.security import verify_clerk_token
@@ -11,14 +12,28 @@ from app.users.models import User
 from app.users.services import UserService
 
 
+def _shared_user(request: Request, clerk_id: str) -> Optional[User]:
+    """The user already loaded for a batch, if it is this Clerk ID's."""
+    user = getattr(request.state, "user", None)
+    if user is not None and user.clerk_id == clerk_id:
+        return user
+    return None
+
+
+def _load_user(request: Request, clerk_id: str, db: Session) -> Optional[User]:
+    """Load the user for a Clerk ID, reusing one already loaded for a batch."""
+    return _shared_user(request, clerk_id) or UserService(db).get_by_clerk_id(clerk_id)
+
+
 class RoleChecker:
     """Dependency to check if user has required role."""
     
     def __init__(self, allowed_roles: list[str]):
         self.allowed_roles = allowed_roles
     
-    def __call__(
+    async def __call__(
         self,
+        request: Request,
         clerk_user: dict = Depends(verify_clerk_token),
         db: Session = Depends(get_db)
     ) -> User:
@@ -26,6 +41,7 @@ class RoleChecker:
         Verify user has required role.
         
         Args:
+            request: Incoming request
             clerk_user: User info from Clerk token
             db: Database session
             
@@ -34,6 +50,10 @@ class RoleChecker:
             
         Raises:
             HTTPException: If user doesn't have required role
+        
+        Async so that batched sub-requests, which share one database
+        session, never touch it from a threadpool thread; only a lookup
+        for a plain request goes to the threadpool.
         """
         clerk_id = clerk_user.get("sub") or clerk_user.get("id")
         if not clerk_id:
@@ -43,8 +63,9 @@ class RoleChecker:
             )
         
         # Get or create user in database
-        user_service = UserService(db)
-        user = user_service.get_by_clerk_id(clerk_id)
+        user = _shared_user(request, clerk_id)
+        if user is None:
+            user = await run_in_threadpool(UserService(db).get_by_clerk_id, clerk_id)
         
         if not user:
             raise HTTPException(
@@ -77,6 +98,7 @@ require_any_auth = RoleChecker(["ADMIN", "VOLUNTEER", "PARENT"])
 
 
 async def get_current_user(
+    request: Request,
     clerk_user: dict = Depends(verify_clerk_token),
     db: Session = Depends(get_db)
 ) -> User:
@@ -84,6 +106,7 @@ async def get_current_user(
     Get current authenticated user from database.
     
     Args:
+        request: Incoming request
         clerk_user: User info from Clerk token
         db: Database session
         
@@ -97,8 +120,7 @@ async def get_current_user(
             detail="Invalid token format"
         )
     
-    user_service = UserService(db)
-    user = user_service.get_by_clerk_id(clerk_id)
+    user = _load_user(request, clerk_id, db)
     
     if not user:
         raise HTTPException(
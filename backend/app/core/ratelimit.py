@@ -0,0 +1,329 @@
+"""
+Request rate limiting.
+
+Policies are configured in ``settings.RATE_LIMITS`` as a ``;``-separated list
+of ``METHOD PATH=LIMIT/PERIOD[:ALGORITHM][:KEY]`` entries, for example::
+
+    POST /api/v1/users/register=5/minute:token:ip;POST /api/v1/sessions/enroll=30/minute
+
+* ``PATH`` is matched exactly; a trailing ``*`` matches any suffix.
+* ``PERIOD`` is ``second``, ``minute``, ``hour``, ``day`` or a number of seconds.
+* ``ALGORITHM`` is ``token`` (default): a bucket of ``LIMIT`` tokens refilled
+  over ``PERIOD``, allowing short bursts; or ``sliding``: at most ``LIMIT``
+  requests in any ``PERIOD`` (weighted two-window approximation).
+* ``KEY`` is ``user`` (default): the Clerk user id from the bearer token,
+  falling back to the client IP for anonymous requests; or ``ip``.
+
+The user id is read without verifying the token, so a caller could rotate
+forged ids to get a fresh bucket per request. User-keyed policies are
+therefore also enforced per client IP, at ``RATE_LIMIT_IP_CEILING_FACTOR``
+times their limit (several users may share an address).
+
+Counters live in process memory unless ``RATE_LIMIT_REDIS_URL`` is set, in
+which case every worker shares them through Redis.
+"""
+import inspect
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.security import token_subject
+
+logger = logging.getLogger("app")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+ALGORITHMS = ("token", "sliding")
+KEY_TYPES = ("user", "ip")
+
+# Buckets tracked per worker by the in-memory backend before the least
+# recently used ones are dropped (a dropped bucket simply starts full again)
+MAX_MEMORY_KEYS = 100000
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """One configured limit for a method and path."""
+    method: str
+    path: str
+    limit: int
+    period: float
+    algorithm: str = "token"
+    key: str = "user"
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def parse_policies(spec: str) -> List[RateLimitPolicy]:
+    """Parse the ``RATE_LIMITS`` setting; raises ValueError on bad entries."""
+    policies = []
+    for entry in spec.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            route, rule = entry.rsplit("=", 1)
+            method, path = route.split()
+            parts = rule.strip().split(":")
+            limit, period = parts[0].split("/")
+            algorithm = parts[1] if len(parts) > 1 else "token"
+            key = parts[2] if len(parts) > 2 else "user"
+            seconds = PERIODS[period] if period in PERIODS else float(period)
+            policy = RateLimitPolicy(method.upper(), path, int(limit), seconds, algorithm, key)
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit policy: {entry!r}")
+        if policy.algorithm not in ALGORITHMS or policy.key not in KEY_TYPES:
+            raise ValueError(f"Invalid rate limit policy: {entry!r}")
+        if policy.limit < 1 or policy.period <= 0:
+            raise ValueError(f"Invalid rate limit policy: {entry!r}")
+        policies.append(policy)
+    return policies
+
+
+class MemoryBackend:
+    """
+    Per-process counters, O(1) per check.
+
+    Only touched from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self, max_keys: int = MAX_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self._state: "OrderedDict[str, list]" = OrderedDict()
+
+    def _entry(self, key: str, default: list) -> list:
+        state = self._state
+        entry = state.get(key)
+        if entry is None:
+            entry = state[key] = default
+            if len(state) > self.max_keys:
+                state.popitem(last=False)
+        else:
+            state.move_to_end(key)
+        return entry
+
+    def token_bucket(self, key: str, limit: int, period: float, now: float) -> float:
+        """Take one token; returns 0 when allowed, else seconds until a token is free."""
+        rate = limit / period
+        entry = self._entry(key, [float(limit), now])
+        tokens = min(limit, entry[0] + (now - entry[1]) * rate)
+        entry[1] = now
+        if tokens >= 1:
+            entry[0] = tokens - 1
+            return 0.0
+        entry[0] = tokens
+        return (1 - tokens) / rate
+
+    def sliding_window(self, key: str, limit: int, period: float, now: float) -> float:
+        """Count one hit; returns 0 when allowed, else seconds until the window frees up."""
+        window = int(now // period)
+        # [current window number, hits in it, hits in the previous window]
+        entry = self._entry(key, [window, 0, 0])
+        if entry[0] != window:
+            entry[2] = entry[1] if entry[0] == window - 1 else 0
+            entry[0] = window
+            entry[1] = 0
+        elapsed = now - window * period
+        weighted = entry[2] * (1 - elapsed / period) + entry[1]
+        if weighted < limit:
+            entry[1] += 1
+            return 0.0
+        return period - elapsed
+
+    def reset(self) -> None:
+        self._state.clear()
+
+
+class RedisBackend:
+    """
+    Counters shared by every worker through Redis.
+
+    Takes any ``redis.asyncio`` compatible client, so
+    ``fakeredis.FakeAsyncRedis()`` can stand in for a server locally. The
+    token bucket is stored as a GCRA "theoretical arrival time", one float
+    per key, updated with an optimistic WATCH/MULTI transaction; the sliding
+    window uses INCR on per-window keys.
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def token_bucket(self, key: str, limit: int, period: float, now: float) -> float:
+        interval = period / limit
+        burst = period - interval
+        redis_key = self.prefix + key
+        result: Dict[str, float] = {}
+
+        async def attempt(pipe) -> None:
+            stored = await pipe.get(redis_key)
+            tat = max(float(stored) if stored is not None else now, now)
+            if tat - now > burst + 1e-9:  # Summed float intervals drift past an exact burst
+                result["retry"] = tat - now - burst
+                return
+            pipe.multi()
+            pipe.set(redis_key, tat + interval, px=max(1, int(math.ceil((tat + interval - now) * 1000))))
+            result["retry"] = 0.0
+
+        await self.client.transaction(attempt, redis_key)
+        return result["retry"]
+
+    async def sliding_window(self, key: str, limit: int, period: float, now: float) -> float:
+        window = int(now // period)
+        current = f"{self.prefix}{key}:{window}"
+        pipe = self.client.pipeline()
+        pipe.incr(current)
+        pipe.expire(current, int(math.ceil(period * 2)))
+        pipe.get(f"{self.prefix}{key}:{window - 1}")
+        # Rejected requests are counted too, unlike the in-memory window
+        hits, _, previous = await pipe.execute()
+        elapsed = now - window * period
+        weighted = int(previous or 0) * (1 - elapsed / period) + hits - 1
+        if weighted < limit:
+            return 0.0
+        return period - elapsed
+
+    async def reset(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+
+class RateLimiter:
+    """Matches requests to policies and checks them against a backend."""
+
+    def __init__(
+        self,
+        policies: List[RateLimitPolicy],
+        backend=None,
+        trust_forwarded: bool = False,
+        ip_ceiling_factor: int = 5
+    ):
+        self.backend = backend or MemoryBackend()
+        self.trust_forwarded = trust_forwarded
+        self.ip_ceiling_factor = ip_ceiling_factor
+        self._exact: Dict[Tuple[str, str], RateLimitPolicy] = {}
+        self._prefixes: List[Tuple[str, str, RateLimitPolicy]] = []
+        for policy in policies:
+            if policy.path.endswith("*"):
+                self._prefixes.append((policy.method, policy.path[:-1], policy))
+            else:
+                self._exact[(policy.method, policy.path)] = policy
+
+    def match(self, method: str, path: str) -> Optional[RateLimitPolicy]:
+        policy = self._exact.get((method, path))
+        if policy is None and self._prefixes:
+            for prefix_method, prefix, candidate in self._prefixes:
+                if prefix_method == method and path.startswith(prefix):
+                    return candidate
+        return policy
+
+    def client_ip(self, scope) -> str:
+        """The client IP, from X-Forwarded-For when trusted."""
+        if self.trust_forwarded:
+            forwarded = dict(scope["headers"]).get(b"x-forwarded-for")
+            if forwarded:
+                return forwarded.split(b",")[0].strip().decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def client_key(self, policy: RateLimitPolicy, scope) -> str:
+        """Identify the caller: Clerk user id when known, otherwise the client IP."""
+        if policy.key == "user":
+            authorization = dict(scope["headers"]).get(b"authorization")
+            if authorization and authorization.startswith(b"Bearer "):
+                subject = token_subject(authorization[7:].decode("latin-1"))
+                if subject:
+                    return "user:" + subject
+        return "ip:" + self.client_ip(scope)
+
+    def check(self, policy: RateLimitPolicy, scope, now: Optional[float] = None):
+        """
+        Record one request; returns 0 when allowed, else the Retry-After in
+        seconds. Awaitable with the shared backend, a plain float in memory.
+        Requests keyed by user id also count against their IP's ceiling.
+        """
+        now = time.time() if now is None else now
+        client_key = self.client_key(policy, scope)
+        retry_after = self._hit(f"{policy.name}|{client_key}", policy, policy.limit, now)
+        if not client_key.startswith("user:"):
+            return retry_after
+        ceiling = self._hit(
+            f"{policy.name}|ip-ceiling:{self.client_ip(scope)}",
+            policy, policy.limit * self.ip_ceiling_factor, now
+        )
+        if inspect.isawaitable(retry_after):
+            return _slowest(retry_after, ceiling)
+        return max(retry_after, ceiling)
+
+    def _hit(self, key: str, policy: RateLimitPolicy, limit: int, now: float):
+        if policy.algorithm == "sliding":
+            return self.backend.sliding_window(key, limit, policy.period, now)
+        return self.backend.token_bucket(key, limit, policy.period, now)
+
+
+async def _slowest(*retry_afters) -> float:
+    """Await several backend checks; the request waits for the longest Retry-After."""
+    return max([await retry_after for retry_after in retry_afters])
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that answers 429 with Retry-After once a caller exceeds
+    the policy for the requested route. Routes without a policy pass straight
+    through after a single dict lookup. Batched sub-requests are not counted
+    again; the batch request itself is.
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        policy = self.limiter.match(scope["method"], scope["path"])
+        if policy is None or scope.get("state", {}).get("batch"):
+            await self.app(scope, receive, send)
+            return
+        try:
+            retry_after = self.limiter.check(policy, scope)
+            if inspect.isawaitable(retry_after):
+                retry_after = await retry_after
+        except Exception:
+            # A shared backend outage must not take the API down with it
+            logger.exception("Rate limit backend failed; allowing request")
+            retry_after = 0.0
+        if retry_after <= 0:
+            await self.app(scope, receive, send)
+            return
+        body = b'{"detail":"Too many requests"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def build_rate_limiter() -> RateLimiter:
+    """Rate limiter configured from settings."""
+    backend = None
+    if settings.RATE_LIMIT_REDIS_URL:
+        # Optional dependency, only needed for the shared backend
+        from redis.asyncio import Redis
+        backend = RedisBackend(Redis.from_url(settings.RATE_LIMIT_REDIS_URL))
+    return RateLimiter(
+        parse_policies(settings.RATE_LIMITS),
+        backend=backend,
+        trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+        ip_ceiling_factor=settings.RATE_LIMIT_IP_CEILING_FACTOR,
+    )
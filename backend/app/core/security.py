@@ -2,20 +2,27 @@
 Security utilities for authentication and authorization.
 Integrates with Clerk for user authentication.
 """
+import base64
+import json
+from functools import lru_cache
 from typing import Optional
-from fastapi import HTTPException, Header, status
+from fastapi import HTTPException, Header, Request, status
 import httpx
 from app.core.config import settings
 
 
-async def verify_clerk_token(authorization: Optional[str] = Header(None)) -> dict:
+async def verify_clerk_token(request: Request, authorization: Optional[str] = Header(None)) -> dict:
     """
     Verify Clerk JWT token and return user information.
     
     Note: In production, you should use Clerk's backend SDK to verify tokens.
     This is a simplified version for demonstration.
     
+    Batched sub-requests reuse the identity already verified by the batch
+    endpoint (see app.batch).
+    
     Args:
+        request: Incoming request
         authorization: Bearer token from Authorization header
         
     Returns:
@@ -24,6 +31,10 @@ async def verify_clerk_token(authorization: Optional[str] = Header(None)) -> dic
     Raises:
         HTTPException: If token is invalid or missing
     """
+    verified = getattr(request.state, "clerk_user", None)
+    if verified is not None:
+        return verified
+    
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,3 +101,19 @@ async def get_clerk_user_info(clerk_id: str) -> dict:
             )
         
         return response.json()
+
+
+@lru_cache(maxsize=4096)
+def token_subject(token: str) -> Optional[str]:
+    """
+    Clerk user id (``sub``) from a bearer token's payload.
+
+    Cheap enough for middleware. The signature is not checked here, so only
+    use it to key limits and caches, never to authorize anything.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get("sub")
+    except (IndexError, ValueError, AttributeError):
+        return None
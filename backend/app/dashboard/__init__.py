@@ -0,0 +1 @@
+"""Dashboard microservice package."""
@@ -0,0 +1,38 @@
+"""
+Dashboard routers - one-call aggregate endpoints for home pages.
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import require_volunteer, require_parent
+from app.users.models import User
+from app.dashboard.schemas import VolunteerDashboard, ParentDashboard
+from app.dashboard.services import DashboardService
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=DBSessionRoute)
+
+
+@router.get("/volunteer", response_model=VolunteerDashboard)
+async def get_volunteer_dashboard(
+    current_user: User = Depends(require_volunteer),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current volunteer's sessions (with enrollment counts), skills,
+    videos and next upcoming session in one call.
+    """
+    dashboard_service = DashboardService(db)
+    return dashboard_service.get_volunteer_dashboard(current_user.id)
+
+
+@router.get("/parent", response_model=ParentDashboard)
+async def get_parent_dashboard(
+    current_user: User = Depends(require_parent),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current parent, their students, and every enrollment with its
+    session and skill in one call.
+    """
+    dashboard_service = DashboardService(db)
+    return dashboard_service.get_parent_dashboard(current_user.id)
@@ -0,0 +1,42 @@
+"""
+Pydantic schemas for dashboard aggregates.
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.sessions.schemas import SessionResponse
+from app.skills.schemas import SkillResponse
+from app.videos.schemas import VideoResponse
+from app.users.schemas import ParentResponse, StudentResponse
+
+
+class VolunteerSessionSummary(SessionResponse):
+    """A volunteer's session with its enrollment count."""
+    enrollment_count: int
+
+
+class VolunteerDashboard(BaseModel):
+    """Everything a volunteer's home page needs, in one response."""
+    sessions: List[VolunteerSessionSummary]
+    skills: List[SkillResponse]
+    videos: List[VideoResponse]
+    next_session: Optional[VolunteerSessionSummary]
+
+
+class EnrolledSession(BaseModel):
+    """An enrollment with its session and skill."""
+    enrollment_id: int
+    enrolled_at: datetime
+    session: SessionResponse
+    skill: SkillResponse
+
+
+class StudentWithEnrollments(StudentResponse):
+    """A student with every session they are enrolled in."""
+    enrollments: List[EnrolledSession]
+
+
+class ParentDashboard(BaseModel):
+    """Everything a parent's home page needs, in one response."""
+    parent: ParentResponse
+    students: List[StudentWithEnrollments]
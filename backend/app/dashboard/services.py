@@ -0,0 +1,142 @@
+"""
+Dashboard service layer - aggregates built with a fixed number of queries.
+"""
+from datetime import datetime, timezone
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.dashboard.schemas import (
+    VolunteerDashboard, VolunteerSessionSummary,
+    ParentDashboard, StudentWithEnrollments, EnrolledSession
+)
+from app.sessions.schemas import SessionResponse
+from app.sessions.models import Session as LearningSession
+from app.skills.models import Skill
+from app.users.models import Parent, Student, SessionEnrollment
+from app.users.schemas import StudentResponse
+from app.videos.models import Video
+
+dashboard_cache = TTLCache(ttl=settings.DASHBOARD_CACHE_SECONDS)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class DashboardService:
+    """Service for dashboard aggregates."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_volunteer_dashboard(self, volunteer_id: int) -> VolunteerDashboard:
+        """
+        Sessions with enrollment counts, skills, videos and the next upcoming
+        session for a volunteer. Three queries, cached briefly per user.
+        """
+        cache_key = ("volunteer", volunteer_id)
+        cached = dashboard_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        rows = (
+            self.db.query(LearningSession, func.count(SessionEnrollment.id))
+            .outerjoin(SessionEnrollment, SessionEnrollment.session_id == LearningSession.id)
+            .filter(LearningSession.volunteer_id == volunteer_id, LearningSession.deleted_at.is_(None))
+            .group_by(LearningSession.id)
+            .order_by(LearningSession.schedule)
+            .all()
+        )
+        sessions = [
+            VolunteerSessionSummary(
+                **SessionResponse.model_validate(session).model_dump(),
+                enrollment_count=count
+            )
+            for session, count in rows
+        ]
+
+        skills = (
+            self.db.query(Skill)
+            .filter(Skill.created_by == volunteer_id, Skill.deleted_at.is_(None))
+            .order_by(Skill.name)
+            .all()
+        )
+        videos = (
+            self.db.query(Video)
+            .join(Skill, Skill.id == Video.skill_id)
+            .filter(Video.created_by == volunteer_id, Skill.deleted_at.is_(None))
+            .order_by(Video.created_at.desc())
+            .all()
+        )
+
+        now = datetime.now(timezone.utc)
+        next_session = next(
+            (
+                session for session in sessions
+                if session.status == "scheduled" and _as_utc(session.schedule) >= now
+            ),
+            None
+        )
+
+        dashboard = VolunteerDashboard(
+            sessions=sessions,
+            skills=skills,
+            videos=videos,
+            next_session=next_session,
+        )
+        dashboard_cache.set(cache_key, dashboard)
+        return dashboard
+
+    def get_parent_dashboard(self, user_id: int) -> ParentDashboard:
+        """
+        The parent, their students, and each student's enrollments joined
+        with session and skill data. Three queries however many children
+        or enrollments there are.
+        """
+        parent = self.db.query(Parent).filter(Parent.user_id == user_id).first()
+        if not parent:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Parent account not found. Please complete registration."
+            )
+
+        students = (
+            self.db.query(Student)
+            .filter(Student.parent_id == parent.id)
+            .order_by(Student.id)
+            .all()
+        )
+
+        enrollments_by_student = {student.id: [] for student in students}
+        if students:
+            rows = (
+                self.db.query(SessionEnrollment, LearningSession, Skill)
+                .join(LearningSession, LearningSession.id == SessionEnrollment.session_id)
+                .join(Skill, Skill.id == LearningSession.skill_id)
+                .filter(
+                    SessionEnrollment.student_id.in_(list(enrollments_by_student)),
+                    LearningSession.deleted_at.is_(None)
+                )
+                .order_by(LearningSession.schedule)
+                .all()
+            )
+            for enrollment, session, skill in rows:
+                enrollments_by_student[enrollment.student_id].append(EnrolledSession(
+                    enrollment_id=enrollment.id,
+                    enrolled_at=enrollment.enrolled_at,
+                    session=session,
+                    skill=skill,
+                ))
+
+        return ParentDashboard(
+            parent=parent,
+            students=[
+                StudentWithEnrollments(
+                    **StudentResponse.model_validate(student).model_dump(),
+                    enrollments=enrollments_by_student[student.id]
+                )
+                for student in students
+            ],
+        )
@@ -1,6 +1,9 @@
 """
 Database connection and session management.
 """
+from typing import Callable
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -29,13 +32,57 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+def get_db(request: Request):
     """
     Dependency for getting database session.
     Yields a database session and closes it after use.
+    Batched sub-requests share the batch request's session instead.
+
+    The session only checks out a pool connection on its first query, so
+    requests rejected by validation or auth never touch the pool. Routes
+    using ``DBSessionRoute`` hand the connection back as soon as the
+    response is built, before it is sent to the client.
     """
+    shared = getattr(request.state, "db", None)
+    if shared is not None:
+        yield shared
+        return
+    
     db = SessionLocal()
+    request.state.owned_db = db
     try:
         yield db
     finally:
         db.close()
+
+
+class DBSessionRoute(APIRoute):
+    """
+    Route that releases the request's database session once the handler
+    has produced its response.
+
+    FastAPI runs the teardown of yield dependencies only after the whole
+    response has been sent, so a slow client would otherwise keep a pool
+    connection checked out while it downloads. Closing the session here
+    returns the connection immediately; ``get_db``'s own ``close()`` later
+    is a no-op. Streaming bodies are produced after this point, so they
+    must open their own session (as ``ExportService`` does).
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def release_db_handler(request: Request) -> Response:
+            try:
+                return await handler(request)
+            finally:
+                _release_db(request)
+
+        return release_db_handler
+
+
+def _release_db(request: Request) -> None:
+    """Close the session ``get_db`` opened for this request, if any."""
+    db = getattr(request.state, "owned_db", None)
+    if db is not None:
+        db.close()
@@ -0,0 +1,131 @@
+"""
+Request-scoped data loader for service lookups.
+
+A ``DataLoader`` lives on the SQLAlchemy session (``session.info``), so it
+has exactly the lifetime of a request's database session. It memoizes
+lookups by primary key or by another unique column (such as
+``Parent.user_id``), including misses, and batches lookups of the same kind
+into a single ``IN (...)`` query:
+- ``load_many`` fetches every key it has not seen in one query;
+- ``load_async`` collects keys requested in the same event-loop tick
+  (for example by concurrent batched sub-requests) and resolves them with
+  one ``load_many`` call.
+
+Memoized entries for a model are dropped whenever rows of that model are
+flushed, and everything is dropped on rollback, so callers never see
+stale results after a write.
+"""
+import asyncio
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple, Type
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_INFO_KEY = "data_loader"
+_MISSING = object()
+
+
+class DataLoader:
+    """Memoizing, batching loader bound to one database session."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._memo: Dict[Tuple[Type, str], Dict[Hashable, Any]] = {}
+        self._pending: Dict[Tuple[Type, str], Dict[Hashable, asyncio.Future]] = {}
+
+    def _memo_for(self, model: Type, attr: str) -> Dict[Hashable, Any]:
+        return self._memo.setdefault((model, attr), {})
+
+    def load(self, model: Type, value: Hashable, attr: str = "id") -> Optional[Any]:
+        """Return the row whose ``attr`` equals ``value`` (or None), querying at most once."""
+        cached = self._memo_for(model, attr).get(value, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        return self.load_many(model, [value], attr).get(value)
+
+    def load_many(self, model: Type, values: Iterable[Hashable], attr: str = "id") -> Dict[Hashable, Any]:
+        """Return ``{value: row}`` for the found rows, fetching all unseen values in one query."""
+        memo = self._memo_for(model, attr)
+        values = list(dict.fromkeys(values))
+        missing = [value for value in values if value not in memo]
+        if missing:
+            column = getattr(model, attr)
+            query = self.db.query(model).filter(column.in_(missing))
+            if hasattr(model, "deleted_at"):
+                # Soft-deleted rows read as missing
+                query = query.filter(model.deleted_at.is_(None))
+            rows = query.all()
+            found = {getattr(row, attr): row for row in rows}
+            for value in missing:
+                memo[value] = found.get(value)
+            if attr != "id":
+                id_memo = self._memo_for(model, "id")
+                for row in rows:
+                    id_memo[row.id] = row
+        return {value: memo[value] for value in values if memo[value] is not None}
+
+    async def load_async(self, model: Type, value: Hashable, attr: str = "id") -> Optional[Any]:
+        """Like ``load``, but coalesces lookups made in the same event-loop tick."""
+        cached = self._memo_for(model, attr).get(value, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        key = (model, attr)
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = {}
+            loop.call_soon(self._dispatch, key)
+        future = pending.get(value)
+        if future is None:
+            future = pending[value] = loop.create_future()
+        return await future
+
+    def _dispatch(self, key: Tuple[Type, str]) -> None:
+        pending = self._pending.pop(key, {})
+        model, attr = key
+        try:
+            found = self.load_many(model, list(pending), attr)
+        except Exception as exc:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for value, future in pending.items():
+            if not future.done():
+                future.set_result(found.get(value))
+
+    def prime(self, model: Type, row: Any, attr: str = "id") -> None:
+        """Seed the memo with a row loaded elsewhere."""
+        self._memo_for(model, attr)[getattr(row, attr)] = row
+
+    def forget(self, model: Optional[Type] = None) -> None:
+        """Drop memoized lookups for one model, or for all models."""
+        if model is None:
+            self._memo.clear()
+            return
+        for key in [key for key in self._memo if key[0] is model]:
+            del self._memo[key]
+
+
+def get_loader(db: Session) -> DataLoader:
+    """Return the data loader for a database session, creating it on first use."""
+    loader = db.info.get(_INFO_KEY)
+    if loader is None:
+        loader = db.info[_INFO_KEY] = DataLoader(db)
+    return loader
+
+
+@event.listens_for(Session, "after_flush")
+def _forget_flushed(session: Session, flush_context) -> None:
+    loader = session.info.get(_INFO_KEY)
+    if loader is None:
+        return
+    for model in {type(obj) for obj in (*session.new, *session.dirty, *session.deleted)}:
+        loader.forget(model)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction) -> None:
+    loader = session.info.get(_INFO_KEY)
+    if loader is not None:
+        loader.forget()
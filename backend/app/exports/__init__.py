@@ -0,0 +1 @@
+"""Exports microservice package."""
@@ -0,0 +1,35 @@
+"""
+Export routers - API endpoints for streaming admin exports.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.core.dependencies import require_admin
+from app.db.database import DBSessionRoute
+from app.users.models import User
+from app.exports.services import ExportService, EXPORT_FORMATS
+
+router = APIRouter(prefix="/exports", tags=["exports"], route_class=DBSessionRoute)
+
+
+@router.get("/{resource}")
+async def export_resource(
+    resource: str,
+    format: str = "ndjson",
+    current_user: User = Depends(require_admin)
+):
+    """
+    Stream a full export of users, students, sessions or enrollments (admin only).
+    Supported formats: ndjson (default) and csv.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    export_service = ExportService(resource)
+    return StreamingResponse(
+        export_service.stream(format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'}
+    )
@@ -0,0 +1,103 @@
+"""
+Export service layer - streams full table exports for admin reporting.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Dict, Iterator, List
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.users.models import User, Student, SessionEnrollment
+from app.sessions.models import Session
+
+
+# Exportable resources, keyed by the name used in the URL
+EXPORT_MODELS = {
+    "users": User,
+    "students": Student,
+    "sessions": Session,
+    "enrollments": SessionEnrollment,
+}
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _serialize(value):
+    """Convert a column value into a JSON/CSV friendly value."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    """
+    Service for streaming exports.
+
+    Rows are read as plain column tuples through a server-side cursor
+    (``yield_per``), so memory stays constant however large the table is.
+    Each export uses its own database session, because the response body
+    is produced after the request handler has returned.
+    """
+
+    def __init__(self, resource: str, batch_size: int = None):
+        if resource not in EXPORT_MODELS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown export. Available: {', '.join(EXPORT_MODELS)}"
+            )
+        self.model = EXPORT_MODELS[resource]
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names in export order."""
+        return [column.name for column in self.model.__table__.columns]
+
+    def iter_batches(self) -> Iterator[List[Dict]]:
+        """Yield rows in batches of ``batch_size`` dicts, ordered by primary key."""
+        table = self.model.__table__
+        statement = (
+            select(*table.columns)
+            .order_by(table.c.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        db = SessionLocal()
+        try:
+            result = db.execute(statement)
+            for partition in result.partitions():
+                yield [
+                    {key: _serialize(value) for key, value in row._mapping.items()}
+                    for row in partition
+                ]
+        finally:
+            db.close()
+
+    def stream_ndjson(self) -> Iterator[str]:
+        """Stream rows as newline-delimited JSON, one chunk per batch."""
+        for batch in self.iter_batches():
+            yield "".join(json.dumps(row) + "\n" for row in batch)
+
+    def stream_csv(self) -> Iterator[str]:
+        """Stream rows as CSV with a header line, one chunk per batch."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.columns)
+        writer.writeheader()
+        yield buffer.getvalue()
+
+        for batch in self.iter_batches():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(batch)
+            yield buffer.getvalue()
+
+    def stream(self, export_format: str) -> Iterator[str]:
+        """Stream rows in the requested format."""
+        if export_format == "csv":
+            return self.stream_csv()
+        return self.stream_ndjson()
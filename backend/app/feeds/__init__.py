@@ -0,0 +1 @@
+"""Calendar feeds microservice package."""
@@ -0,0 +1,116 @@
+"""
+In-process cache for generated calendar feeds.
+
+Feeds are rendered once and kept until a session or enrollment that
+appears in them changes. The session services invalidate after their
+commit, and jobs hand invalidations to ``invalidate_on_commit`` so they
+only happen once the job's transaction is visible. A feed rendered while
+an invalidation lands is returned but not stored (each key carries a
+generation that invalidation bumps).
+
+The cache is per process: writes made by other API workers or by the job
+worker are only picked up when entries expire, after
+``FEED_CACHE_SECONDS``.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+_PENDING_KEY = "feeds_invalidated"
+
+
+@dataclass(frozen=True)
+class CachedFeed:
+    """A rendered feed with its HTTP validators."""
+    body: str
+    etag: str
+    last_modified: datetime
+
+
+class FeedCache:
+    """Thread-safe cache of rendered feeds keyed by (kind, owner id)."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, CachedFeed]] = {}
+        self._generations: Dict[Tuple[str, int], int] = {}
+        self._epoch = 0  # Bumped by clear()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, kind: str, owner_id: int, build: Callable[[], str]) -> CachedFeed:
+        """Return the cached feed, rendering it with ``build`` on a miss."""
+        key = (kind, owner_id)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+            generation = (self._epoch, self._generations.get(key, 0))
+
+        body = build()
+        entry = CachedFeed(
+            body=body,
+            etag='"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"',
+            last_modified=datetime.now(timezone.utc).replace(microsecond=0),
+        )
+        with self._lock:
+            if (self._epoch, self._generations.get(key, 0)) != generation:
+                # Invalidated while rendering: the body may predate the change
+                return entry
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                # Keep an entry stored by a concurrent build so validators stay stable
+                return cached[1]
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            return entry
+
+    def invalidate(self, kind: str, owner_ids: Iterable[Optional[int]]) -> None:
+        """Drop cached feeds for the given owners."""
+        with self._lock:
+            for owner_id in owner_ids:
+                key = (kind, owner_id)
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def invalidate_volunteer(self, volunteer_id: int) -> None:
+        """Drop a volunteer's feed."""
+        self.invalidate("volunteer", [volunteer_id])
+
+    def invalidate_students(self, student_ids: Iterable[int]) -> None:
+        """Drop the feeds of several students."""
+        self.invalidate("student", student_ids)
+
+    def clear(self) -> None:
+        """Drop every cached feed."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+
+feed_cache = FeedCache(ttl=settings.FEED_CACHE_SECONDS)
+
+
+def invalidate_on_commit(db: Session, kind: str, owner_ids: Iterable[Optional[int]]) -> None:
+    """
+    Drop feeds once the caller's transaction commits; a rollback drops
+    nothing. For writers that do not commit themselves, such as jobs.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update((kind, owner_id) for owner_id in owner_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    keys = session.info.pop(_PENDING_KEY, None)
+    for kind, owner_id in keys or ():
+        feed_cache.invalidate(kind, [owner_id])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_invalidations(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
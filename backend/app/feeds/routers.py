@@ -0,0 +1,107 @@
+"""
+Calendar feed routers - subscribable .ics endpoints.
+"""
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import get_current_user
+from app.users.models import User
+from app.feeds.cache import CachedFeed
+from app.feeds.schemas import FeedLink, FeedLinks
+from app.feeds.services import CalendarFeedService, feed_token, verify_feed_token
+
+router = APIRouter(prefix="/feeds", tags=["feeds"], route_class=DBSessionRoute)
+
+CALENDAR_MEDIA_TYPE = "text/calendar"
+
+
+def _not_modified(request: Request, feed: CachedFeed) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against a cached feed."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return feed.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return feed.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _feed_response(request: Request, feed: CachedFeed) -> Response:
+    """Build a 200 or 304 response carrying the feed validators."""
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": format_datetime(feed.last_modified, usegmt=True),
+        "Cache-Control": "private, max-age=300",
+    }
+    if _not_modified(request, feed):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=feed.body, media_type=CALENDAR_MEDIA_TYPE, headers=headers)
+
+
+def _check_token(kind: str, owner_id: int, token: str) -> None:
+    if not verify_feed_token(kind, owner_id, token):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Feed not found"
+        )
+
+
+@router.get("/me", response_model=FeedLinks)
+async def get_my_feeds(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the subscribable feed URLs for the current user.
+    Volunteers get their teaching feed, parents get one feed per student.
+    """
+    feeds = []
+    if current_user.role in ["VOLUNTEER", "ADMIN"]:
+        path = request.url_for("get_volunteer_feed", volunteer_id=current_user.id)
+        feeds.append(FeedLink(
+            kind="volunteer",
+            owner_id=current_user.id,
+            url=f"{path}?token={feed_token('volunteer', current_user.id)}"
+        ))
+    if current_user.parent:
+        for student in current_user.parent.students:
+            path = request.url_for("get_student_feed", student_id=student.id)
+            feeds.append(FeedLink(
+                kind="student",
+                owner_id=student.id,
+                name=student.name,
+                url=f"{path}?token={feed_token('student', student.id)}"
+            ))
+    return FeedLinks(feeds=feeds)
+
+
+@router.get("/volunteers/{volunteer_id}.ics", name="get_volunteer_feed")
+async def get_volunteer_feed(
+    volunteer_id: int,
+    token: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """iCalendar feed of a volunteer's sessions (authorized by feed token)."""
+    _check_token("volunteer", volunteer_id, token)
+    feed = CalendarFeedService(db).get_volunteer_feed(volunteer_id)
+    return _feed_response(request, feed)
+
+
+@router.get("/students/{student_id}.ics", name="get_student_feed")
+async def get_student_feed(
+    student_id: int,
+    token: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """iCalendar feed of a student's enrolled sessions (authorized by feed token)."""
+    _check_token("student", student_id, token)
+    feed = CalendarFeedService(db).get_student_feed(student_id)
+    return _feed_response(request, feed)
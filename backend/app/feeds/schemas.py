@@ -0,0 +1,18 @@
+"""
+Pydantic schemas for calendar feeds.
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class FeedLink(BaseModel):
+    """A subscribable calendar feed URL."""
+    kind: str = Field(..., description="Feed kind: volunteer or student")
+    owner_id: int = Field(..., description="Volunteer user ID or student ID")
+    name: Optional[str] = Field(None, description="Display name (student name for student feeds)")
+    url: str = Field(..., description="Feed URL, including its access token")
+
+
+class FeedLinks(BaseModel):
+    """All feeds available to the current user."""
+    feeds: List[FeedLink]
@@ -0,0 +1,131 @@
+"""
+Calendar feed service layer - builds iCalendar (.ics) feeds.
+"""
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session as DBSession
+from app.core.config import settings
+from app.feeds.cache import feed_cache, CachedFeed
+from app.sessions.models import Session
+from app.users.models import SessionEnrollment
+
+PRODID = "-//Nonprofit Learning Platform//Sessions//EN"
+
+
+def feed_token(kind: str, owner_id: int) -> str:
+    """
+    Signed token that authorizes reading one feed without a login.
+    Feeds are refused (503) until a dedicated ``CALENDAR_FEED_SECRET`` is set.
+    """
+    if not settings.CALENDAR_FEED_SECRET:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Calendar feeds are not configured"
+        )
+    secret = settings.CALENDAR_FEED_SECRET.encode("utf-8")
+    message = f"{kind}:{owner_id}".encode("utf-8")
+    return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+
+def verify_feed_token(kind: str, owner_id: int, token: str) -> bool:
+    """Check a feed token in constant time."""
+    return hmac.compare_digest(feed_token(kind, owner_id), token or "")
+
+
+def _format_datetime(value: datetime) -> str:
+    """Format a datetime as an iCalendar UTC timestamp."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _escape(text: str) -> str:
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line to 75 octets (RFC 5545 section 3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte character
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def render_calendar(name: str, sessions: List[Session]) -> str:
+    """Render sessions as a VCALENDAR document."""
+    stamp = _format_datetime(datetime.now(timezone.utc))
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    for session in sessions:
+        lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:session-{session.id}@nonprofit-learning",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_format_datetime(session.schedule)}",
+            f"DTEND:{_format_datetime(session.ends_at)}",
+            f"SUMMARY:{_escape(session.title)}",
+        ])
+        if session.description:
+            lines.append(f"DESCRIPTION:{_escape(session.description)}")
+        if session.meeting_link:
+            lines.append(f"URL:{session.meeting_link}")
+            lines.append(f"LOCATION:{_escape(session.meeting_link)}")
+        lines.append("STATUS:CANCELLED" if session.status == "cancelled" else "STATUS:CONFIRMED")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+class CalendarFeedService:
+    """Service for building and caching calendar feeds."""
+
+    def __init__(self, db: DBSession):
+        self.db = db
+
+    def get_volunteer_feed(self, volunteer_id: int) -> CachedFeed:
+        """Feed of every session a volunteer teaches."""
+        def build() -> str:
+            from app.sessions.services import SessionService
+            sessions = SessionService(self.db).get_by_volunteer(volunteer_id)
+            return render_calendar("My teaching sessions", sessions)
+
+        return feed_cache.get_or_build("volunteer", volunteer_id, build)
+
+    def get_student_feed(self, student_id: int) -> CachedFeed:
+        """Feed of every session a student is enrolled in."""
+        def build() -> str:
+            sessions = (
+                self.db.query(Session)
+                .join(SessionEnrollment, SessionEnrollment.session_id == Session.id)
+                .filter(SessionEnrollment.student_id == student_id, Session.deleted_at.is_(None))
+                .order_by(Session.schedule)
+                .all()
+            )
+            return render_calendar("Learning sessions", sessions)
+
+        return feed_cache.get_or_build("student", student_id, build)
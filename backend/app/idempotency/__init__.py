@@ -0,0 +1 @@
+"""Idempotency keys microservice package."""
@@ -0,0 +1,23 @@
+"""
+Idempotency key models for replaying stored POST responses.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class IdempotencyRecord(Base):
+    """
+    IdempotencyRecord model - the stored outcome of one keyed request.
+    A row without a status code is a request still being processed.
+    """
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, nullable=False)  # "<caller>:<Idempotency-Key>", caller = hash of the Authorization header or client IP
+    request_hash = Column(String(64), nullable=False)  # Method, path, query and body
+    status_code = Column(Integer, nullable=True)
+    response_headers = Column(Text, nullable=True)  # JSON list of [name, value]
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,338 @@
+"""
+Idempotency service layer - stores keyed responses and replays them.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.idempotency.models import IdempotencyRecord
+
+logger = logging.getLogger("app")
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Outcomes that depend on the moment rather than the request are not stored,
+# so a retry after fixing auth or waiting out a limit runs normally
+UNCACHED_STATUSES = {401, 403, 408, 409, 429}
+
+# Headers recomputed or meaningless on replay
+SKIPPED_HEADERS = {b"content-length", b"date", b"server", b"set-cookie"}
+
+# Minimum seconds between sweeps of expired keys
+PURGE_INTERVAL_SECONDS = 300
+
+
+@dataclass
+class StoredResponse:
+    """A captured response, detached from the database session."""
+    request_hash: str
+    status_code: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyStore:
+    """
+    Database-backed store of keyed responses, shared by every worker.
+
+    A key is claimed by inserting a row without a status code; the row's
+    ``expires_at`` is first the processing lease, then the replay lifetime.
+    Any row past ``expires_at`` (an expired result, or a lease abandoned by a
+    crashed worker) may be taken over.
+    """
+
+    def __init__(self, ttl_seconds: int, lease_seconds: int):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self._last_purge = datetime.min.replace(tzinfo=timezone.utc)
+
+    def begin(self, key: str, request_hash: str) -> Tuple[str, Optional[StoredResponse]]:
+        """
+        Claim a key or find its stored outcome.
+
+        Returns one of ``("claimed", None)``, ``("replay", response)``,
+        ``("busy", None)`` when another worker holds the lease, or
+        ``("mismatch", None)`` when the key was used for a different request.
+        """
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            db.add(IdempotencyRecord(key=key, request_hash=request_hash, expires_at=now + self.lease))
+            try:
+                db.commit()
+                return "claimed", None
+            except IntegrityError:
+                db.rollback()
+
+            taken = db.execute(
+                update(IdempotencyRecord)
+                .where(IdempotencyRecord.key == key, IdempotencyRecord.expires_at < now)
+                .values(
+                    request_hash=request_hash,
+                    status_code=None,
+                    response_headers=None,
+                    response_body=None,
+                    expires_at=now + self.lease,
+                )
+            )
+            db.commit()
+            if taken.rowcount:
+                return "claimed", None
+
+            record = db.query(IdempotencyRecord).filter(IdempotencyRecord.key == key).first()
+            if record is None:
+                # Deleted between our statements: the caller may simply retry
+                return "busy", None
+            if record.request_hash != request_hash:
+                return "mismatch", None
+            if record.status_code is None:
+                return "busy", None
+            return "replay", StoredResponse(
+                request_hash=record.request_hash,
+                status_code=record.status_code,
+                headers=[
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in json.loads(record.response_headers or "[]")
+                ],
+                body=record.response_body or b"",
+            )
+        finally:
+            db.close()
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """Store the outcome of a claimed key for replay."""
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(IdempotencyRecord)
+                .where(IdempotencyRecord.key == key)
+                .values(
+                    status_code=response.status_code,
+                    response_headers=json.dumps([
+                        [name.decode("latin-1"), value.decode("latin-1")]
+                        for name, value in response.headers
+                    ]),
+                    response_body=response.body,
+                    expires_at=now + self.ttl,
+                )
+            )
+            db.commit()
+            self._purge_expired(db, now)
+        finally:
+            db.close()
+
+    def release(self, key: str) -> None:
+        """Give up a claimed key without storing anything, so it can be retried."""
+        db = SessionLocal()
+        try:
+            db.execute(
+                delete(IdempotencyRecord)
+                .where(IdempotencyRecord.key == key, IdempotencyRecord.status_code.is_(None))
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _purge_expired(self, db, now: datetime) -> None:
+        """Delete expired rows, at most once per ``PURGE_INTERVAL_SECONDS``."""
+        if (now - self._last_purge).total_seconds() < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at < now))
+        db.commit()
+
+
+def request_fingerprint(scope, body: bytes) -> str:
+    """Hash of what makes two requests "the same" for one key."""
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware honouring the ``Idempotency-Key`` header on POST requests.
+
+    The first response for a key (scoped to the caller) is stored and every
+    repeat of the same request gets it back, marked ``Idempotent-Replayed:
+    true``, without reaching the routes. A repeat arriving while the first is
+    still running in this worker waits for it; in another worker it gets 409
+    with Retry-After. Reusing a key for a different request is a 422.
+    Server errors are not stored, so those requests can be retried.
+    """
+
+    def __init__(self, app, store: IdempotencyStore):
+        self.app = app
+        self.store = store
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope.get("state", {}).get("batch"):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        raw_key = headers.get(HEADER)
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            await _respond(send, 400, b'{"detail":"Idempotency-Key must be 1-255 characters"}')
+            return
+
+        body, receive = await _buffer_body(receive)
+        request_hash = request_fingerprint(scope, body)
+        key = f"{_caller(scope, headers)}:{raw_key.decode('latin-1')}"
+
+        running = self._in_flight.get(key)
+        if running is not None:
+            stored = await asyncio.shield(running)
+            if stored is not None and stored.request_hash == request_hash:
+                await _replay(send, stored)
+                return
+            if stored is not None:
+                await _mismatch(send)
+                return
+            # The first attempt failed without storing anything; run again
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        result: Optional[StoredResponse] = None
+        claimed = False
+        try:
+            outcome, stored = await run_in_threadpool(self.store.begin, key, request_hash)
+            if outcome == "replay":
+                result = stored
+                await _replay(send, stored)
+            elif outcome == "mismatch":
+                await _mismatch(send)
+            elif outcome == "busy":
+                await _respond(
+                    send, 409, b'{"detail":"A request with this Idempotency-Key is in progress"}',
+                    [(b"retry-after", b"1")]
+                )
+            else:
+                claimed = True
+                result = await self._run(scope, receive, send, request_hash)
+        finally:
+            self._in_flight.pop(key, None)
+            future.set_result(result)
+            if claimed:
+                await self._record(key, result)
+
+    async def _run(self, scope, receive, send, request_hash: str) -> Optional[StoredResponse]:
+        """Run the request, streaming the response while keeping a copy."""
+        captured = StoredResponse(request_hash, 500, [], b"")
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                captured.status_code = message["status"]
+                captured.headers = [
+                    (name, value) for name, value in message.get("headers", [])
+                    if name.lower() not in SKIPPED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        captured.body = b"".join(chunks)
+        if captured.status_code >= 500 or captured.status_code in UNCACHED_STATUSES:
+            return None
+        return captured
+
+    async def _record(self, key: str, result: Optional[StoredResponse]) -> None:
+        try:
+            if result is not None:
+                await run_in_threadpool(self.store.complete, key, result)
+            else:
+                await run_in_threadpool(self.store.release, key)
+        except Exception:
+            # The lease simply runs out and the key becomes reusable
+            logger.exception("Could not record idempotency key outcome")
+
+
+def _caller(scope, headers: Dict[bytes, bytes]) -> str:
+    """
+    Scope keys per credential, so one caller can never replay another's
+    response. Token signatures are not verified here, so the token's
+    ``sub`` alone would let anyone forge a token for a user whose key they
+    know; the whole Authorization header is hashed instead. A retry must
+    therefore carry the same token to be replayed.
+    """
+    authorization = headers.get(b"authorization")
+    if authorization:
+        return "auth:" + hashlib.sha256(authorization).hexdigest()
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+async def _buffer_body(receive):
+    """Read the whole request body and return it with a receive that replays it."""
+    parts = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        parts.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(parts)
+    sent = False
+
+    async def replay_receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay_receive
+
+
+async def _respond(send, status: int, body: bytes, extra_headers=()) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            *extra_headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send, stored: StoredResponse) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": stored.status_code,
+        "headers": [
+            *stored.headers,
+            (b"content-length", str(len(stored.body)).encode("latin-1")),
+            (b"idempotent-replayed", b"true"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+async def _mismatch(send) -> None:
+    await _respond(send, 422, b'{"detail":"Idempotency-Key was already used for a different request"}')
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+)
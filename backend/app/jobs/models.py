@@ -0,0 +1,31 @@
+"""
+Job models for the transactional outbox.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class OutboxJob(Base):
+    """
+    OutboxJob model - a side effect to run after a domain change commits.
+    Written in the same transaction as the change, then claimed by a worker.
+    """
+    __tablename__ = "outbox_jobs"
+    __table_args__ = (
+        # Serves the claim query: due pending jobs in run_at order
+        Index("ix_outbox_jobs_status_run_at", "status", "run_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # Handler name, e.g. "session.changed"
+    payload = Column(Text, nullable=False, default="{}")  # JSON
+    status = Column(String, nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String, nullable=True)  # Claim token of the worker running it
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
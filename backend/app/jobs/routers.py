@@ -0,0 +1,29 @@
+"""
+Job routers - API endpoints for background job metrics.
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import require_admin
+from app.users.models import User
+from app.jobs.schemas import JobStats
+from app.jobs.services import JobQueue
+from app.jobs.worker import job_workers
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=DBSessionRoute)
+
+
+@router.get("/stats", response_model=JobStats)
+async def get_job_stats(
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get outbox queue depth by status and lag of the oldest due job (admin only).
+    Worker counters cover this process only.
+    """
+    return {
+        **JobQueue(db).stats(),
+        "workers_running": job_workers.running,
+        "worker_counters": dict(job_workers.counters),
+    }
@@ -0,0 +1,14 @@
+"""
+Pydantic schemas for background job metrics.
+"""
+from pydantic import BaseModel
+from typing import Dict
+
+
+class JobStats(BaseModel):
+    """Outbox queue state and this process's worker counters."""
+    counts: Dict[str, int]
+    due: int
+    lag_seconds: float
+    workers_running: bool
+    worker_counters: Dict[str, int]
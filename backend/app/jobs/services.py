@@ -0,0 +1,200 @@
+"""
+Job service layer - outbox writes, job claiming and retries.
+"""
+import json
+import random
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.jobs.models import OutboxJob
+
+JobHandler = Callable[[Session, Dict[str, Any]], None]
+
+# Registered handlers by job kind (see ``job_handler``)
+HANDLERS: Dict[str, JobHandler] = {}
+
+# Set after a commit that enqueued jobs, so in-process workers skip the poll wait
+wakeup = threading.Event()
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register the function that runs jobs of ``kind``.
+
+    Handlers receive their own database session and the job payload. Their
+    writes commit together with the job being marked done; raising an
+    exception rolls them back and schedules a retry.
+    """
+    def register(func: JobHandler) -> JobHandler:
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+@dataclass
+class ClaimedJob:
+    """A claimed job, detached from the session that claimed it."""
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+class OutboxService:
+    """Service for writing jobs into the outbox."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        run_at: Optional[datetime] = None,
+        max_attempts: Optional[int] = None
+    ) -> OutboxJob:
+        """
+        Add a job to the current transaction.
+        It only becomes visible to workers if the caller's commit succeeds.
+        """
+        job = OutboxJob(
+            kind=kind,
+            payload=json.dumps(payload),
+            status="pending",
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_at=run_at or datetime.now(timezone.utc),
+        )
+        self.db.add(job)
+        self.db.info["outbox_enqueued"] = True
+        return job
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session: Session) -> None:
+    if session.info.pop("outbox_enqueued", False):
+        wakeup.set()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_enqueued(session: Session, previous_transaction) -> None:
+    session.info.pop("outbox_enqueued", None)
+
+
+class JobQueue:
+    """Claims due jobs and records their outcome."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim(self, limit: int) -> List[ClaimedJob]:
+        """
+        Claim up to ``limit`` due jobs for this worker.
+
+        On PostgreSQL the candidate rows are locked with FOR UPDATE SKIP
+        LOCKED, so concurrent workers pick disjoint batches without waiting
+        on each other; the conditional UPDATE keeps the claim exclusive on
+        databases without row locks (SQLite). Jobs whose worker lease ran
+        out are put back first.
+        """
+        now = datetime.now(timezone.utc)
+        token = uuid.uuid4().hex
+        self.db.execute(
+            update(OutboxJob)
+            .where(
+                OutboxJob.status == "running",
+                OutboxJob.locked_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            )
+            .values(status="pending", locked_by=None, locked_at=None)
+        )
+        ids = self.db.execute(
+            select(OutboxJob.id)
+            .where(OutboxJob.status == "pending", OutboxJob.run_at <= now)
+            .order_by(OutboxJob.run_at, OutboxJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            self.db.commit()
+            return []
+        self.db.execute(
+            update(OutboxJob)
+            .where(OutboxJob.id.in_(ids), OutboxJob.status == "pending")
+            .values(status="running", locked_by=token, locked_at=now, attempts=OutboxJob.attempts + 1)
+        )
+        self.db.commit()
+        rows = self.db.execute(
+            select(OutboxJob.id, OutboxJob.kind, OutboxJob.payload, OutboxJob.attempts, OutboxJob.max_attempts)
+            .where(OutboxJob.locked_by == token, OutboxJob.status == "running")
+            .order_by(OutboxJob.run_at, OutboxJob.id)
+        ).all()
+        self.db.commit()
+        return [
+            ClaimedJob(id=row.id, kind=row.kind, payload=json.loads(row.payload),
+                       attempts=row.attempts, max_attempts=row.max_attempts)
+            for row in rows
+        ]
+
+    def mark_done(self, job: ClaimedJob) -> None:
+        """Mark a job done; commits along with the handler's own writes."""
+        self.db.execute(
+            update(OutboxJob)
+            .where(OutboxJob.id == job.id)
+            .values(status="done", completed_at=datetime.now(timezone.utc), last_error=None)
+        )
+        self.db.commit()
+
+    def mark_failed(self, job: ClaimedJob, error: str) -> bool:
+        """
+        Schedule a retry with exponential backoff and jitter, or give up once
+        the job is out of attempts. Returns True if it will be retried.
+        """
+        now = datetime.now(timezone.utc)
+        retry = job.attempts < job.max_attempts
+        values: Dict[str, Any] = {"last_error": error[:2000], "locked_by": None, "locked_at": None}
+        if retry:
+            delay = min(
+                settings.JOB_RETRY_MAX_SECONDS,
+                settings.JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            ) * random.uniform(0.5, 1.5)
+            values.update(status="pending", run_at=now + timedelta(seconds=delay))
+        else:
+            values.update(status="failed", completed_at=now)
+        self.db.execute(update(OutboxJob).where(OutboxJob.id == job.id).values(**values))
+        self.db.commit()
+        return retry
+
+    def prune(self, older_than: timedelta) -> int:
+        """Delete finished jobs completed before ``older_than`` ago."""
+        cutoff = datetime.now(timezone.utc) - older_than
+        result = self.db.execute(
+            delete(OutboxJob).where(OutboxJob.status == "done", OutboxJob.completed_at < cutoff)
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts by status and how far behind the due pending jobs are."""
+        now = datetime.now(timezone.utc)
+        counts = dict(
+            self.db.query(OutboxJob.status, func.count(OutboxJob.id)).group_by(OutboxJob.status).all()
+        )
+        oldest_due = self.db.query(func.min(OutboxJob.run_at)).filter(
+            OutboxJob.status == "pending", OutboxJob.run_at <= now
+        ).scalar()
+        due = self.db.query(func.count(OutboxJob.id)).filter(
+            OutboxJob.status == "pending", OutboxJob.run_at <= now
+        ).scalar()
+        if oldest_due is not None and oldest_due.tzinfo is None:
+            oldest_due = oldest_due.replace(tzinfo=timezone.utc)  # SQLite drops the zone
+        return {
+            "counts": {status: counts.get(status, 0) for status in ("pending", "running", "done", "failed")},
+            "due": due,
+            "lag_seconds": round((now - oldest_due).total_seconds(), 3) if oldest_due else 0.0,
+        }
@@ -0,0 +1,158 @@
+"""
+Background job workers.
+
+Runs inside the API process when ``JOB_WORKER_ENABLED`` is set, or on its
+own with::
+
+    python -m app.jobs.worker
+"""
+import importlib
+import logging
+import signal
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.jobs.services import HANDLERS, ClaimedJob, JobQueue, wakeup
+
+logger = logging.getLogger("app")
+
+# Modules that register job handlers; imported when the workers start
+HANDLER_MODULES = (
+    "app.sessions.jobs",
+    "app.skills.jobs",
+    "app.videos.enrichment",
+    "app.reports.rollups",
+)
+
+# Seconds between sweeps of old finished jobs
+PRUNE_INTERVAL_SECONDS = 600
+
+
+class JobWorkerPool:
+    """Threads that claim due outbox jobs in batches and run their handlers."""
+
+    def __init__(self, threads: int, batch_size: int, poll_seconds: float):
+        self.threads = threads
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.counters: Dict[str, int] = {"succeeded": 0, "retried": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """Start the worker threads (no-op if already running)."""
+        if self._workers:
+            return
+        for module in HANDLER_MODULES:
+            importlib.import_module(module)
+        self._stop.clear()
+        for number in range(self.threads):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the workers to finish their current batch and wait for them."""
+        self._stop.set()
+        wakeup.set()
+        for thread in self._workers:
+            thread.join(timeout)
+        self._workers = []
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception:
+                logger.exception("Job worker failed to claim jobs")
+                processed = 0
+            if processed < self.batch_size:
+                wakeup.wait(self.poll_seconds)
+                wakeup.clear()
+
+    def run_once(self) -> int:
+        """Claim and run one batch; returns how many jobs it ran."""
+        db = SessionLocal()
+        try:
+            jobs = JobQueue(db).claim(self.batch_size)
+        finally:
+            db.close()
+        for job in jobs:
+            self._execute(job)
+        self._maybe_prune()
+        return len(jobs)
+
+    def _execute(self, job: ClaimedJob) -> None:
+        handler = HANDLERS.get(job.kind)
+        db = SessionLocal()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {job.kind!r}")
+            handler(db, job.payload)
+            JobQueue(db).mark_done(job)
+            self._count("succeeded")
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+            try:
+                retried = JobQueue(db).mark_failed(job, f"{type(exc).__name__}: {exc}")
+                self._count("retried" if retried else "failed")
+            except Exception:
+                # Left running; the lease expiry puts it back in the queue
+                logger.exception("Could not record failure of job %s", job.id)
+        finally:
+            db.close()
+
+    def _maybe_prune(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+                return
+            self._last_prune = now
+        db = SessionLocal()
+        try:
+            JobQueue(db).prune(timedelta(hours=settings.JOB_RETENTION_HOURS))
+        finally:
+            db.close()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+
+job_workers = JobWorkerPool(
+    threads=settings.JOB_WORKER_THREADS,
+    batch_size=settings.JOB_BATCH_SIZE,
+    poll_seconds=settings.JOB_POLL_SECONDS,
+)
+
+
+def main() -> None:
+    """Run the worker pool in the foreground until interrupted."""
+    logging.basicConfig(level=logging.INFO)
+    # Map every model before the first query resolves relationships
+    from app.users.models import User, Parent, Student, SessionEnrollment  # noqa: F401
+    from app.skills.models import Skill  # noqa: F401
+    from app.sessions.models import Session  # noqa: F401
+    from app.videos.models import Video  # noqa: F401
+    from app.tags.models import Tag  # noqa: F401
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    job_workers.start()
+    logger.info("Job workers started (%s threads)", job_workers.threads)
+    stopped.wait()
+    job_workers.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,24 @@ from app.users.routers import router as users_router
 from app.skills.routers import router as skills_router
 from app.sessions.routers import router as sessions_router
 from app.videos.routers import router as videos_router
+from app.exports.routers import router as exports_router
+from app.feeds.routers import router as feeds_router
+from app.search.routers import router as search_router
+from app.dashboard.routers import router as dashboard_router
+from app.batch.routers import router as batch_router
+from app.jobs.routers import router as jobs_router
+from app.tags.routers import router as tags_router
+from app.reports.routers import router as reports_router
+from app.jobs.worker import job_workers
+from app.reminders.scheduler import reminder_scheduler
+from app.videos.progress import progress_buffer
+from app.sessions.attendance import attendance_queue
+from app.reports.rollups import schedule_refresh as schedule_report_refresh
+from app.search.services import ensure_sqlite_index
+from app.skills.autocomplete import get_autocomplete_index
+from app.core.ratelimit import RateLimitMiddleware, build_rate_limiter
+from app.core.concurrency import ConcurrencyLimitMiddleware, concurrency_limiter
+from app.idempotency.services import IdempotencyMiddleware, idempotency_store
 from sqlalchemy import create_engine, text
 from app.db.database import engine
 
@@ -42,6 +60,69 @@ async def log_missing_config() -> None:
             ", ".join(missing),
         )
 
+
+# SQLite has no migrations for the FTS5 search table; create it on startup
+@app.on_event("startup")
+async def prepare_search_index() -> None:
+    try:
+        ensure_sqlite_index(engine)
+    except Exception:
+        logger.exception("Could not prepare the SQLite search index")
+
+# Build the skill autocomplete index in the background before the first keystroke
+@app.on_event("startup")
+async def warm_autocomplete_index() -> None:
+    get_autocomplete_index()
+
+# Outbox job workers and the reminder scheduler run alongside the API unless
+# deployed as separate processes
+@app.on_event("startup")
+async def start_job_workers() -> None:
+    if settings.JOB_WORKER_ENABLED:
+        job_workers.start()
+    if settings.REMINDERS_ENABLED:
+        reminder_scheduler.start()
+
+
+# Video progress events and check-ins are buffered in each API process; their writers always run
+@app.on_event("startup")
+async def start_progress_flusher() -> None:
+    progress_buffer.start()
+    attendance_queue.start()
+
+
+# Keep the weekly report rollups refreshing; surplus schedules stop themselves
+@app.on_event("startup")
+async def schedule_report_rollups() -> None:
+    try:
+        schedule_report_refresh()
+    except Exception:
+        logger.exception("Could not schedule the weekly report refresh")
+
+
+@app.on_event("shutdown")
+async def stop_job_workers() -> None:
+    progress_buffer.stop(timeout=10)  # Final flush
+    attendance_queue.stop(timeout=10)
+    reminder_scheduler.stop(timeout=10)
+    job_workers.stop(timeout=10)
+
+# Load shedding (innermost, so rate-limited requests never take a slot)
+if settings.CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        limiter=concurrency_limiter,
+        exempt_paths=("/api/v1/exports",),  # Long-lived streams
+    )
+
+# Idempotency keys (replays skip the concurrency limit but not rate limits)
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware, store=idempotency_store)
+
+# Rate limiting (added before CORS so 429 responses still carry CORS headers)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=build_rate_limiter())
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -56,6 +137,14 @@ app.include_router(users_router, prefix="/api/v1")
 app.include_router(skills_router, prefix="/api/v1")
 app.include_router(sessions_router, prefix="/api/v1")
 app.include_router(videos_router, prefix="/api/v1")
+app.include_router(exports_router, prefix="/api/v1")
+app.include_router(feeds_router, prefix="/api/v1")
+app.include_router(search_router, prefix="/api/v1")
+app.include_router(dashboard_router, prefix="/api/v1")
+app.include_router(batch_router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
+app.include_router(tags_router, prefix="/api/v1")
+app.include_router(reports_router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -87,6 +176,16 @@ async def api_health_check():
     }
 
 
+@app.get("/api/v1/health/load")
+async def load_health_check():
+    """Concurrency limit, queue depth and shed rate for this worker."""
+    return {
+        "status": "healthy",
+        "enabled": settings.CONCURRENCY_LIMIT_ENABLED,
+        **concurrency_limiter.stats()
+    }
+
+
 @app.get("/api/v1/health/db")
 async def database_health_check():
     """Database health check endpoint."""
@@ -97,6 +196,7 @@ async def database_health_check():
         return {
             "status": "healthy",
             "database": "connected",
+            "pool": engine.pool.status(),
             "database_url": settings.DATABASE_URL.split("@")[-1] if "@" in settings.DATABASE_URL else "sqlite"
         }
     except Exception as e:
@@ -0,0 +1 @@
+"""Notifications microservice package."""
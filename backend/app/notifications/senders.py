@@ -0,0 +1,130 @@
+"""
+Notification senders - pluggable delivery of outgoing email.
+"""
+import logging
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import List, Optional, Sequence
+from app.core.config import settings
+
+logger = logging.getLogger("app")
+
+
+@dataclass
+class Message:
+    """One outgoing email."""
+    to: str
+    subject: str
+    body: str
+
+
+class NotificationSender:
+    """
+    Base sender. Subclasses deliver a batch of messages and report, per
+    message, whether it was accepted; a batch is the unit sent over one
+    connection.
+    """
+
+    def send_batch(self, messages: Sequence[Message]) -> List[Optional[str]]:
+        """Send messages; returns None for each delivered message, else an error."""
+        raise NotImplementedError
+
+
+class LogSender(NotificationSender):
+    """Writes messages to the application log (development default)."""
+
+    def send_batch(self, messages: Sequence[Message]) -> List[Optional[str]]:
+        for message in messages:
+            logger.info("Email to %s: %s\n%s", message.to, message.subject, message.body)
+        return [None] * len(messages)
+
+
+class SMTPSender(NotificationSender):
+    """Delivers messages through an SMTP server, one connection per batch."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        from_address: str,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = False,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.from_address = from_address
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send_batch(self, messages: Sequence[Message]) -> List[Optional[str]]:
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        except (OSError, smtplib.SMTPException) as exc:
+            return [f"connect: {exc}"] * len(messages)
+        results: List[Optional[str]] = []
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                email = EmailMessage()
+                email["From"] = self.from_address
+                email["To"] = message.to
+                email["Subject"] = message.subject
+                email.set_content(message.body)
+                try:
+                    smtp.send_message(email)
+                    results.append(None)
+                except smtplib.SMTPException as exc:
+                    results.append(str(exc))
+        except (OSError, smtplib.SMTPException) as exc:
+            results.extend([str(exc)] * (len(messages) - len(results)))
+        finally:
+            try:
+                smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+        return results
+
+
+def get_sender() -> NotificationSender:
+    """Sender configured by ``NOTIFICATION_SENDER``."""
+    if settings.NOTIFICATION_SENDER == "smtp":
+        return SMTPSender(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            from_address=settings.NOTIFICATION_FROM,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            use_tls=settings.SMTP_USE_TLS,
+        )
+    if settings.NOTIFICATION_SENDER == "log":
+        return LogSender()
+    raise ValueError(f"Unknown NOTIFICATION_SENDER: {settings.NOTIFICATION_SENDER!r}")
+
+
+def dispatch(
+    messages: Sequence[Message],
+    sender: Optional[NotificationSender] = None,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None
+) -> List[Optional[str]]:
+    """
+    Send messages in parallel batches.
+    Returns one entry per message, in order: None if delivered, else the error.
+    """
+    if not messages:
+        return []
+    sender = sender or get_sender()
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    batches = [messages[start:start + batch_size] for start in range(0, len(messages), batch_size)]
+    with ThreadPoolExecutor(max_workers=min(workers or settings.NOTIFICATION_WORKERS, len(batches))) as pool:
+        results = pool.map(sender.send_batch, batches)
+    return [error for batch in results for error in batch]
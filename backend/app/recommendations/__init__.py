@@ -0,0 +1 @@
+"""Recommendations microservice package."""
@@ -0,0 +1,319 @@
+"""
+In-process TF-IDF index over upcoming sessions and videos.
+
+Every item (an upcoming session, or a video) is a sparse term vector built
+from its own title and description plus its skill's name and description.
+The vectors are kept in NumPy arrays in ELLPACK layout: row ``i`` holds up
+to ``MAX_TERMS`` (term id, term frequency) pairs, padded with term 0, which
+never matches. Scoring a student is then one sparse matrix-vector product,
+``(tf * weights[term_ids]).sum(axis=1)``, followed by vectorized age and
+start-time masks and an ``argpartition`` for the top results.
+
+The index is updated incrementally. Services record changed items on the
+database session (``mark_dirty``), they are handed to the index when the
+transaction commits, and the next query re-reads only those rows and
+rewrites them in place. IDF weights and row norms are recomputed (also
+vectorized) after any change. A full rebuild every
+``RECOMMENDATION_REFRESH_SECONDS`` picks up other workers' writes.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+
+STOP_WORDS = frozenset("""
+    an and are as at be by for from has have how in into is it its learn learning
+    of on or our the their this to with you your about all can will
+""".split())
+
+# Terms kept per item (the most frequent ones)
+MAX_TERMS = 32
+# Field weights when counting term frequencies
+TITLE_WEIGHT = 2.0
+SKILL_NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+KIND_CODES = {"session": 1, "video": 2}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+_PENDING_KEY = "recommendation_dirty"
+
+ItemKey = Tuple[str, int]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens without stop words, with plurals folded ("robots" -> "robot")."""
+    if not text:
+        return []
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def item_terms(title: str, description: Optional[str], skill_name: str, skill_description: Optional[str]) -> Counter:
+    """Weighted term counts for one item."""
+    counts: Counter = Counter()
+    for text, weight in (
+        (title, TITLE_WEIGHT),
+        (skill_name, SKILL_NAME_WEIGHT),
+        (description, DESCRIPTION_WEIGHT),
+        (skill_description, DESCRIPTION_WEIGHT),
+    ):
+        for token in tokenize(text):
+            counts[token] += weight
+    return counts
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return -math.inf
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RecommendationIndex:
+    """TF-IDF vectors for the recommendable catalog, scored with NumPy."""
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._clear(capacity)
+        self.built_at: Optional[float] = None
+        self._dirty: Set[ItemKey] = set()
+        self._dirty_skills: Set[int] = set()
+
+    def _clear(self, capacity: int) -> None:
+        self.vocab: Dict[str, int] = {"": 0}
+        self.words: List[str] = [""]
+        self.df = np.zeros(1024, dtype=np.int32)
+        self.term_ids = np.zeros((capacity, MAX_TERMS), dtype=np.int32)
+        self.tf = np.zeros((capacity, MAX_TERMS), dtype=np.float32)
+        self.kinds = np.zeros(capacity, dtype=np.int8)  # 0 = free row
+        self.item_ids = np.zeros(capacity, dtype=np.int64)
+        self.skill_ids = np.zeros(capacity, dtype=np.int64)
+        self.starts = np.full(capacity, -np.inf)  # Sessions only; videos are always current
+        self.min_age = np.full(capacity, -np.inf, dtype=np.float32)
+        self.max_age = np.full(capacity, np.inf, dtype=np.float32)
+        self.rows: Dict[ItemKey, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._weights_stale = True
+        self.idf = np.zeros(1, dtype=np.float32)
+        self.norms = np.ones(capacity, dtype=np.float32)
+
+    # -- building -------------------------------------------------------
+
+    def _term_id(self, word: str) -> int:
+        term = self.vocab.get(word)
+        if term is None:
+            term = self.vocab[word] = len(self.words)
+            self.words.append(word)
+            if term >= len(self.df):
+                self.df = np.concatenate([self.df, np.zeros(len(self.df), dtype=np.int32)])
+        return term
+
+    def _grow(self) -> None:
+        capacity = len(self.kinds)
+        extra = capacity
+
+        def extend(array, fill):
+            shape = (extra,) + array.shape[1:]
+            return np.concatenate([array, np.full(shape, fill, dtype=array.dtype)])
+
+        self.term_ids = extend(self.term_ids, 0)
+        self.tf = extend(self.tf, 0)
+        self.kinds = extend(self.kinds, 0)
+        self.item_ids = extend(self.item_ids, 0)
+        self.skill_ids = extend(self.skill_ids, 0)
+        self.starts = extend(self.starts, -np.inf)
+        self.min_age = extend(self.min_age, -np.inf)
+        self.max_age = extend(self.max_age, np.inf)
+        self.norms = extend(self.norms, 1)
+        self._free.extend(range(capacity + extra - 1, capacity - 1, -1))
+
+    def _remove_row(self, key: ItemKey) -> None:
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        terms = self.term_ids[row][self.term_ids[row] > 0]
+        np.subtract.at(self.df, terms, 1)
+        self.term_ids[row] = 0
+        self.tf[row] = 0
+        self.kinds[row] = 0
+        self._free.append(row)
+        self._weights_stale = True
+
+    def _put(self, key: ItemKey, counts: Counter, skill_id: int, start: Optional[datetime],
+             min_age: Optional[int], max_age: Optional[int]) -> None:
+        self._remove_row(key)
+        if not self._free:
+            self._grow()
+        row = self._free.pop()
+        top = counts.most_common(MAX_TERMS)
+        terms = np.array([self._term_id(word) for word, _ in top], dtype=np.int32)
+        self.term_ids[row, :len(terms)] = terms
+        self.tf[row, :len(terms)] = [1.0 + math.log(count) for _, count in top]
+        np.add.at(self.df, terms, 1)
+        self.kinds[row] = KIND_CODES[key[0]]
+        self.item_ids[row] = key[1]
+        self.skill_ids[row] = skill_id
+        self.starts[row] = _epoch(start) if key[0] == "session" else -np.inf
+        self.min_age[row] = -np.inf if min_age is None else min_age
+        self.max_age[row] = np.inf if max_age is None else max_age
+        self.rows[key] = row
+        self._weights_stale = True
+
+    def _refresh_weights(self) -> None:
+        """Recompute IDF from document frequencies and every row's L2 norm."""
+        count = len(self.rows)
+        df = self.df[:len(self.words)].astype(np.float32)
+        idf = np.log((1.0 + count) / (1.0 + df)) + 1.0
+        idf[df == 0] = 0.0  # Padding and words no longer used
+        self.idf = idf.astype(np.float32)
+        weighted = self.tf * self.idf[self.term_ids]
+        norms = np.sqrt((weighted * weighted).sum(axis=1))
+        norms[norms == 0] = 1.0
+        self.norms = norms
+        self._weights_stale = False
+
+    # -- keeping current ------------------------------------------------
+
+    def invalidate(self, keys: Iterable[ItemKey]) -> None:
+        """Note changed items (or ("skill", id) for all of a skill's items)."""
+        with self._lock:
+            for kind, item_id in keys:
+                if kind == "skill":
+                    self._dirty_skills.add(item_id)
+                else:
+                    self._dirty.add((kind, item_id))
+
+    def refresh(self, db: Session) -> None:
+        """Rebuild if never built or too old, otherwise re-read only the changed items."""
+        with self._lock:
+            built_at = self.built_at
+            if built_at is None or time.monotonic() - built_at > settings.RECOMMENDATION_REFRESH_SECONDS:
+                self._build(db)
+            elif self._dirty or self._dirty_skills:
+                self._apply_changes(db)
+            if self._weights_stale:
+                self._refresh_weights()
+
+    def _build(self, db: Session) -> None:
+        from app.recommendations.services import load_catalog
+        self._clear(max(1024, len(self.kinds)))
+        self._dirty.clear()
+        self._dirty_skills.clear()
+        for key, counts, skill_id, start, min_age, max_age in load_catalog(db):
+            self._put(key, counts, skill_id, start, min_age, max_age)
+        self.built_at = time.monotonic()
+
+    def _apply_changes(self, db: Session) -> None:
+        from app.recommendations.services import load_catalog
+        keys = set(self._dirty)
+        if self._dirty_skills:
+            skill_rows = np.flatnonzero(
+                (self.kinds > 0) & np.isin(self.skill_ids, list(self._dirty_skills))
+            )
+            keys.update((KIND_NAMES[int(self.kinds[row])], int(self.item_ids[row])) for row in skill_rows)
+        session_ids = [item_id for kind, item_id in keys if kind == "session"]
+        video_ids = [item_id for kind, item_id in keys if kind == "video"]
+        found = set()
+        for key, counts, skill_id, start, min_age, max_age in load_catalog(
+            db, session_ids=session_ids, video_ids=video_ids, skill_ids=list(self._dirty_skills)
+        ):
+            found.add(key)
+            self._put(key, counts, skill_id, start, min_age, max_age)
+        # Anything not returned was deleted, cancelled or is no longer upcoming
+        for key in keys - found:
+            self._remove_row(key)
+        self._dirty.clear()
+        self._dirty_skills.clear()
+
+    # -- querying -------------------------------------------------------
+
+    def recommend(
+        self,
+        interests: str,
+        age: Optional[int],
+        exclude: Iterable[ItemKey] = (),
+        limit: int = 10,
+        now: Optional[float] = None
+    ) -> List[Tuple[str, int, float, List[str]]]:
+        """
+        Top items for an interest text as (kind, id, cosine score, matched
+        words), best first. Items outside the student's age range, sessions
+        that already started and ``exclude`` are left out.
+        """
+        words = set(tokenize(interests))
+        with self._lock:
+            terms = np.array(sorted({self.vocab[word] for word in words if word in self.vocab}), dtype=np.int32)
+            if not len(terms) or not self.rows:
+                return []
+            weights = np.zeros(len(self.idf), dtype=np.float32)
+            weights[terms] = self.idf[terms] ** 2
+            query_norm = float(np.sqrt((self.idf[terms] ** 2).sum()))
+            if query_norm == 0:
+                return []
+
+            # The matrix-vector product over every row, then the masks
+            scores = (self.tf * weights[self.term_ids]).sum(axis=1) / (self.norms * query_norm)
+            current = time.time() if now is None else now
+            eligible = (self.kinds > 0) & ((self.starts == -np.inf) | (self.starts > current))
+            if age is not None:
+                eligible &= (self.min_age <= age) & (age <= self.max_age)
+            scores = np.where(eligible, scores, 0.0)
+            for key in exclude:
+                row = self.rows.get(key)
+                if row is not None:
+                    scores[row] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            query_terms = set(terms.tolist())
+            return [
+                (
+                    KIND_NAMES[int(self.kinds[row])],
+                    int(self.item_ids[row]),
+                    round(float(scores[row]), 4),
+                    [self.words[term] for term in self.term_ids[row] if term in query_terms],
+                )
+                for row in candidates
+            ]
+
+
+recommendation_index = RecommendationIndex()
+
+
+def mark_dirty(db: Session, kind: str, ids: Iterable[int]) -> None:
+    """
+    Record changed sessions, videos or skills on a database session; the
+    index learns about them only if the transaction commits.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update((kind, item_id) for item_id in ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_over_changes(session: Session) -> None:
+    keys = session.info.pop(_PENDING_KEY, None)
+    if keys:
+        recommendation_index.invalidate(keys)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,20 @@
+"""
+Pydantic schemas for recommendations.
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class RecommendationItem(BaseModel):
+    """An upcoming session or a video, ranked for one student."""
+    kind: str  # session or video
+    id: int
+    skill_id: int
+    title: str
+    description: Optional[str]
+    score: float  # Cosine similarity with the student's interests, 0-1
+    matched_terms: List[str]
+    schedule: Optional[datetime] = None  # Sessions only
+    ends_at: Optional[datetime] = None
+    youtube_url: Optional[str] = None  # Videos only
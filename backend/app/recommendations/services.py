@@ -0,0 +1,123 @@
+"""
+Recommendation service layer - ranks sessions and videos for a student.
+"""
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence
+from sqlalchemy import null, or_, select
+from sqlalchemy.orm import Session as DBSession
+from app.db.loader import get_loader
+from app.recommendations.index import item_terms, recommendation_index
+from app.recommendations.schemas import RecommendationItem
+from app.sessions.models import Session
+from app.skills.models import Skill
+from app.users.models import SessionEnrollment, Student
+from app.videos.models import Video
+
+
+def load_catalog(
+    db: DBSession,
+    session_ids: Optional[Sequence[int]] = None,
+    video_ids: Optional[Sequence[int]] = None,
+    skill_ids: Optional[Sequence[int]] = None
+) -> Iterator[tuple]:
+    """
+    Recommendable items as (key, term counts, skill id, start, min age,
+    max age): upcoming scheduled sessions and videos of live skills. With
+    no ids, the whole catalog; otherwise only the given items and the items
+    of the given skills.
+    """
+    full = session_ids is None and video_ids is None and skill_ids is None
+    skill_columns = (
+        Skill.id.label("skill_id"),
+        Skill.name.label("skill_name"),
+        Skill.description.label("skill_description"),
+        Skill.min_age,
+        Skill.max_age,
+    )
+
+    sessions = (
+        select(Session.id, Session.title, Session.description, Session.schedule, *skill_columns)
+        .join(Skill, Skill.id == Session.skill_id)
+        .where(
+            Session.status == "scheduled",
+            Session.deleted_at.is_(None),
+            Session.schedule >= datetime.now(timezone.utc),
+            Skill.deleted_at.is_(None)
+        )
+    )
+    videos = (
+        select(Video.id, Video.title, Video.description, null().label("schedule"), *skill_columns)
+        .join(Skill, Skill.id == Video.skill_id)
+        .where(Skill.deleted_at.is_(None))
+    )
+    queries = [("session", sessions, Session), ("video", videos, Video)]
+    if not full:
+        wanted = {"session": session_ids or [], "video": video_ids or []}
+        filtered = []
+        for kind, query, model in queries:
+            conditions = []
+            if wanted[kind]:
+                conditions.append(model.id.in_(wanted[kind]))
+            if skill_ids:
+                conditions.append(model.skill_id.in_(skill_ids))
+            if conditions:
+                filtered.append((kind, query.where(or_(*conditions)), model))
+        queries = filtered
+
+    for kind, query, _ in queries:
+        for row in db.execute(query.execution_options(yield_per=5000)):
+            yield (
+                (kind, row.id),
+                item_terms(row.title, row.description, row.skill_name, row.skill_description),
+                row.skill_id,
+                row.schedule,
+                row.min_age,
+                row.max_age,
+            )
+
+
+class RecommendationService:
+    """Service for recommending sessions and videos to students."""
+
+    def __init__(self, db: DBSession):
+        self.db = db
+
+    def for_student(self, student: Student, limit: int = 10) -> List[RecommendationItem]:
+        """
+        Upcoming sessions and videos closest to the student's interests,
+        suitable for their age, leaving out sessions they are enrolled in.
+        """
+        recommendation_index.refresh(self.db)
+        enrolled = self.db.execute(
+            select(SessionEnrollment.session_id).where(
+                SessionEnrollment.student_id == student.id,
+                SessionEnrollment.starts_at >= datetime.now(timezone.utc)
+            )
+        ).scalars().all()
+        ranked = recommendation_index.recommend(
+            student.interests or "",
+            student.age,
+            exclude=[("session", session_id) for session_id in enrolled],
+            limit=limit
+        )
+
+        loader = get_loader(self.db)
+        sessions = loader.load_many(Session, [item_id for kind, item_id, _, _ in ranked if kind == "session"])
+        videos = loader.load_many(Video, [item_id for kind, item_id, _, _ in ranked if kind == "video"])
+        items = []
+        for kind, item_id, score, matched in ranked:
+            if kind == "session" and item_id in sessions:
+                session = sessions[item_id]
+                items.append(RecommendationItem(
+                    kind=kind, id=item_id, skill_id=session.skill_id, title=session.title,
+                    description=session.description, score=score, matched_terms=matched,
+                    schedule=session.schedule, ends_at=session.ends_at
+                ))
+            elif kind == "video" and item_id in videos:
+                video = videos[item_id]
+                items.append(RecommendationItem(
+                    kind=kind, id=item_id, skill_id=video.skill_id, title=video.title,
+                    description=video.description, score=score, matched_terms=matched,
+                    youtube_url=video.youtube_url
+                ))
+        return items
@@ -0,0 +1 @@
+"""Session reminders microservice package."""
@@ -0,0 +1,31 @@
+"""
+Reminder models - one row per reminder sent (or due) to one recipient.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class SessionReminder(Base):
+    """
+    SessionReminder model - a "24h" or "1h" reminder for one recipient.
+    The unique (session, kind, recipient) row is what makes each reminder
+    go out exactly once, however many schedulers run.
+    """
+    __tablename__ = "session_reminders"
+    __table_args__ = (
+        UniqueConstraint("session_id", "kind", "recipient", name="uq_session_reminders_session_kind_recipient"),
+        Index("ix_session_reminders_status", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)  # 24h, 1h
+    recipient = Column(String, nullable=False)  # "parent:<id>" or "user:<id>" (volunteer)
+    email = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, failed, skipped
+    attempts = Column(Integer, nullable=False, default=0)
+    claimed_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
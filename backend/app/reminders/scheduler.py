@@ -0,0 +1,85 @@
+"""
+Reminder scheduler - sends due session reminders on a fixed interval.
+
+Runs inside the API process when ``REMINDERS_ENABLED`` is set, or on its
+own with::
+
+    python -m app.reminders.scheduler
+"""
+import logging
+import signal
+import threading
+from typing import Optional
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.reminders.services import ReminderService
+
+logger = logging.getLogger("app")
+
+
+class ReminderScheduler:
+    """Background thread running ``ReminderService.run`` every ``interval`` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start the scheduler thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the current run."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def run_once(self) -> dict:
+        db = SessionLocal()
+        try:
+            totals = ReminderService(db).run()
+        finally:
+            db.close()
+        if totals["sessions"] or totals["failed"]:
+            logger.info("Reminders: %s", totals)
+        return totals
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Reminder run failed")
+            self._stop.wait(self.interval)
+
+
+reminder_scheduler = ReminderScheduler(interval=settings.REMINDER_INTERVAL_SECONDS)
+
+
+def main() -> None:
+    """Run the scheduler in the foreground until interrupted."""
+    logging.basicConfig(level=logging.INFO)
+    # Map every model before the first query resolves relationships
+    from app.skills.models import Skill  # noqa: F401
+    from app.videos.models import Video  # noqa: F401
+    from app.tags.models import Tag  # noqa: F401
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    reminder_scheduler.start()
+    stopped.wait()
+    reminder_scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
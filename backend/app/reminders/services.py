@@ -0,0 +1,266 @@
+"""
+Reminder service layer - finds due sessions and sends their reminders.
+"""
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as DBSession
+from app.core.config import settings
+from app.notifications.senders import Message, NotificationSender, dispatch
+from app.reminders.models import SessionReminder
+from app.sessions.models import Session
+from app.users.models import Parent, SessionEnrollment, Student, User
+
+logger = logging.getLogger("app")
+
+# (kind, how long before the session, lower bound of the due window).
+# A session created less than an hour ahead only gets the 1h reminder.
+REMINDER_KINDS = (
+    ("24h", timedelta(hours=24), timedelta(hours=1)),
+    ("1h", timedelta(hours=1), timedelta(0)),
+)
+
+
+def reset_reminders(db: DBSession, session_id: int) -> None:
+    """
+    Forget a rescheduled session's reminders, so the scheduler plans them
+    again for the new time. Sent ones go too: they named the old time.
+    Runs in the caller's transaction.
+    """
+    db.execute(delete(SessionReminder).where(SessionReminder.session_id == session_id))
+
+
+class ReminderService:
+    """
+    Plans and delivers session reminders in batches.
+
+    Every step is a short transaction over at most ``batch_size`` sessions:
+    find due sessions without reminder rows (an indexed range scan of
+    ``sessions`` plus an anti-join on the unique key), insert one row per
+    recipient (duplicates from concurrent schedulers are ignored), claim the
+    pending rows, then send outside any transaction and record the outcome.
+    A row claimed by a scheduler that dies mid-send is left alone rather
+    than risk a duplicate; failed sends are retried up to
+    ``REMINDER_MAX_ATTEMPTS`` times.
+    """
+
+    def __init__(self, db: DBSession, sender: Optional[NotificationSender] = None):
+        self.db = db
+        self.sender = sender
+        self.batch_size = settings.REMINDER_BATCH_SIZE
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Send every reminder that is due; returns counts by outcome."""
+        now = now or datetime.now(timezone.utc)
+        totals = {"sessions": 0, "sent": 0, "failed": 0}
+        for kind, offset, floor in REMINDER_KINDS:
+            while True:
+                sessions = self._due_sessions(kind, now + floor, now + offset)
+                if not sessions:
+                    break
+                totals["sessions"] += len(sessions)
+                self._plan(kind, sessions)
+                self._add(totals, self._deliver(self._claim_pending(kind, [s.id for s in sessions])))
+        # One retry batch per run, so the run interval spaces out the attempts
+        self._add(totals, self._deliver(self._claim_failed(now)))
+        return totals
+
+    @staticmethod
+    def _add(totals: Dict[str, int], counts: Dict[str, int]) -> None:
+        for key, value in counts.items():
+            totals[key] += value
+
+    def _due_sessions(self, kind: str, start: datetime, end: datetime) -> List:
+        """Scheduled sessions in (start, end] that have no reminders of this kind yet."""
+        planned = exists().where(SessionReminder.session_id == Session.id, SessionReminder.kind == kind)
+        rows = self.db.execute(
+            select(Session.id, Session.volunteer_id)
+            .where(
+                Session.status == "scheduled",
+                Session.schedule > start,
+                Session.schedule <= end,
+                Session.deleted_at.is_(None),
+                ~planned
+            )
+            .order_by(Session.schedule, Session.id)
+            .limit(self.batch_size)
+        ).all()
+        self.db.commit()
+        return rows
+
+    def _plan(self, kind: str, sessions: List) -> None:
+        """Insert one pending row per recipient of each session."""
+        session_ids = [row.id for row in sessions]
+        volunteer_emails = dict(self.db.execute(
+            select(User.id, User.email).where(User.id.in_({row.volunteer_id for row in sessions}))
+        ).all())
+        families = self.db.execute(
+            select(SessionEnrollment.session_id, Parent.id, Parent.email)
+            .join(Student, Student.id == SessionEnrollment.student_id)
+            .join(Parent, Parent.id == Student.parent_id)
+            .where(SessionEnrollment.session_id.in_(session_ids))
+            .distinct()
+        ).all()
+
+        rows = []
+        for session in sessions:
+            email = volunteer_emails.get(session.volunteer_id)
+            rows.append(self._row(session.id, kind, f"user:{session.volunteer_id}", email))
+        for session_id, parent_id, email in families:
+            rows.append(self._row(session_id, kind, f"parent:{parent_id}", email))
+        self._insert_ignoring_duplicates(rows)
+
+    @staticmethod
+    def _row(session_id: int, kind: str, recipient: str, email: Optional[str]) -> Dict:
+        return {
+            "session_id": session_id,
+            "kind": kind,
+            "recipient": recipient,
+            "email": email,
+            # Nothing to send without an address, but the row still marks it handled
+            "status": "pending" if email else "skipped",
+            "attempts": 0,
+        }
+
+    def _insert_ignoring_duplicates(self, rows: List[Dict]) -> None:
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            self.db.execute(
+                insert(SessionReminder).on_conflict_do_nothing(
+                    index_elements=["session_id", "kind", "recipient"]
+                ),
+                rows
+            )
+            self.db.commit()
+            return
+        for row in rows:
+            try:
+                with self.db.begin_nested():
+                    self.db.add(SessionReminder(**row))
+            except IntegrityError:
+                pass
+        self.db.commit()
+
+    def _claim(self, condition) -> List[SessionReminder]:
+        token = uuid.uuid4().hex
+        self.db.execute(
+            update(SessionReminder)
+            .where(condition)
+            .values(status="sending", claimed_by=token, attempts=SessionReminder.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return self.db.query(SessionReminder).filter(
+            SessionReminder.claimed_by == token, SessionReminder.status == "sending"
+        ).all()
+
+    def _claim_pending(self, kind: str, session_ids: List[int]) -> List[SessionReminder]:
+        return self._claim(
+            SessionReminder.session_id.in_(session_ids)
+            & (SessionReminder.kind == kind)
+            & (SessionReminder.status == "pending")
+        )
+
+    def _claim_failed(self, now: datetime) -> List[SessionReminder]:
+        """Failed reminders worth another attempt (the session has not started)."""
+        retry_ids = select(SessionReminder.id).join(Session, Session.id == SessionReminder.session_id).where(
+            SessionReminder.status == "failed",
+            SessionReminder.attempts < settings.REMINDER_MAX_ATTEMPTS,
+            Session.schedule > now,
+            Session.deleted_at.is_(None)
+        ).limit(self.batch_size)
+        ids = self.db.execute(retry_ids).scalars().all()
+        if not ids:
+            self.db.commit()
+            return []
+        return self._claim(SessionReminder.id.in_(ids) & (SessionReminder.status == "failed"))
+
+    def _deliver(self, reminders: List[SessionReminder]) -> Dict[str, int]:
+        """Send claimed reminders in parallel batches and record each outcome."""
+        if not reminders:
+            return {}
+        sessions = {
+            session.id: session
+            for session in self.db.query(Session).filter(Session.id.in_({r.session_id for r in reminders}))
+        }
+        children = self._student_names(reminders)
+        messages = [self._message(reminder, sessions[reminder.session_id], children) for reminder in reminders]
+        # Plain values: the commit expires the rows, and reading them after would reload each one
+        claimed = [(reminder.id, reminder.email) for reminder in reminders]
+        self.db.commit()  # Send outside any transaction
+
+        errors = dispatch(messages, self.sender)
+
+        now = datetime.now(timezone.utc)
+        sent_ids = [reminder_id for (reminder_id, _), error in zip(claimed, errors) if error is None]
+        if sent_ids:
+            self.db.execute(
+                update(SessionReminder)
+                .where(SessionReminder.id.in_(sent_ids))
+                .values(status="sent", sent_at=now, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+        for (reminder_id, email), error in zip(claimed, errors):
+            if error is not None:
+                logger.warning("Reminder %s to %s failed: %s", reminder_id, email, error)
+                self.db.execute(
+                    update(SessionReminder)
+                    .where(SessionReminder.id == reminder_id)
+                    .values(status="failed", last_error=error[:2000])
+                    .execution_options(synchronize_session=False)
+                )
+        self.db.commit()
+        failed = len(claimed) - len(sent_ids)
+        return {"sent": len(sent_ids), "failed": failed}
+
+    def _student_names(self, reminders: Iterable[SessionReminder]) -> Dict[Tuple[int, int], List[str]]:
+        """Enrolled children per (session, parent), for the claimed family reminders."""
+        parent_ids = {int(r.recipient.split(":")[1]) for r in reminders if r.recipient.startswith("parent:")}
+        if not parent_ids:
+            return {}
+        rows = self.db.execute(
+            select(SessionEnrollment.session_id, Student.parent_id, Student.name)
+            .join(Student, Student.id == SessionEnrollment.student_id)
+            .where(
+                SessionEnrollment.session_id.in_({r.session_id for r in reminders}),
+                Student.parent_id.in_(parent_ids)
+            )
+            .order_by(Student.name)
+        ).all()
+        names: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+        for session_id, parent_id, name in rows:
+            names[(session_id, parent_id)].append(name)
+        return names
+
+    @staticmethod
+    def _message(
+        reminder: SessionReminder,
+        session: Session,
+        children: Dict[Tuple[int, int], List[str]]
+    ) -> Message:
+        schedule = session.schedule
+        if schedule.tzinfo is None:
+            schedule = schedule.replace(tzinfo=timezone.utc)
+        when = schedule.strftime("%Y-%m-%d %H:%M UTC")
+        lines = [f'"{session.title}" starts at {when}.']
+        if reminder.recipient.startswith("parent:"):
+            names = children.get((session.id, int(reminder.recipient.split(":")[1])), [])
+            if names:
+                lines.append(f"Enrolled: {', '.join(names)}.")
+        else:
+            lines.append("You are teaching this session.")
+        if session.meeting_link:
+            lines.append(f"Join here: {session.meeting_link}")
+        return Message(
+            to=reminder.email,
+            subject=f"Reminder: {session.title} at {when}",
+            body="\n".join(lines)
+        )
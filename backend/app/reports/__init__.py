@@ -0,0 +1 @@
+"""Reports microservice package."""
@@ -0,0 +1,68 @@
+"""
+Report models - weekly rollups of sessions and enrollments.
+
+Maintained by ``app.reports.rollups``; the reports API reads nothing else.
+Weeks start on Monday (UTC) and a session counts in the week it is
+scheduled in.
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from app.db.database import Base
+
+
+class ReportWeek(Base):
+    """
+    Platform totals for one week. Only weeks with at least one live
+    session are stored; the API reports missing weeks as zeros.
+    """
+    __tablename__ = "report_weeks"
+    
+    week_start = Column(Date, primary_key=True)
+    sessions = Column(Integer, nullable=False)  # Scheduled or completed, not cancelled
+    sessions_completed = Column(Integer, nullable=False)
+    active_volunteers = Column(Integer, nullable=False)  # Distinct volunteers running a session
+    enrollments = Column(Integer, nullable=False)  # Seats booked in the week's sessions
+    unique_students = Column(Integer, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class ReportSkillWeek(Base):
+    """
+    Per-skill numbers for one week. The skill name is copied so reports
+    keep deleted skills readable.
+    """
+    __tablename__ = "report_skill_weeks"
+    
+    week_start = Column(Date, primary_key=True)
+    skill_id = Column(Integer, primary_key=True)
+    skill_name = Column(String, nullable=False)
+    sessions = Column(Integer, nullable=False)
+    sessions_completed = Column(Integer, nullable=False)
+    enrollments = Column(Integer, nullable=False)
+    unique_students = Column(Integer, nullable=False)
+
+
+class ReportSessionWeek(Base):
+    """
+    The week each session was last counted in, so a session that moves or
+    disappears also refreshes the week it left.
+    """
+    __tablename__ = "report_session_weeks"
+    
+    session_id = Column(Integer, primary_key=True)  # No foreign key: outlives purged sessions
+    week_start = Column(Date, nullable=False)
+
+
+class ReportDirtyWeek(Base):
+    """A week to recompute on the next refresh (written when sessions are purged)."""
+    __tablename__ = "report_dirty_weeks"
+    
+    week_start = Column(Date, primary_key=True)
+
+
+class ReportWatermark(Base):
+    """How far the rollups have caught up with changes to sessions and enrollments."""
+    __tablename__ = "report_watermarks"
+    
+    name = Column(String(50), primary_key=True)
+    changes_through = Column(DateTime(timezone=True), nullable=False)  # enrolled_at / created_at / updated_at
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
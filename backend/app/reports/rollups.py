@@ -0,0 +1,341 @@
+"""
+Weekly report rollups.
+
+The reports API reads only the ``report_*`` tables. Recomputing one week
+is a bounded scan of that week's sessions (``ix_sessions_status_schedule``)
+and their enrollments (``ix_session_enrollments_session_id``), so the
+rollups are kept current by recomputing only the weeks something changed
+in:
+
+* ``refresh`` runs every ``REPORT_REFRESH_MINUTES`` as a self-rescheduling
+  outbox job. It collects the weeks of enrollments and sessions created
+  or updated since the watermark (``enrolled_at``, ``created_at`` and
+  ``updated_at`` are indexed), the week each changed session was counted
+  in before (``report_session_weeks``) and the weeks of purged sessions
+  (``report_dirty_weeks``), recomputes them and moves the watermark on.
+  The watermark trails the clock by ``REPORT_WATERMARK_LAG_SECONDS`` so
+  a transaction committing just after its timestamps is not skipped.
+* ``rebuild`` recomputes a range of weeks (by default all of them) in
+  chunks of ``REPORT_REBUILD_CHUNK_WEEKS``, one transaction each, for
+  backfills or after a metric changes::
+
+      python -m app.reports.rollups rebuild [--from 2025-01-06] [--to 2026-01-05]
+
+Distinct counts (students, volunteers) cannot be maintained by adding
+deltas, which is why whole weeks are recomputed.
+"""
+import argparse
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session as DBSession
+from app.core.config import settings
+from app.jobs.services import OutboxService, job_handler
+from app.reports.models import ReportDirtyWeek, ReportSessionWeek, ReportSkillWeek, ReportWatermark, ReportWeek
+from app.sessions.models import Session
+from app.skills.models import Skill
+from app.users.models import SessionEnrollment
+
+logger = logging.getLogger("app")
+
+WATERMARK = "weekly"
+# Sessions that count: not cancelled (and not deleted)
+LIVE_STATUSES = ("scheduled", "completed")
+# Ids per IN (...) list
+ID_BATCH_SIZE = 1000
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands datetimes back without a zone."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def week_start(value) -> date:
+    """Monday (UTC) of the week containing a datetime or date."""
+    if isinstance(value, datetime):
+        value = _as_utc(value).astimezone(timezone.utc).date()
+    return value - timedelta(days=value.weekday())
+
+
+def _week_bounds(first: date, last: date) -> Tuple[datetime, datetime]:
+    """[start, end) in UTC covering the weeks ``first`` to ``last``."""
+    start = datetime.combine(first, time.min, tzinfo=timezone.utc)
+    return start, datetime.combine(last + timedelta(weeks=1), time.min, tzinfo=timezone.utc)
+
+
+def _runs(weeks: Iterable[date], max_weeks: int) -> Iterator[List[date]]:
+    """Weeks in order, grouped into consecutive runs of at most ``max_weeks``."""
+    run: List[date] = []
+    for week in sorted(set(weeks)):
+        if run and (week - run[-1] != timedelta(weeks=1) or len(run) >= max_weeks):
+            yield run
+            run = []
+        run.append(week)
+    if run:
+        yield run
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _dialect_insert(db: DBSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    raise NotImplementedError(f"Report upserts are not implemented for {dialect}")
+
+
+def _counters() -> Dict[str, Any]:
+    return {"sessions": 0, "sessions_completed": 0, "enrollments": 0, "volunteers": set(), "students": set()}
+
+
+def recompute_weeks(db: DBSession, weeks: List[date]) -> int:
+    """
+    Replace the rollups of consecutive weeks with numbers computed from
+    sessions and enrollments; returns the sessions counted. Does not commit.
+    """
+    start, end = _week_bounds(weeks[0], weeks[-1])
+    live = (
+        Session.status.in_(LIVE_STATUSES),
+        Session.deleted_at.is_(None),
+        Session.schedule >= start,
+        Session.schedule < end,
+    )
+    sessions = db.execute(
+        select(Session.id, Session.schedule, Session.skill_id, Session.volunteer_id, Session.status).where(*live)
+    ).all()
+    seats = db.execute(
+        select(Session.schedule, Session.skill_id, SessionEnrollment.student_id)
+        .join(SessionEnrollment, SessionEnrollment.session_id == Session.id)
+        .where(*live)
+    ).all()
+
+    totals: Dict[date, Dict[str, Any]] = {}
+    per_skill: Dict[Tuple[date, int], Dict[str, Any]] = {}
+    placed = []
+    for session_id, schedule, skill_id, volunteer_id, status in sessions:
+        week = week_start(schedule)
+        placed.append({"session_id": session_id, "week_start": week})
+        for counters in (totals.setdefault(week, _counters()), per_skill.setdefault((week, skill_id), _counters())):
+            counters["sessions"] += 1
+            counters["sessions_completed"] += status == "completed"
+            counters["volunteers"].add(volunteer_id)
+    for schedule, skill_id, student_id in seats:
+        week = week_start(schedule)
+        for counters in (totals.setdefault(week, _counters()), per_skill.setdefault((week, skill_id), _counters())):
+            counters["enrollments"] += 1
+            counters["students"].add(student_id)
+    names = dict(db.execute(
+        select(Skill.id, Skill.name).where(Skill.id.in_({skill_id for _, skill_id in per_skill}))
+    ).all()) if per_skill else {}
+
+    computed_at = datetime.now(timezone.utc)
+    db.execute(delete(ReportWeek).where(ReportWeek.week_start.in_(weeks)))
+    db.execute(delete(ReportSkillWeek).where(ReportSkillWeek.week_start.in_(weeks)))
+    insert = _dialect_insert(db)
+    if totals:
+        db.execute(insert(ReportWeek), [
+            {
+                "week_start": week,
+                "sessions": counters["sessions"],
+                "sessions_completed": counters["sessions_completed"],
+                "active_volunteers": len(counters["volunteers"]),
+                "enrollments": counters["enrollments"],
+                "unique_students": len(counters["students"]),
+                "computed_at": computed_at,
+            }
+            for week, counters in sorted(totals.items())
+        ])
+    if per_skill:
+        db.execute(insert(ReportSkillWeek), [
+            {
+                "week_start": week,
+                "skill_id": skill_id,
+                "skill_name": names.get(skill_id, f"Skill {skill_id}"),
+                "sessions": counters["sessions"],
+                "sessions_completed": counters["sessions_completed"],
+                "enrollments": counters["enrollments"],
+                "unique_students": len(counters["students"]),
+            }
+            for (week, skill_id), counters in sorted(per_skill.items())
+        ])
+    # Remember where each session was counted, rewriting only the ones that moved
+    for chunk in _chunks(placed, ID_BATCH_SIZE):
+        upsert = insert(ReportSessionWeek).values(list(chunk))
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=["session_id"],
+            set_={"week_start": upsert.excluded.week_start},
+            where=ReportSessionWeek.week_start != upsert.excluded.week_start
+        ))
+    return len(sessions)
+
+
+def forget_sessions(db: DBSession, session_ids: Sequence[int]) -> None:
+    """
+    Queue the weeks that counted these sessions for the next refresh, for
+    sessions about to be purged. Does not commit.
+    """
+    counted_in = (
+        select(ReportSessionWeek.week_start)
+        .where(ReportSessionWeek.session_id.in_(session_ids))
+        .distinct()
+    )
+    insert = _dialect_insert(db)
+    db.execute(insert(ReportDirtyWeek).from_select(["week_start"], counted_in).on_conflict_do_nothing())
+    db.execute(delete(ReportSessionWeek).where(ReportSessionWeek.session_id.in_(session_ids)))
+
+
+def refresh(db: DBSession) -> Dict[str, Any]:
+    """
+    Recompute the weeks touched since the watermark and move it on; without
+    a watermark yet, rebuild everything. Commits.
+    """
+    state = db.execute(
+        select(ReportWatermark).where(ReportWatermark.name == WATERMARK).with_for_update()
+    ).scalar()
+    if state is None:
+        return rebuild(db)
+    since = _as_utc(state.changes_through)
+    through = max(since, datetime.now(timezone.utc) - timedelta(seconds=settings.REPORT_WATERMARK_LAG_SECONDS))
+
+    weeks: Set[date] = set()
+    weeks.update(week_start(starts_at) for starts_at in db.execute(
+        select(SessionEnrollment.starts_at)
+        .where(SessionEnrollment.enrolled_at > since, SessionEnrollment.enrolled_at <= through)
+    ).scalars())
+    changed = db.execute(
+        select(Session.id, Session.schedule).where(or_(
+            and_(Session.created_at > since, Session.created_at <= through),
+            and_(Session.updated_at > since, Session.updated_at <= through),
+        ))
+    ).all()
+    weeks.update(week_start(schedule) for _, schedule in changed)
+    for session_ids in _chunks([session_id for session_id, _ in changed], ID_BATCH_SIZE):
+        weeks.update(db.execute(
+            select(ReportSessionWeek.week_start).where(ReportSessionWeek.session_id.in_(session_ids))
+        ).scalars())
+    dirty = db.execute(select(ReportDirtyWeek.week_start)).scalars().all()
+    if dirty:
+        weeks.update(dirty)
+        db.execute(delete(ReportDirtyWeek).where(ReportDirtyWeek.week_start.in_(dirty)))
+
+    sessions = sum(recompute_weeks(db, run) for run in _runs(weeks, settings.REPORT_REBUILD_CHUNK_WEEKS))
+    state.changes_through = through
+    state.refreshed_at = datetime.now(timezone.utc)
+    db.commit()
+    return {"weeks": len(weeks), "sessions": sessions, "changes_through": through.isoformat()}
+
+
+def rebuild(db: DBSession, first: Optional[date] = None, last: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Recompute the weeks from ``first`` to ``last`` (by default every week
+    with sessions) in chunks, committing each. A full rebuild also drops
+    rollups outside that range and sets the watermark for ``refresh``.
+    """
+    through = datetime.now(timezone.utc) - timedelta(seconds=settings.REPORT_WATERMARK_LAG_SECONDS)
+    full = first is None and last is None
+    if first is None or last is None:
+        earliest, latest = db.execute(
+            select(func.min(Session.schedule), func.max(Session.schedule))
+            .where(Session.status.in_(LIVE_STATUSES), Session.deleted_at.is_(None))
+        ).one()
+        first = first or (earliest and week_start(earliest))
+        last = last or (latest and week_start(latest))
+    if first is not None and last is not None:
+        first, last = week_start(first), week_start(last)
+        if last < first:
+            raise ValueError("The last week comes before the first")
+
+    weeks = sessions = 0
+    week = first
+    while week is not None and week <= last:
+        run = [week + timedelta(weeks=offset) for offset in range(settings.REPORT_REBUILD_CHUNK_WEEKS)]
+        run = [candidate for candidate in run if candidate <= last]
+        sessions += recompute_weeks(db, run)
+        db.commit()
+        weeks += len(run)
+        logger.info("Weekly reports: recomputed %s to %s", run[0].isoformat(), run[-1].isoformat())
+        week = run[-1] + timedelta(weeks=1)
+
+    if full:
+        for table in (ReportWeek, ReportSkillWeek):
+            stale = delete(table)
+            if first is not None:
+                stale = stale.where(or_(table.week_start < first, table.week_start > last))
+            db.execute(stale)
+        state = db.get(ReportWatermark, WATERMARK, with_for_update=True)
+        if state is None:
+            state = ReportWatermark(name=WATERMARK)
+            db.add(state)
+        state.changes_through = through
+        state.refreshed_at = datetime.now(timezone.utc)
+        db.commit()
+    return {"weeks": weeks, "sessions": sessions, "changes_through": through.isoformat() if full else None}
+
+
+@job_handler("reports.refresh")
+def refresh_reports(db: DBSession, payload: Dict[str, Any]) -> None:
+    """
+    Refresh the rollups, then schedule the next run. A run that finds them
+    refreshed within half an interval stops instead, so the extra schedule
+    queued by every API start dies out and one chain remains.
+    """
+    interval = timedelta(minutes=settings.REPORT_REFRESH_MINUTES)
+    now = datetime.now(timezone.utc)
+    refreshed_at = db.execute(
+        select(ReportWatermark.refreshed_at).where(ReportWatermark.name == WATERMARK)
+    ).scalar()
+    if refreshed_at is not None and _as_utc(refreshed_at) > now - interval / 2:
+        return
+    totals = refresh(db)
+    if totals["weeks"]:
+        logger.info("Weekly reports refreshed: %s", totals)
+    OutboxService(db).enqueue("reports.refresh", {}, run_at=now + interval)
+
+
+def schedule_refresh() -> None:
+    """Queue a refresh run (called on API start)."""
+    from app.db.database import SessionLocal
+    db = SessionLocal()
+    try:
+        OutboxService(db).enqueue("reports.refresh", {})
+        db.commit()
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Rebuild or refresh the rollups in the foreground."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.reports.rollups", description="Maintain the weekly report rollups."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = commands.add_parser("rebuild", help="Recompute weeks from sessions and enrollments")
+    rebuild_parser.add_argument("--from", dest="first", type=date.fromisoformat, help="First week (any day in it)")
+    rebuild_parser.add_argument("--to", dest="last", type=date.fromisoformat, help="Last week (any day in it)")
+    commands.add_parser("refresh", help="Catch up with changes since the watermark")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    # Map every model before the first query resolves relationships
+    from app.users.models import User  # noqa: F401
+    from app.videos.models import Video  # noqa: F401
+    from app.tags.models import Tag  # noqa: F401
+    from app.db.database import SessionLocal
+    db = SessionLocal()
+    try:
+        totals = rebuild(db, args.first, args.last) if args.command == "rebuild" else refresh(db)
+    finally:
+        db.close()
+    logger.info("Weekly reports %s finished: %s", args.command, totals)
+
+
+if __name__ == "__main__":
+    main()
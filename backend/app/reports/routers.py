@@ -0,0 +1,52 @@
+"""
+Report routers - weekly numbers for admins, read from the rollups.
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import require_admin
+from app.users.models import User
+from app.reports.schemas import WeeklyReport, SkillWeeklyReport, ReportStatus
+from app.reports.services import ReportService
+
+router = APIRouter(prefix="/reports", tags=["reports"], route_class=DBSessionRoute)
+
+
+@router.get("/weekly", response_model=List[WeeklyReport])
+async def get_weekly_report(
+    start: Optional[date] = Query(None, alias="from", description="Any day in the first week (default: 11 weeks ago)"),
+    end: Optional[date] = Query(None, alias="to", description="Any day in the last week (default: this week)"),
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get sessions, sessions completed, active volunteers, enrollments and
+    unique students per week (admin only). Weeks start on Monday (UTC).
+    """
+    report_service = ReportService(db)
+    return report_service.get_weekly(start, end)
+
+
+@router.get("/weekly/skills", response_model=List[SkillWeeklyReport])
+async def get_weekly_skill_report(
+    start: Optional[date] = Query(None, alias="from", description="Any day in the first week (default: 11 weeks ago)"),
+    end: Optional[date] = Query(None, alias="to", description="Any day in the last week (default: this week)"),
+    skill_id: Optional[int] = None,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Get enrollments and sessions per skill per week (admin only)."""
+    report_service = ReportService(db)
+    return report_service.get_skills(start, end, skill_id)
+
+
+@router.get("/status", response_model=ReportStatus)
+async def get_report_status(
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Get how far the rollups have caught up with changes (admin only)."""
+    report_service = ReportService(db)
+    return report_service.get_status()
@@ -0,0 +1,40 @@
+"""
+Pydantic schemas for weekly reports.
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+
+class WeeklyReport(BaseModel):
+    """Platform totals for one week (Monday, UTC)."""
+    week_start: date
+    sessions: int  # Scheduled or completed, not cancelled
+    sessions_completed: int
+    active_volunteers: int  # Distinct volunteers running a session
+    enrollments: int  # Seats booked in the week's sessions
+    unique_students: int
+    
+    class Config:
+        from_attributes = True
+
+
+class SkillWeeklyReport(BaseModel):
+    """One skill's numbers for one week."""
+    week_start: date
+    skill_id: int
+    skill_name: str
+    sessions: int
+    sessions_completed: int
+    enrollments: int
+    unique_students: int
+    
+    class Config:
+        from_attributes = True
+
+
+class ReportStatus(BaseModel):
+    """How current the rollups are."""
+    changes_through: Optional[datetime]  # Changes up to here are reflected
+    refreshed_at: Optional[datetime]
+    pending_weeks: int  # Weeks waiting to be recomputed after sessions were purged
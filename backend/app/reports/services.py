@@ -0,0 +1,88 @@
+"""
+Report service layer - reads the weekly rollups (see app.reports.rollups).
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.reports.models import ReportDirtyWeek, ReportSkillWeek, ReportWatermark, ReportWeek
+from app.reports.rollups import WATERMARK, week_start
+
+# Weeks reported when no range is given
+DEFAULT_WEEKS = 12
+
+
+class ReportService:
+    """Service for weekly reports. Reads only the rollup tables."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def _weeks(self, start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+        """The first and last week of a requested range, by default the last twelve weeks."""
+        last = week_start(end or datetime.now(timezone.utc))
+        first = week_start(start) if start else last - timedelta(weeks=DEFAULT_WEEKS - 1)
+        if last < first:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'to' must not be before 'from'"
+            )
+        if (last - first).days // 7 + 1 > settings.REPORT_MAX_WEEKS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A report covers at most {settings.REPORT_MAX_WEEKS} weeks"
+            )
+        return first, last
+    
+    def get_weekly(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+        """Totals for every week in the range, oldest first; weeks without sessions are zeros."""
+        first, last = self._weeks(start, end)
+        stored = {
+            row.week_start: row
+            for row in self.db.execute(
+                select(ReportWeek).where(ReportWeek.week_start >= first, ReportWeek.week_start <= last)
+            ).scalars()
+        }
+        weeks = []
+        week = first
+        while week <= last:
+            row = stored.get(week)
+            weeks.append({
+                "week_start": week,
+                "sessions": row.sessions if row else 0,
+                "sessions_completed": row.sessions_completed if row else 0,
+                "active_volunteers": row.active_volunteers if row else 0,
+                "enrollments": row.enrollments if row else 0,
+                "unique_students": row.unique_students if row else 0,
+            })
+            week += timedelta(weeks=1)
+        return weeks
+    
+    def get_skills(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        skill_id: Optional[int] = None
+    ) -> List[ReportSkillWeek]:
+        """Per-skill rows in the range, by week and then by enrollments (only weeks a skill had sessions)."""
+        first, last = self._weeks(start, end)
+        query = select(ReportSkillWeek).where(
+            ReportSkillWeek.week_start >= first, ReportSkillWeek.week_start <= last
+        )
+        if skill_id is not None:
+            query = query.where(ReportSkillWeek.skill_id == skill_id)
+        return self.db.execute(
+            query.order_by(ReportSkillWeek.week_start, ReportSkillWeek.enrollments.desc(), ReportSkillWeek.skill_id)
+        ).scalars().all()
+    
+    def get_status(self) -> Dict:
+        """The watermark and the number of weeks queued for recomputing."""
+        state = self.db.get(ReportWatermark, WATERMARK)
+        pending = self.db.execute(select(func.count()).select_from(ReportDirtyWeek)).scalar()
+        return {
+            "changes_through": state.changes_through if state else None,
+            "refreshed_at": state.refreshed_at if state else None,
+            "pending_weeks": pending,
+        }
@@ -0,0 +1 @@
+"""Search microservice package."""
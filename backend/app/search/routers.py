@@ -0,0 +1,41 @@
+"""
+Search routers - full-text search endpoint.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import require_any_auth
+from app.users.models import User
+from app.search.schemas import SearchResult
+from app.search.services import SearchIndex, KINDS
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=DBSessionRoute)
+
+
+@router.get("/", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    kind: Optional[str] = Query(None, description="Restrict to skill, session or video"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(require_any_auth),
+    db: Session = Depends(get_db)
+):
+    """Search skills, sessions and videos, ranked by relevance."""
+    if kind and kind not in KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Kind must be one of: {', '.join(KINDS)}"
+        )
+
+    search_index = SearchIndex(db)
+    return [
+        SearchResult(
+            kind=row["kind"],
+            id=row["ref_id"],
+            title=row["title"],
+            snippet=row["snippet"] or "",
+            rank=row["rank"],
+        )
+        for row in search_index.search(q, kind=kind, limit=limit)
+    ]
@@ -0,0 +1,13 @@
+"""
+Pydantic schemas for search.
+"""
+from pydantic import BaseModel, Field
+
+
+class SearchResult(BaseModel):
+    """A single ranked search hit."""
+    kind: str = Field(..., description="Document kind: skill, session or video")
+    id: int = Field(..., description="ID of the matching skill, session or video")
+    title: str
+    snippet: str = Field(..., description="HTML-escaped matching text with <mark> highlights")
+    rank: float = Field(..., description="Relevance score (higher is better)")
@@ -0,0 +1,281 @@
+"""
+Search service layer - full-text index over skills, sessions and videos.
+
+The index lives in the database next to the data it covers:
+- PostgreSQL: ``search_documents`` with a weighted tsvector column and a
+  GIN index (created by migration 002).
+- SQLite: an FTS5 virtual table ``search_fts`` (created on startup).
+
+Services keep the index current by calling ``SearchIndex`` inside the
+same transaction as their own write. Cancelled sessions are kept out of
+the index.
+
+Snippets are HTML: the database highlights matches with private-use
+sentinel characters, then the text is escaped and the sentinels are
+swapped for ``<mark>`` tags, so stored markup is never passed through.
+"""
+import html
+import re
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+# Document kinds and the small integer used to build SQLite rowids
+KINDS = {"skill": 1, "session": 2, "video": 3}
+KIND_SLOTS = 4
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# Unicode private-use characters, stripped from indexed text
+SENTINEL_START = "\ue000"
+SENTINEL_END = "\ue001"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_SENTINELS = {ord(SENTINEL_START): None, ord(SENTINEL_END): None}
+
+
+def _document_fields(kind: str, obj) -> tuple:
+    """Return the (title, body) text indexed for a model instance."""
+    if kind == "skill":
+        title, body = obj.name, obj.description
+    else:
+        title, body = obj.title, obj.description
+    return title.translate(_SENTINELS), (body or "").translate(_SENTINELS)
+
+
+def _searchable(kind: str, obj) -> bool:
+    """Whether a document belongs in the index at all."""
+    return not (kind == "session" and obj.status == "cancelled")
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    """Escape a sentinel-highlighted snippet and turn the sentinels into <mark> tags."""
+    return (
+        html.escape(snippet or "")
+        .replace(SENTINEL_START, HIGHLIGHT_START)
+        .replace(SENTINEL_END, HIGHLIGHT_END)
+    )
+
+
+class PostgresSearchBackend:
+    """tsvector/GIN backend."""
+
+    UPSERT = text("""
+        INSERT INTO search_documents (kind, ref_id, title, body, document)
+        VALUES (
+            :kind, :ref_id, :title, :body,
+            setweight(to_tsvector('english', :title), 'A') ||
+            setweight(to_tsvector('english', :body), 'B')
+        )
+        ON CONFLICT (kind, ref_id) DO UPDATE SET
+            title = EXCLUDED.title,
+            body = EXCLUDED.body,
+            document = EXCLUDED.document
+    """)
+
+    DELETE = text("DELETE FROM search_documents WHERE kind = :kind AND ref_id = :ref_id")
+
+    # Rank over the GIN matches first, highlight only the rows returned
+    QUERY = """
+        SELECT kind, ref_id, title, rank,
+               ts_headline('english', CASE WHEN body = '' THEN title ELSE body END, query,
+                           :options) AS snippet
+        FROM (
+            SELECT kind, ref_id, title, body, query,
+                   ts_rank_cd(document, query) AS rank
+            FROM search_documents, websearch_to_tsquery('english', :q) AS query
+            WHERE document @@ query {kind_filter}
+            ORDER BY rank DESC
+            LIMIT :limit
+        ) AS matches
+        ORDER BY rank DESC
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert(self, kind: str, ref_id: int, title: str, body: str) -> None:
+        self.db.execute(self.UPSERT, {"kind": kind, "ref_id": ref_id, "title": title, "body": body})
+
+    def upsert_many(self, kind: str, documents: List[tuple]) -> None:
+        self.db.execute(self.UPSERT, [
+            {"kind": kind, "ref_id": ref_id, "title": title, "body": body}
+            for ref_id, title, body in documents
+        ])
+
+    def remove(self, kind: str, ref_id: int) -> None:
+        self.db.execute(self.DELETE, {"kind": kind, "ref_id": ref_id})
+
+    def remove_many(self, kind: str, ref_ids: List[int]) -> None:
+        self.db.execute(self.DELETE, [{"kind": kind, "ref_id": ref_id} for ref_id in ref_ids])
+
+    OPTIONS = f"StartSel={SENTINEL_START}, StopSel={SENTINEL_END}, MaxFragments=2, MaxWords=20, MinWords=5"
+
+    def search(self, query: str, kind: Optional[str], limit: int) -> List[dict]:
+        sql = self.QUERY.format(kind_filter="AND kind = :kind" if kind else "")
+        rows = self.db.execute(
+            text(sql), {"q": query, "kind": kind, "limit": limit, "options": self.OPTIONS}
+        )
+        return [{**row._mapping, "snippet": _highlight(row.snippet)} for row in rows]
+
+
+class SQLiteSearchBackend:
+    """FTS5 backend. Rowids encode (kind, ref_id) so writes are point updates."""
+
+    CREATE = text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+        "title, body, kind UNINDEXED, ref_id UNINDEXED, tokenize='porter unicode61')"
+    )
+
+    QUERY = """
+        SELECT kind, ref_id, title, -bm25(search_fts, 10.0, 1.0) AS rank,
+               snippet(search_fts, CASE WHEN body = '' THEN 0 ELSE 1 END,
+                       :start, :end, '...', 16) AS snippet
+        FROM search_fts
+        WHERE search_fts MATCH :q {kind_filter}
+        ORDER BY bm25(search_fts, 10.0, 1.0)
+        LIMIT :limit
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _rowid(kind: str, ref_id: int) -> int:
+        return ref_id * KIND_SLOTS + KINDS[kind]
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """Turn free text into an FTS5 query: every term must match, last one as a prefix."""
+        tokens = _TOKEN_PATTERN.findall(query)
+        if not tokens:
+            return ""
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def upsert(self, kind: str, ref_id: int, title: str, body: str) -> None:
+        rowid = self._rowid(kind, ref_id)
+        self.db.execute(text("DELETE FROM search_fts WHERE rowid = :rowid"), {"rowid": rowid})
+        self.db.execute(
+            text("INSERT INTO search_fts (rowid, title, body, kind, ref_id) "
+                 "VALUES (:rowid, :title, :body, :kind, :ref_id)"),
+            {"rowid": rowid, "title": title, "body": body, "kind": kind, "ref_id": ref_id}
+        )
+
+    def upsert_many(self, kind: str, documents: List[tuple]) -> None:
+        rows = [
+            {"rowid": self._rowid(kind, ref_id), "title": title, "body": body, "kind": kind, "ref_id": ref_id}
+            for ref_id, title, body in documents
+        ]
+        self.db.execute(text("DELETE FROM search_fts WHERE rowid = :rowid"), rows)
+        self.db.execute(
+            text("INSERT INTO search_fts (rowid, title, body, kind, ref_id) "
+                 "VALUES (:rowid, :title, :body, :kind, :ref_id)"),
+            rows
+        )
+
+    def remove(self, kind: str, ref_id: int) -> None:
+        self.db.execute(
+            text("DELETE FROM search_fts WHERE rowid = :rowid"),
+            {"rowid": self._rowid(kind, ref_id)}
+        )
+
+    def remove_many(self, kind: str, ref_ids: List[int]) -> None:
+        self.db.execute(
+            text("DELETE FROM search_fts WHERE rowid = :rowid"),
+            [{"rowid": self._rowid(kind, ref_id)} for ref_id in ref_ids]
+        )
+
+    def search(self, query: str, kind: Optional[str], limit: int) -> List[dict]:
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        sql = self.QUERY.format(kind_filter="AND kind = :kind" if kind else "")
+        rows = self.db.execute(text(sql), {
+            "q": expression, "kind": kind, "limit": limit, "start": SENTINEL_START, "end": SENTINEL_END,
+        })
+        return [{**row._mapping, "snippet": _highlight(row.snippet)} for row in rows]
+
+
+class SearchIndex:
+    """Service for maintaining and querying the full-text index."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        if db.get_bind().dialect.name == "postgresql":
+            self.backend = PostgresSearchBackend(db)
+        else:
+            self.backend = SQLiteSearchBackend(db)
+
+    def index(self, kind: str, obj) -> None:
+        """Add or refresh a skill, session or video (or drop a cancelled session). Call before committing."""
+        if not _searchable(kind, obj):
+            self.backend.remove(kind, obj.id)
+            return
+        title, body = _document_fields(kind, obj)
+        self.backend.upsert(kind, obj.id, title, body)
+
+    def index_many(self, kind: str, objs) -> None:
+        """Add or refresh several documents of one kind in a single batch. Call before committing."""
+        documents, dropped = [], []
+        for obj in objs:
+            if _searchable(kind, obj):
+                documents.append((obj.id, *_document_fields(kind, obj)))
+            else:
+                dropped.append(obj.id)
+        if documents:
+            self.backend.upsert_many(kind, documents)
+        if dropped:
+            self.backend.remove_many(kind, dropped)
+
+    def remove(self, kind: str, ref_id: int) -> None:
+        """Remove a document. Call before committing."""
+        self.backend.remove(kind, ref_id)
+
+    def remove_many(self, kind: str, ref_ids: List[int]) -> None:
+        """Remove several documents of one kind in a single batch. Call before committing."""
+        if ref_ids:
+            self.backend.remove_many(kind, list(ref_ids))
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Ranked, highlighted matches for a free-text query."""
+        return self.backend.search(query, kind, limit)
+
+    def rebuild(self) -> int:
+        """Re-index every live skill, session and video. Returns the document count."""
+        from app.skills.models import Skill
+        from app.sessions.models import Session as LearningSession
+        from app.videos.models import Video
+
+        count = 0
+        for kind, model in (("skill", Skill), ("session", LearningSession), ("video", Video)):
+            query = self.db.query(model)
+            if hasattr(model, "deleted_at"):
+                query = query.filter(model.deleted_at.is_(None))
+            if model is LearningSession:
+                query = query.filter(LearningSession.status.is_distinct_from("cancelled"))
+            for obj in query.yield_per(1000):
+                self.index(kind, obj)
+                count += 1
+        self.db.commit()
+        return count
+
+
+def ensure_sqlite_index(engine) -> None:
+    """Create (and populate, when new) the FTS5 table on SQLite databases."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'search_fts'")
+        ).first()
+        connection.execute(SQLiteSearchBackend.CREATE)
+    if not exists:
+        from app.db.database import SessionLocal
+        db = SessionLocal()
+        try:
+            SearchIndex(db).rebuild()
+        finally:
+            db.close()
@@ -0,0 +1,343 @@
+"""
+Attendance check-in for live sessions.
+
+At the top of the hour every enrolled student joins at once, so check-ins
+arrive in bursts of thousands within a few seconds. Two things keep that
+cheap:
+
+* Each check-in is validated against the session's roster (enrollments
+  with their parents' user ids, plus the session's time window), loaded
+  with one query and cached for ``ATTENDANCE_ROSTER_TTL_SECONDS``.
+  Concurrent misses for the same session wait for a single load, and
+  enrolling or editing a session drops its cached roster.
+* Accepted check-ins are queued in memory, and a writer thread drains the
+  queue every ``ATTENDANCE_FLUSH_SECONDS`` (sooner once
+  ``ATTENDANCE_BATCH_SIZE`` are waiting) as multi-row
+  ``INSERT ... ON CONFLICT DO NOTHING`` statements into
+  ``session_attendance``. The first check-in wins, so repeats and retries
+  are harmless.
+
+Loss window: queued check-ins live only in memory until written, so a
+crash loses at most the last flush interval; a clean shutdown flushes
+first. A batch that fails to write is put back and retried. Once
+``ATTENDANCE_MAX_PENDING`` check-ins are waiting, new ones are refused
+(503) rather than growing memory without bound.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DBSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.sessions.models import Session, SessionAttendance
+from app.users.models import Parent, SessionEnrollment, Student
+
+logger = logging.getLogger("app")
+
+# Enrollments remembered as checked in after their row was written
+MAX_REMEMBERED = 100000
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands datetimes back without a zone."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+@dataclass(frozen=True)
+class RosterEntry:
+    """One enrolled student."""
+    enrollment_id: int
+    parent_user_id: int
+
+
+@dataclass(frozen=True)
+class Roster:
+    """Everything a check-in is validated against, for one session."""
+    session_id: int
+    status: str
+    opens_at: datetime
+    closes_at: datetime
+    students: Dict[int, RosterEntry]
+
+
+class RosterCache:
+    """Per-session rosters with single-flight loading."""
+
+    def __init__(self, ttl: float):
+        self._cache = TTLCache(ttl)
+        self._lock = threading.Lock()
+        self._loading: Dict[int, threading.Lock] = {}
+        self.counters: Dict[str, int] = {"hits": 0, "loads": 0}
+
+    def get(self, db: DBSession, session_id: int) -> Optional[Roster]:
+        """The session's roster, or None if the session does not exist."""
+        roster = self._cache.get(session_id)
+        if roster is not None:
+            self.counters["hits"] += 1
+            return roster
+        with self._lock:
+            loading = self._loading.setdefault(session_id, threading.Lock())
+        try:
+            with loading:
+                roster = self._cache.get(session_id)  # Loaded while we waited
+                if roster is None:
+                    roster = load_roster(db, session_id)
+                    self.counters["loads"] += 1
+                    if roster is not None:
+                        self._cache.set(session_id, roster)
+                else:
+                    self.counters["hits"] += 1
+        finally:
+            with self._lock:
+                self._loading.pop(session_id, None)
+        return roster
+
+    def invalidate(self, session_ids: Iterable[int]) -> None:
+        """Drop the cached rosters of these sessions."""
+        for session_id in session_ids:
+            self._cache.invalidate(session_id)
+
+    def clear(self) -> None:
+        """Drop every cached roster."""
+        self._cache.clear()
+
+
+def load_roster(db: DBSession, session_id: int) -> Optional[Roster]:
+    """Read a live session's roster: the session row plus one query for its enrollments."""
+    session = db.execute(
+        select(Session.id, Session.status, Session.schedule, Session.ends_at)
+        .where(Session.id == session_id, Session.deleted_at.is_(None))
+    ).first()
+    if session is None:
+        return None
+    rows = db.execute(
+        select(SessionEnrollment.student_id, SessionEnrollment.id, Parent.user_id)
+        .join(Student, Student.id == SessionEnrollment.student_id)
+        .join(Parent, Parent.id == Student.parent_id)
+        .where(SessionEnrollment.session_id == session_id)
+    ).all()
+    return Roster(
+        session_id=session.id,
+        status=session.status,
+        opens_at=_as_utc(session.schedule) - timedelta(minutes=settings.ATTENDANCE_OPEN_MINUTES),
+        closes_at=_as_utc(session.ends_at),
+        students={
+            student_id: RosterEntry(enrollment_id=enrollment_id, parent_user_id=user_id)
+            for student_id, enrollment_id, user_id in rows
+        },
+    )
+
+
+@dataclass(frozen=True)
+class CheckIn:
+    """A queued check-in."""
+    enrollment_id: int
+    session_id: int
+    student_id: int
+    checked_in_at: datetime
+
+
+class AttendanceQueue:
+    """Thread-safe queue of check-ins with a writer thread that inserts them in batches."""
+
+    def __init__(self, flush_seconds: float, batch_size: int, max_pending: int):
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[int, CheckIn] = {}
+        self._oldest_pending: Optional[float] = None  # Monotonic time of the oldest unwritten check-in
+        self._written: "OrderedDict[int, datetime]" = OrderedDict()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters: Dict[str, int] = {
+            "check_ins": 0, "repeats": 0, "refused": 0, "flushes": 0, "flush_failures": 0, "rows_flushed": 0,
+        }
+        self.last_flush_at: Optional[datetime] = None
+        self.last_flush_seconds = 0.0
+
+    # -- ingestion ------------------------------------------------------
+
+    def check_in(self, check_in: CheckIn) -> Tuple[Optional[datetime], bool]:
+        """
+        Queue a check-in. Returns (checked-in time, newly queued); a repeat
+        returns the earlier time, and (None, False) means the queue is full.
+        """
+        key = check_in.enrollment_id
+        with self._lock:
+            earlier = self._pending.get(key)
+            earlier_at = earlier.checked_in_at if earlier is not None else self._written.get(key)
+            if earlier_at is not None:
+                self.counters["repeats"] += 1
+                return earlier_at, False
+            if len(self._pending) >= self.max_pending:
+                self.counters["refused"] += 1
+                return None, False
+            self._pending[key] = check_in
+            if self._oldest_pending is None:
+                self._oldest_pending = time.monotonic()
+            self.counters["check_ins"] += 1
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+        return check_in.checked_in_at, True
+
+    def pending_for(self, session_id: int) -> Dict[int, datetime]:
+        """Queued, not yet written check-ins of one session, by student id."""
+        with self._lock:
+            return {
+                entry.student_id: entry.checked_in_at
+                for entry in self._pending.values()
+                if entry.session_id == session_id
+            }
+
+    # -- flushing -------------------------------------------------------
+
+    def flush(self, session_factory: Callable[[], DBSession]) -> int:
+        """Write out everything queued so far; returns the rows sent."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                oldest, self._oldest_pending = self._oldest_pending, None
+            if not batch:
+                return 0
+            started = time.monotonic()
+            db = session_factory()
+            try:
+                written = self._write(db, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._put_back(batch, oldest)
+                with self._lock:
+                    self.counters["flush_failures"] += 1
+                raise
+            finally:
+                db.close()
+            with self._lock:
+                for key, entry in batch.items():
+                    self._written[key] = entry.checked_in_at
+                while len(self._written) > MAX_REMEMBERED:
+                    self._written.popitem(last=False)
+                self.counters["flushes"] += 1
+                self.counters["rows_flushed"] += written
+                self.last_flush_at = datetime.now(timezone.utc)
+                self.last_flush_seconds = time.monotonic() - started
+            return written
+
+    def _put_back(self, batch: Dict[int, CheckIn], oldest: Optional[float]) -> None:
+        with self._lock:
+            for key, entry in batch.items():
+                # A batch put back is older than anything queued since
+                self._pending[key] = entry
+            if oldest is not None:
+                self._oldest_pending = min(oldest, self._oldest_pending or oldest)
+
+    def _write(self, db: DBSession, batch: Dict[int, CheckIn]) -> int:
+        # Enrollments removed since their check-in arrived are skipped
+        existing = set(db.execute(
+            select(SessionEnrollment.id).where(SessionEnrollment.id.in_(batch))
+        ).scalars())
+        rows = [
+            {
+                "enrollment_id": key,
+                "session_id": batch[key].session_id,
+                "student_id": batch[key].student_id,
+                "checked_in_at": batch[key].checked_in_at,
+            }
+            for key in sorted(batch) if key in existing  # Fixed lock order between writers
+        ]
+        insert = _dialect_insert(db)
+        for start in range(0, len(rows), self.batch_size):
+            # One multi-row VALUES statement per chunk, not an executemany
+            db.execute(
+                insert(SessionAttendance)
+                .values(rows[start:start + self.batch_size])
+                .on_conflict_do_nothing(index_elements=["enrollment_id"])
+            )
+        return len(rows)
+
+    # -- background thread ----------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start the writer thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the writer thread after a final flush."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        from app.db.database import SessionLocal
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                self.flush(SessionLocal)
+            except Exception:
+                logger.exception("Attendance flush failed; the batch will be retried")
+            if stopping:
+                return
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+
+    def stats(self) -> Dict:
+        """Queue size, counters and flush lag (age of the oldest unwritten check-in)."""
+        with self._lock:
+            oldest = self._oldest_pending
+            return {
+                "running": self.running,
+                "pending": len(self._pending),
+                "flush_lag_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+                "last_flush_at": self.last_flush_at,
+                "last_flush_seconds": round(self.last_flush_seconds, 3),
+                **self.counters,
+            }
+
+
+def _dialect_insert(db: DBSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    raise NotImplementedError(f"Attendance inserts are not implemented for {dialect}")
+
+
+def check_in_window(roster: Roster, now: datetime) -> Optional[str]:
+    """Why a check-in at ``now`` is refused, or None if the session is open for it."""
+    if roster.status == "cancelled":
+        return "Session has been cancelled"
+    if now < roster.opens_at:
+        return f"Check-in opens at {roster.opens_at.strftime('%Y-%m-%d %H:%M UTC')}"
+    if now >= roster.closes_at:
+        return "Session has ended"
+    return None
+
+
+roster_cache = RosterCache(ttl=settings.ATTENDANCE_ROSTER_TTL_SECONDS)
+attendance_queue = AttendanceQueue(
+    flush_seconds=settings.ATTENDANCE_FLUSH_SECONDS,
+    batch_size=settings.ATTENDANCE_BATCH_SIZE,
+    max_pending=settings.ATTENDANCE_MAX_PENDING,
+)
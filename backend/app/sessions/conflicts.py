@@ -0,0 +1,101 @@
+"""
+Schedule conflict detection for volunteers and students.
+
+Sessions occupy the half-open interval [schedule, ends_at). No session is
+longer than ``MAX_SESSION_MINUTES``, so anything overlapping [start, end)
+must begin inside (start - MAX_SESSION_MINUTES, end). Each probe is
+therefore one bounded range scan of a (person, start, end) index:
+``ix_sessions_volunteer_schedule`` for volunteers, and
+``ix_session_enrollments_student_starts`` (enrollments carry a copy of
+their session's times) for students. The cost depends on how busy that
+window is, not on how long the person's history is.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session as DBSession
+from app.sessions.models import Session
+from app.users.models import SessionEnrollment
+
+MAX_SESSION_MINUTES = 8 * 60
+MAX_SESSION_LENGTH = timedelta(minutes=MAX_SESSION_MINUTES)
+
+# Conflicts reported back to the caller at most
+REPORT_LIMIT = 5
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands datetimes back without a zone."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _live(query):
+    return query.filter(Session.deleted_at.is_(None), Session.status != "cancelled")
+
+
+def volunteer_conflicts(
+    db: DBSession,
+    volunteer_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_session_id: Optional[int] = None
+) -> List[Session]:
+    """The volunteer's sessions overlapping [start, end)."""
+    query = _live(db.query(Session)).filter(
+        Session.volunteer_id == volunteer_id,
+        Session.schedule > start - MAX_SESSION_LENGTH,
+        Session.schedule < end,
+        Session.ends_at > start
+    )
+    if exclude_session_id is not None:
+        query = query.filter(Session.id != exclude_session_id)
+    return query.order_by(Session.schedule).limit(REPORT_LIMIT).all()
+
+
+def student_conflicts(db: DBSession, student_id: int, start: datetime, end: datetime) -> List[Session]:
+    """Sessions the student is enrolled in that overlap [start, end)."""
+    query = _live(
+        db.query(Session).join(SessionEnrollment, SessionEnrollment.session_id == Session.id)
+    ).filter(
+        SessionEnrollment.student_id == student_id,
+        SessionEnrollment.starts_at > start - MAX_SESSION_LENGTH,
+        SessionEnrollment.starts_at < end,
+        SessionEnrollment.ends_at > start
+    )
+    return query.order_by(Session.schedule).limit(REPORT_LIMIT).all()
+
+
+def batch_volunteer_conflicts(
+    db: DBSession,
+    volunteer_id: int,
+    intervals: Sequence[Tuple[datetime, datetime]]
+) -> List[Tuple[datetime, Session]]:
+    """
+    (occurrence start, existing session) pairs for a batch of intervals
+    sorted by start, such as a series' occurrences: one range query over
+    the span of the batch, then a binary search per interval.
+    """
+    if not intervals:
+        return []
+    busy = _live(db.query(Session)).filter(
+        Session.volunteer_id == volunteer_id,
+        Session.schedule > intervals[0][0] - MAX_SESSION_LENGTH,
+        Session.schedule < intervals[-1][1]
+    ).order_by(Session.schedule).all()
+    starts = [_as_utc(session.schedule) for session in busy]
+
+    conflicts = []
+    for start, end in intervals:
+        low = bisect_right(starts, start - MAX_SESSION_LENGTH)
+        high = bisect_left(starts, end)
+        for session in busy[low:high]:
+            if _as_utc(session.ends_at) > start:
+                conflicts.append((start, session))
+                break
+    return conflicts
+
+
+def describe(session: Session) -> str:
+    """Short description of a conflicting session for error messages."""
+    when = _as_utc(session.schedule).strftime("%Y-%m-%d %H:%M UTC")
+    return f'"{session.title}" (session {session.id}) at {when}'
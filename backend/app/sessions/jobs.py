@@ -0,0 +1,122 @@
+"""
+Session background jobs - side effects of session changes.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session as DBSession
+from app.core.config import settings
+from app.feeds.cache import invalidate_on_commit
+from app.jobs.services import OutboxService, job_handler
+from app.notifications.senders import Message, dispatch
+from app.reports.rollups import forget_sessions
+from app.reminders.models import SessionReminder
+from app.search.services import SearchIndex
+from app.sessions.attendance import roster_cache
+from app.sessions.models import Session, SessionAttendance, SessionSeries
+from app.sessions.services import materialize_series, series_has_more
+from app.skills.models import Skill
+from app.users.models import Parent, SessionEnrollment, Student
+
+logger = logging.getLogger("app")
+
+
+def enrolled_parent_emails(db: DBSession, session_id: int) -> List[Tuple[str, str]]:
+    """(parent email, student name) for every student enrolled in a session, in one query."""
+    return (
+        db.query(Parent.email, Student.name)
+        .join(Student, Student.parent_id == Parent.id)
+        .join(SessionEnrollment, SessionEnrollment.student_id == Student.id)
+        .filter(SessionEnrollment.session_id == session_id)
+        .order_by(Parent.email, Student.name)
+        .all()
+    )
+
+
+@job_handler("session.changed")
+def notify_session_changed(db: DBSession, payload: Dict[str, Any]) -> None:
+    """Email the parents of enrolled students that a session's schedule or status changed."""
+    session = db.get(Session, payload["session_id"])
+    if session is None:
+        return
+    changes = payload.get("changes", {})
+    summary = "\n".join(f"{field}: {old} -> {new}" for field, (old, new) in changes.items())
+    children = {}
+    for email, student_name in enrolled_parent_emails(db, session.id):
+        children.setdefault(email, []).append(student_name)
+    messages = [
+        Message(
+            to=email,
+            subject=f"Session updated: {session.title}",
+            body=f'"{session.title}" ({", ".join(names)}) has changed:\n{summary}'
+        )
+        for email, names in children.items()
+    ]
+    errors = [error for error in dispatch(messages) if error is not None]
+    if errors:
+        # Raising retries the job; parents already notified may hear twice
+        raise RuntimeError(f"{len(errors)} of {len(messages)} notifications failed: {errors[0]}")
+
+
+def purge_sessions(db: DBSession, session_ids: Sequence[int]) -> None:
+    """
+    Physically delete sessions with their enrollments, attendance, reminders
+    and search documents, and queue the report weeks that counted them: one
+    statement per table, however many sessions there are. Does not commit.
+    """
+    if not session_ids:
+        return
+    session_ids = list(session_ids)
+    volunteer_ids = db.execute(
+        select(Session.volunteer_id).where(Session.id.in_(session_ids)).distinct()
+    ).scalars().all()
+    student_ids = db.execute(
+        select(SessionEnrollment.student_id).where(SessionEnrollment.session_id.in_(session_ids)).distinct()
+    ).scalars().all()
+    db.execute(delete(SessionAttendance).where(SessionAttendance.session_id.in_(session_ids)))
+    db.execute(delete(SessionEnrollment).where(SessionEnrollment.session_id.in_(session_ids)))
+    db.execute(delete(SessionReminder).where(SessionReminder.session_id.in_(session_ids)))
+    SearchIndex(db).remove_many("session", session_ids)
+    forget_sessions(db, session_ids)
+    db.execute(delete(Session).where(Session.id.in_(session_ids)))
+    invalidate_on_commit(db, "volunteer", volunteer_ids)
+    invalidate_on_commit(db, "student", student_ids)
+    roster_cache.invalidate(session_ids)
+
+
+@job_handler("session.reap")
+def reap_session(db: DBSession, payload: Dict[str, Any]) -> None:
+    """Remove a soft-deleted session and everything that points at it."""
+    deleted = db.execute(
+        select(Session.id).where(Session.id == payload["session_id"], Session.deleted_at.is_not(None))
+    ).scalar()
+    if deleted is not None:
+        purge_sessions(db, [deleted])
+
+
+@job_handler("series.materialize")
+def roll_series_forward(db: DBSession, payload: Dict[str, Any]) -> None:
+    """Store a series' occurrences up to the rolling horizon, then schedule the next run."""
+    series = db.execute(
+        select(SessionSeries).where(SessionSeries.id == payload["series_id"]).with_for_update()
+    ).scalar()
+    if series is None or series.status != "active":
+        return
+    skill = db.get(Skill, series.skill_id)
+    if skill is None or skill.deleted_at is not None:
+        return
+    now = datetime.now(timezone.utc)
+    conflicts = materialize_series(db, series, now + timedelta(days=settings.SERIES_HORIZON_DAYS))
+    for occurrence, existing in conflicts:
+        logger.warning(
+            "Series %s: skipped the %s occurrence, which overlaps session %s",
+            series.id, occurrence.isoformat(), existing.id
+        )
+    invalidate_on_commit(db, "volunteer", [series.volunteer_id])
+    if series_has_more(series):
+        OutboxService(db).enqueue(
+            "series.materialize",
+            {"series_id": series.id},
+            run_at=now + timedelta(hours=settings.SERIES_REFRESH_HOURS)
+        )
@@ -1,7 +1,7 @@
 """
 Session models for scheduled learning sessions.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -13,19 +13,88 @@ class Session(Base):
     Created by volunteers, linked to a skill.
     """
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Serves status/time-window listings and the "upcoming" range scan.
+        # Partial: deleted sessions waiting to be reaped are left out
+        Index(
+            "ix_sessions_status_schedule", "status", "schedule",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        # Time-window listings without a status filter, in schedule order
+        Index(
+            "ix_sessions_schedule_live", "schedule",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        # Also finds a deleted skill's sessions, so it covers deleted rows too
+        Index("ix_sessions_skill_id_schedule", "skill_id", "schedule"),
+        # Series-wide edits touch one series' future occurrences
+        Index("ix_sessions_series_id_schedule", "series_id", "schedule"),
+        # Overlap probes for one volunteer's live sessions (see app.sessions.conflicts)
+        Index(
+            "ix_sessions_volunteer_schedule", "volunteer_id", "schedule", "ends_at",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        # Change watermarks for the weekly report rollups (see app.reports.rollups)
+        Index("ix_sessions_created_at", "created_at"),
+        Index("ix_sessions_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
     volunteer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    series_id = Column(Integer, ForeignKey("session_series.id"), nullable=True)  # Set for occurrences of a series
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     schedule = Column(DateTime(timezone=True), nullable=False)
+    duration_minutes = Column(Integer, nullable=False, default=60)
+    ends_at = Column(DateTime(timezone=True), nullable=False)  # schedule + duration, kept by the service
     meeting_link = Column(String, nullable=True)  # Zoom, Google Meet, etc.
     status = Column(String, default="scheduled")  # scheduled, completed, cancelled
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Set on delete; the row is reaped later
     
     # Relationships
     skill = relationship("Skill", back_populates="sessions")
     volunteer = relationship("User", back_populates="volunteer_sessions", foreign_keys=[volunteer_id])
     enrollments = relationship("SessionEnrollment", back_populates="session")
+
+
+class SessionSeries(Base):
+    """
+    Recurring session series - a template plus a recurrence rule.
+    Occurrences are stored as ordinary sessions up to ``materialized_until``
+    and computed on the fly beyond it.
+    """
+    __tablename__ = "session_series"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False, index=True)
+    volunteer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    meeting_link = Column(String, nullable=True)
+    dtstart = Column(DateTime(timezone=True), nullable=False)  # First occurrence
+    duration_minutes = Column(Integer, nullable=False, default=60)
+    rrule = Column(String, nullable=False)  # e.g. FREQ=WEEKLY;BYDAY=MO,WE
+    timezone = Column(String, nullable=False, default="UTC")  # Wall-clock time is kept in this zone
+    status = Column(String, nullable=False, default="active")  # active, cancelled
+    materialized_until = Column(DateTime(timezone=True), nullable=False)  # Occurrences before this exist as sessions
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class SessionAttendance(Base):
+    """
+    A student's check-in to a session they are enrolled in. Written in
+    batches by ``app.sessions.attendance``; the first check-in wins.
+    """
+    __tablename__ = "session_attendance"
+    
+    enrollment_id = Column(Integer, ForeignKey("session_enrollments.id", ondelete="CASCADE"), primary_key=True)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
+    checked_in_at = Column(DateTime(timezone=True), nullable=False)
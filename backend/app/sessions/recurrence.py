@@ -0,0 +1,161 @@
+"""
+Recurrence rules for session series.
+
+Supports the subset of RFC 5545 RRULE that weekly classes need::
+
+    FREQ=DAILY|WEEKLY|MONTHLY;INTERVAL=n;BYDAY=MO,WE;COUNT=n;UNTIL=20301231T000000Z
+
+Occurrences keep the series' local wall-clock time in its time zone, so a
+class at 16:00 stays at 16:00 across daylight saving changes; they are
+returned in UTC.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_COUNT = 1000
+
+
+def _parse_until(value: str) -> datetime:
+    for pattern in ("%Y%m%dT%H%M%SZ", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, pattern).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise ValueError(f"UNTIL must look like 20301231T000000Z, got {value!r}")
+
+
+def _add_months(day: date, months: int) -> Optional[date]:
+    """The same day of the month ``months`` later, or None if that month is too short."""
+    month_index = day.month - 1 + months
+    try:
+        return day.replace(year=day.year + month_index // 12, month=month_index % 12 + 1)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class Recurrence:
+    """A parsed recurrence rule."""
+    freq: str
+    interval: int = 1
+    byday: Tuple[int, ...] = ()
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+    @classmethod
+    def parse(cls, rule: str) -> "Recurrence":
+        """Parse an RRULE string; raises ValueError for anything unsupported."""
+        parts = {}
+        for part in rule.strip().upper().removeprefix("RRULE:").split(";"):
+            if not part:
+                continue
+            name, separator, value = part.partition("=")
+            if not separator or not value:
+                raise ValueError(f"Malformed rule part {part!r}")
+            parts[name] = value
+
+        freq = parts.pop("FREQ", None)
+        if freq not in FREQUENCIES:
+            raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+        interval = int(parts.pop("INTERVAL", "1"))
+        if interval < 1:
+            raise ValueError("INTERVAL must be at least 1")
+        byday: Tuple[int, ...] = ()
+        if "BYDAY" in parts:
+            if freq != "WEEKLY":
+                raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+            days = parts.pop("BYDAY").split(",")
+            if any(day not in WEEKDAYS for day in days):
+                raise ValueError(f"BYDAY days must be among {','.join(WEEKDAYS)}")
+            byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+        count = int(parts.pop("COUNT")) if "COUNT" in parts else None
+        if count is not None and not 1 <= count <= MAX_COUNT:
+            raise ValueError(f"COUNT must be between 1 and {MAX_COUNT}")
+        until = _parse_until(parts.pop("UNTIL")) if "UNTIL" in parts else None
+        if count is not None and until is not None:
+            raise ValueError("COUNT and UNTIL cannot both be set")
+        if parts:
+            raise ValueError(f"Unsupported rule parts: {', '.join(sorted(parts))}")
+        return cls(freq=freq, interval=interval, byday=byday, count=count, until=until)
+
+    def __str__(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.byday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append("UNTIL=" + self.until.strftime("%Y%m%dT%H%M%SZ"))
+        return ";".join(parts)
+
+    def _local_dates(self, first: date, skip_periods: int) -> Iterator[date]:
+        """Candidate dates in order, starting ``skip_periods`` periods after ``first``."""
+        period = skip_periods
+        if self.freq == "DAILY":
+            while True:
+                yield first + timedelta(days=period * self.interval)
+                period += 1
+        elif self.freq == "WEEKLY":
+            week_start = first - timedelta(days=first.weekday())
+            days = self.byday or (first.weekday(),)
+            while True:
+                monday = week_start + timedelta(weeks=period * self.interval)
+                for weekday in days:
+                    day = monday + timedelta(days=weekday)
+                    if day >= first:
+                        yield day
+                period += 1
+        else:
+            while True:
+                day = _add_months(first, period * self.interval)
+                if day is not None:
+                    yield day
+                period += 1
+
+    def occurrences(
+        self,
+        dtstart: datetime,
+        tz: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[datetime]:
+        """
+        Occurrence times (UTC) in [start, end), in order. ``end`` may only be
+        omitted for rules that finish on their own (COUNT or UNTIL).
+        """
+        if end is None and self.count is None and self.until is None:
+            raise ValueError("An open-ended rule needs an end bound")
+        zone = ZoneInfo(tz)
+        if dtstart.tzinfo is None:
+            dtstart = dtstart.replace(tzinfo=timezone.utc)
+        local_start = dtstart.astimezone(zone)
+        wall_time = local_start.timetz().replace(tzinfo=None)
+
+        # Without COUNT nothing before the window matters, so skip whole periods
+        skip = 0
+        if start is not None and self.count is None and self.freq != "MONTHLY":
+            days_ahead = (start.astimezone(zone).date() - local_start.date()).days - 7
+            if days_ahead > 0:
+                period_days = self.interval * (7 if self.freq == "WEEKLY" else 1)
+                skip = days_ahead // period_days
+
+        seen = 0
+        for day in self._local_dates(local_start.date(), skip):
+            moment = datetime.combine(day, wall_time, tzinfo=zone).astimezone(timezone.utc)
+            if moment < dtstart:
+                continue
+            if self.until is not None and moment > self.until:
+                return
+            if end is not None and moment >= end:
+                return
+            seen += 1
+            if start is None or moment >= start:
+                yield moment
+            if self.count is not None and seen >= self.count:
+                return
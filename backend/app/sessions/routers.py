@@ -1,19 +1,26 @@
 """
 Session routers - API endpoints for session operations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
-from app.core.dependencies import require_volunteer, require_parent, require_any_auth, get_current_user
+from typing import List, Optional
+from datetime import datetime
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import (
+    require_admin, require_volunteer, require_parent, require_any_auth, get_current_user
+)
 from app.users.models import User
 from app.sessions.schemas import (
     SessionCreate, SessionResponse, SessionUpdate,
-    SessionEnrollmentCreate, SessionEnrollmentResponse
+    SessionEnrollmentCreate, SessionEnrollmentResponse, SESSION_STATUSES,
+    SessionSeriesCreate, SessionSeriesUpdate, SessionSeriesResponse, CalendarOccurrence,
+    AttendanceCheckIn, AttendanceAccepted, AttendanceRecord, AttendanceQueueStats
+)
+from app.sessions.services import (
+    SessionService, SessionEnrollmentService, SessionSeriesService, AttendanceService
 )
-from app.sessions.services import SessionService, SessionEnrollmentService
 
-router = APIRouter(prefix="/sessions", tags=["sessions"])
+router = APIRouter(prefix="/sessions", tags=["sessions"], route_class=DBSessionRoute)
 
 
 @router.post("/", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
@@ -35,12 +42,41 @@ async def create_session(
 async def get_all_sessions(
     skip: int = 0,
     limit: int = 100,
+    start: Optional[datetime] = Query(None, alias="from", description="Only sessions scheduled at or after this time"),
+    end: Optional[datetime] = Query(None, alias="to", description="Only sessions scheduled before this time"),
+    session_status: Optional[str] = Query(None, alias="status", description="scheduled, completed or cancelled"),
+    skill_id: Optional[int] = None,
     current_user: User = Depends(require_any_auth),
     db: Session = Depends(get_db)
 ):
-    """Get all sessions (authenticated users only)."""
+    """Get sessions ordered by schedule, with optional time window, status and skill filters."""
+    if session_status and session_status not in SESSION_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Status must be one of: {', '.join(SESSION_STATUSES)}"
+        )
+    
     session_service = SessionService(db)
-    return session_service.get_all(skip=skip, limit=limit)
+    return session_service.get_all(
+        skip=skip,
+        limit=limit,
+        start=start,
+        end=end,
+        status=session_status,
+        skill_id=skill_id
+    )
+
+
+@router.get("/upcoming", response_model=List[SessionResponse])
+async def get_upcoming_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    skill_id: Optional[int] = None,
+    current_user: User = Depends(require_any_auth),
+    db: Session = Depends(get_db)
+):
+    """Get the next scheduled sessions, soonest first."""
+    session_service = SessionService(db)
+    return session_service.get_upcoming(limit=limit, skill_id=skill_id)
 
 
 @router.get("/my-sessions", response_model=List[SessionResponse])
@@ -53,6 +89,76 @@ async def get_my_sessions(
     return session_service.get_by_volunteer(current_user.id)
 
 
+@router.get("/calendar", response_model=List[CalendarOccurrence])
+async def get_calendar(
+    start: datetime = Query(..., alias="from", description="Start of the window"),
+    end: datetime = Query(..., alias="to", description="End of the window (exclusive)"),
+    skill_id: Optional[int] = None,
+    volunteer_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=2000),
+    current_user: User = Depends(require_any_auth),
+    db: Session = Depends(get_db)
+):
+    """
+    Calendar view of a time window, including occurrences of recurring
+    series that are too far ahead to be stored as sessions yet.
+    """
+    session_service = SessionService(db)
+    return session_service.get_calendar(start, end, skill_id=skill_id, volunteer_id=volunteer_id, limit=limit)
+
+
+# Recurring series endpoints
+@router.post("/series", response_model=SessionSeriesResponse, status_code=status.HTTP_201_CREATED)
+async def create_series(
+    series_data: SessionSeriesCreate,
+    current_user: User = Depends(require_volunteer),
+    db: Session = Depends(get_db)
+):
+    """
+    Create a recurring series, e.g. ``FREQ=WEEKLY;BYDAY=TU,TH``.
+    Occurrences within the next few weeks are created as sessions at once.
+    """
+    series_service = SessionSeriesService(db)
+    return series_service.create(series_data, current_user.id)
+
+
+@router.get("/series/{series_id}", response_model=SessionSeriesResponse)
+async def get_series(
+    series_id: int,
+    current_user: User = Depends(require_any_auth),
+    db: Session = Depends(get_db)
+):
+    """Get a specific series by ID."""
+    series_service = SessionSeriesService(db)
+    series = series_service.get_by_id(series_id)
+    if not series:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Series not found"
+        )
+    return series
+
+
+@router.patch("/series/{series_id}", response_model=SessionSeriesResponse)
+async def update_series(
+    series_id: int,
+    series_data: SessionSeriesUpdate,
+    current_user: User = Depends(require_volunteer),
+    db: Session = Depends(get_db)
+):
+    """Edit a series and all of its future occurrences (only by creator)."""
+    series_service = SessionSeriesService(db)
+    return series_service.update(series_id, series_data, current_user.id)
+
+
+@router.get("/attendance/stats", response_model=AttendanceQueueStats)
+async def get_attendance_stats(
+    current_user: User = Depends(require_admin)
+):
+    """Get this process's check-in queue size, counters and flush lag (admin only)."""
+    return AttendanceService.stats()
+
+
 @router.get("/{session_id}", response_model=SessionResponse)
 async def get_session(
     session_id: int,
@@ -61,7 +167,7 @@ async def get_session(
 ):
     """Get a specific session by ID."""
     session_service = SessionService(db)
-    session = session_service.get_by_id(session_id)
+    session = await session_service.get_by_id_async(session_id)
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -138,7 +244,7 @@ async def get_student_enrollments(
         )
     
     student_service = StudentService(db)
-    student = student_service.get_by_id(student_id)
+    student = await student_service.get_by_id_async(student_id)
     if not student or student.parent_id != parent.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -147,3 +253,54 @@ async def get_student_enrollments(
     
     enrollment_service = SessionEnrollmentService(db)
     return enrollment_service.get_student_enrollments(student_id)
+
+
+# Attendance endpoints
+@router.post(
+    "/{session_id}/check-in",
+    response_model=AttendanceAccepted,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def check_in(
+    session_id: int,
+    check_in_data: AttendanceCheckIn,
+    current_user: User = Depends(require_parent),
+    db: Session = Depends(get_db)
+):
+    """
+    Check an enrolled student in to a session (parent only).
+    Opens ATTENDANCE_OPEN_MINUTES before the start and closes when the
+    session ends; checking in again is harmless.
+    """
+    attendance_service = AttendanceService(db)
+    checked_in_at, repeat = attendance_service.check_in(session_id, check_in_data.student_id, current_user.id)
+    return AttendanceAccepted(
+        session_id=session_id,
+        student_id=check_in_data.student_id,
+        checked_in_at=checked_in_at,
+        already_checked_in=repeat
+    )
+
+
+@router.get("/{session_id}/attendance", response_model=List[AttendanceRecord])
+async def get_session_attendance(
+    session_id: int,
+    current_user: User = Depends(require_volunteer),
+    db: Session = Depends(get_db)
+):
+    """Get the enrolled students and their check-in times (session creator or admin)."""
+    session_service = SessionService(db)
+    session = await session_service.get_by_id_async(session_id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    if session.volunteer_id != current_user.id and current_user.role != "ADMIN":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view attendance for your own sessions"
+        )
+    
+    attendance_service = AttendanceService(db)
+    return attendance_service.get_session_attendance(session)
@@ -4,6 +4,12 @@ Pydantic schemas for session-related operations.
 from pydantic import BaseModel, Field, validator
 from typing import Optional
 from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from app.sessions.recurrence import Recurrence
+from app.sessions.conflicts import MAX_SESSION_MINUTES
+
+
+SESSION_STATUSES = ['scheduled', 'completed', 'cancelled']
 
 
 class SessionBase(BaseModel):
@@ -12,6 +18,7 @@ class SessionBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Session title")
     description: Optional[str] = Field(None, max_length=2000, description="Session description")
     schedule: datetime = Field(..., description="Scheduled date and time for the session")
+    duration_minutes: int = Field(60, ge=5, le=MAX_SESSION_MINUTES, description="Length of the session in minutes")
     meeting_link: Optional[str] = Field(None, max_length=500, description="Meeting link (Zoom, Google Meet, etc.)")
     
     @validator('meeting_link')
@@ -32,12 +39,20 @@ class SessionUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = Field(None, max_length=2000)
     schedule: Optional[datetime] = None
+    duration_minutes: Optional[int] = Field(None, ge=5, le=MAX_SESSION_MINUTES)
     meeting_link: Optional[str] = Field(None, max_length=500)
     status: Optional[str] = Field(None, description="Session status: scheduled, completed, cancelled")
     
+    @validator('skill_id', 'title', 'schedule', 'duration_minutes', 'status')
+    def validate_not_null(cls, v):
+        # Omit a field to leave it unchanged; these columns cannot be cleared
+        if v is None:
+            raise ValueError('Field cannot be null')
+        return v
+    
     @validator('status')
     def validate_status(cls, v):
-        if v and v not in ['scheduled', 'completed', 'cancelled']:
+        if v and v not in SESSION_STATUSES:
             raise ValueError('Status must be one of: scheduled, completed, cancelled')
         return v
 
@@ -46,7 +61,87 @@ class SessionResponse(SessionBase):
     """Schema for session response."""
     id: int
     volunteer_id: int
+    series_id: Optional[int] = None
+    ends_at: datetime
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+class SessionSeriesCreate(BaseModel):
+    """Schema for creating a recurring session series."""
+    skill_id: int = Field(..., description="ID of the skill this series teaches")
+    title: str = Field(..., min_length=1, max_length=200, description="Title of every occurrence")
+    description: Optional[str] = Field(None, max_length=2000)
+    meeting_link: Optional[str] = Field(None, max_length=500)
+    dtstart: datetime = Field(..., description="Date and time of the first occurrence")
+    duration_minutes: int = Field(60, ge=5, le=MAX_SESSION_MINUTES, description="Length of each occurrence in minutes")
+    rrule: str = Field(..., max_length=200, description="Recurrence rule, e.g. FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10")
+    timezone: str = Field("UTC", max_length=64, description="IANA time zone whose wall-clock time occurrences keep")
+    
+    @validator('meeting_link')
+    def validate_meeting_link(cls, v):
+        if v and not (v.startswith('http://') or v.startswith('https://')):
+            raise ValueError('Meeting link must be a valid URL')
+        return v
+    
+    @validator('rrule')
+    def validate_rrule(cls, v):
+        return str(Recurrence.parse(v))
+    
+    @validator('timezone')
+    def validate_timezone(cls, v):
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError('Unknown time zone')
+        return v
+
+
+class SessionSeriesUpdate(BaseModel):
+    """Schema for a series-wide edit; applies to the series and its future occurrences."""
+    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = Field(None, max_length=2000)
+    meeting_link: Optional[str] = Field(None, max_length=500)
+    status: Optional[str] = Field(None, description="Set to cancelled to cancel every future occurrence")
+    
+    @validator('title', 'status')
+    def validate_not_null(cls, v):
+        # Omit a field to leave it unchanged; these columns cannot be cleared
+        if v is None:
+            raise ValueError('Field cannot be null')
+        return v
+    
+    @validator('meeting_link')
+    def validate_meeting_link(cls, v):
+        if v and not (v.startswith('http://') or v.startswith('https://')):
+            raise ValueError('Meeting link must be a valid URL')
+        return v
+    
+    @validator('status')
+    def validate_status(cls, v):
+        if v and v != 'cancelled':
+            raise ValueError('A series can only be changed to cancelled')
+        return v
+
+
+class SessionSeriesResponse(BaseModel):
+    """Schema for series response."""
+    id: int
+    skill_id: int
+    volunteer_id: int
+    title: str
+    description: Optional[str]
+    meeting_link: Optional[str]
+    dtstart: datetime
+    duration_minutes: int
+    rrule: str
+    timezone: str
     status: str
+    materialized_until: datetime
     created_at: datetime
     updated_at: Optional[datetime]
     
@@ -54,6 +149,22 @@ class SessionResponse(SessionBase):
         from_attributes = True
 
 
+class CalendarOccurrence(BaseModel):
+    """
+    One entry of a calendar view. Occurrences beyond a series' stored
+    horizon have no session_id yet.
+    """
+    session_id: Optional[int]
+    series_id: Optional[int]
+    skill_id: int
+    volunteer_id: int
+    title: str
+    schedule: datetime
+    ends_at: datetime
+    meeting_link: Optional[str]
+    status: str
+
+
 class SessionEnrollmentCreate(BaseModel):
     """Schema for enrolling a student in a session."""
     student_id: int = Field(..., description="ID of the student to enroll")
@@ -69,3 +180,41 @@ class SessionEnrollmentResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class AttendanceCheckIn(BaseModel):
+    """Schema for checking a student in to a session."""
+    student_id: int = Field(..., description="ID of the enrolled student")
+
+
+class AttendanceAccepted(BaseModel):
+    """A check-in taken into the queue; it is written within one flush interval."""
+    session_id: int
+    student_id: int
+    checked_in_at: datetime
+    already_checked_in: bool
+
+
+class AttendanceRecord(BaseModel):
+    """One enrolled student and when (if at all) they checked in."""
+    student_id: int
+    student_name: str
+    enrolled_at: datetime
+    checked_in_at: Optional[datetime]
+
+
+class AttendanceQueueStats(BaseModel):
+    """State of this process's check-in queue and roster cache."""
+    running: bool
+    pending: int  # Check-ins waiting to be written
+    flush_lag_seconds: float  # Age of the oldest unwritten check-in
+    last_flush_at: Optional[datetime]
+    last_flush_seconds: float
+    check_ins: int
+    repeats: int
+    refused: int
+    flushes: int
+    flush_failures: int
+    rows_flushed: int
+    roster_hits: int
+    roster_loads: int
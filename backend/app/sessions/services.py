@@ -1,13 +1,36 @@
 """
 Session service layer - business logic for session operations.
 """
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from fastapi import HTTPException, status
-from app.sessions.models import Session
-from app.users.models import SessionEnrollment
-from app.sessions.schemas import SessionCreate, SessionUpdate, SessionEnrollmentCreate
+from app.core.config import settings
+from app.sessions.models import Session, SessionSeries, SessionAttendance
+from app.sessions.attendance import CheckIn, attendance_queue, check_in_window, roster_cache
+from app.sessions.recurrence import Recurrence
+from app.sessions.conflicts import (
+    volunteer_conflicts, student_conflicts, batch_volunteer_conflicts, describe
+)
+from app.users.models import SessionEnrollment, Student
+from app.sessions.schemas import (
+    SessionCreate, SessionUpdate, SessionEnrollmentCreate,
+    SessionSeriesCreate, SessionSeriesUpdate, CalendarOccurrence
+)
 from app.skills.models import Skill
+from app.feeds.cache import feed_cache
+from app.search.services import SearchIndex
+from app.db.loader import get_loader
+from app.jobs.services import OutboxService
+from app.recommendations.index import mark_dirty
+from app.reminders.services import reset_reminders
+
+# Changes that enrolled families are notified about
+NOTIFY_FIELDS = ("schedule", "duration_minutes", "status")
+# Changes that move a session in time
+TIME_FIELDS = ("schedule", "duration_minutes")
 
 
 class SessionService:
@@ -16,43 +39,190 @@ class SessionService:
     def __init__(self, db: Session):
         self.db = db
     
+    def _invalidate_feeds(self, session: Session) -> None:
+        """Drop cached calendar feeds and the check-in roster that list this session."""
+        roster_cache.invalidate([session.id])
+        feed_cache.invalidate_volunteer(session.volunteer_id)
+        student_ids = self.db.query(SessionEnrollment.student_id).filter(
+            SessionEnrollment.session_id == session.id
+        ).all()
+        feed_cache.invalidate_students(student_id for (student_id,) in student_ids)
+    
+    def _check_volunteer_free(
+        self, volunteer_id: int, start: datetime, end: datetime, exclude_session_id: Optional[int] = None
+    ) -> None:
+        """Refuse a time slot that overlaps another of the volunteer's sessions."""
+        conflicts = volunteer_conflicts(self.db, volunteer_id, start, end, exclude_session_id)
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Overlaps your session {describe(conflicts[0])}"
+            )
+    
     def get_by_id(self, session_id: int) -> Optional[Session]:
         """Get session by ID."""
-        return self.db.query(Session).filter(Session.id == session_id).first()
+        return get_loader(self.db).load(Session, session_id)
     
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Session]:
-        """Get all sessions with pagination."""
-        return self.db.query(Session).offset(skip).limit(limit).all()
+    async def get_by_id_async(self, session_id: int) -> Optional[Session]:
+        """Get session by ID, batching with concurrent lookups (e.g. batched sub-requests)."""
+        return await get_loader(self.db).load_async(Session, session_id)
+    
+    def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        status: Optional[str] = None,
+        skill_id: Optional[int] = None
+    ) -> List[Session]:
+        """
+        Get sessions ordered by schedule, optionally limited to a time window
+        [start, end), a status and/or a skill.
+        """
+        query = self.db.query(Session).filter(Session.deleted_at.is_(None))
+        if status:
+            query = query.filter(Session.status == status)
+        if skill_id:
+            query = query.filter(Session.skill_id == skill_id)
+        if start:
+            query = query.filter(Session.schedule >= start)
+        if end:
+            query = query.filter(Session.schedule < end)
+        return query.order_by(Session.schedule, Session.id).offset(skip).limit(limit).all()
+    
+    def get_upcoming(self, limit: int = 20, skill_id: Optional[int] = None) -> List[Session]:
+        """
+        Get the next scheduled sessions.
+        Reads a bounded range of the (status, schedule) index, so the cost
+        does not grow with the number of past sessions.
+        """
+        query = self.db.query(Session).filter(
+            Session.status == "scheduled",
+            Session.schedule >= datetime.now(timezone.utc),
+            Session.deleted_at.is_(None)
+        )
+        if skill_id:
+            query = query.filter(Session.skill_id == skill_id)
+        return query.order_by(Session.schedule).limit(limit).all()
     
     def get_by_volunteer(self, volunteer_id: int) -> List[Session]:
         """Get all sessions for a volunteer."""
-        return self.db.query(Session).filter(Session.volunteer_id == volunteer_id).all()
+        return self.db.query(Session).filter(
+            Session.volunteer_id == volunteer_id,
+            Session.deleted_at.is_(None)
+        ).all()
     
     def get_by_skill(self, skill_id: int) -> List[Session]:
         """Get all sessions for a skill."""
-        return self.db.query(Session).filter(Session.skill_id == skill_id).all()
+        return self.db.query(Session).filter(
+            Session.skill_id == skill_id,
+            Session.deleted_at.is_(None)
+        ).all()
+    
+    def get_calendar(
+        self,
+        start: datetime,
+        end: datetime,
+        skill_id: Optional[int] = None,
+        volunteer_id: Optional[int] = None,
+        limit: int = 500
+    ) -> List[CalendarOccurrence]:
+        """
+        Everything on the calendar in [start, end): stored sessions, plus
+        occurrences of active series past their stored horizon, computed
+        from the recurrence rule without touching the database.
+        """
+        start, end = _normalize(start), _normalize(end)
+        if end <= start or end - start > timedelta(days=settings.CALENDAR_MAX_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The window must be between 0 and {settings.CALENDAR_MAX_DAYS} days long"
+            )
+        
+        query = self.db.query(Session).filter(
+            Session.schedule >= start,
+            Session.schedule < end,
+            Session.deleted_at.is_(None)
+        )
+        series_query = self.db.query(SessionSeries).join(Skill, Skill.id == SessionSeries.skill_id).filter(
+            SessionSeries.status == "active",
+            SessionSeries.materialized_until < end,
+            SessionSeries.dtstart < end,
+            Skill.deleted_at.is_(None)
+        )
+        if skill_id:
+            query = query.filter(Session.skill_id == skill_id)
+            series_query = series_query.filter(SessionSeries.skill_id == skill_id)
+        if volunteer_id:
+            query = query.filter(Session.volunteer_id == volunteer_id)
+            series_query = series_query.filter(SessionSeries.volunteer_id == volunteer_id)
+        
+        entries = [
+            CalendarOccurrence(
+                session_id=session.id,
+                series_id=session.series_id,
+                skill_id=session.skill_id,
+                volunteer_id=session.volunteer_id,
+                title=session.title,
+                schedule=_normalize(session.schedule),
+                ends_at=_normalize(session.ends_at),
+                meeting_link=session.meeting_link,
+                status=session.status,
+            )
+            for session in query.order_by(Session.schedule, Session.id).limit(limit)
+        ]
+        for series in series_query:
+            window_start = max(start, _normalize(series.materialized_until))
+            moments = Recurrence.parse(series.rrule).occurrences(
+                _normalize(series.dtstart), series.timezone, window_start, end
+            )
+            entries.extend(
+                CalendarOccurrence(
+                    session_id=None,
+                    series_id=series.id,
+                    skill_id=series.skill_id,
+                    volunteer_id=series.volunteer_id,
+                    title=series.title,
+                    schedule=moment,
+                    ends_at=moment + timedelta(minutes=series.duration_minutes),
+                    meeting_link=series.meeting_link,
+                    status="scheduled",
+                )
+                for moment in islice(moments, limit)
+            )
+        entries.sort(key=lambda entry: (entry.schedule, entry.session_id is None))
+        return entries[:limit]
     
     def create(self, session_data: SessionCreate, volunteer_id: int) -> Session:
-        """Create a new session."""
+        """Create a new session, refusing one that overlaps the volunteer's other sessions."""
         # Verify skill exists
-        skill = self.db.query(Skill).filter(Skill.id == session_data.skill_id).first()
+        skill = get_loader(self.db).load(Skill, session_data.skill_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Skill not found"
             )
         
+        start = _normalize(session_data.schedule)
+        ends_at = start + timedelta(minutes=session_data.duration_minutes)
+        self._check_volunteer_free(volunteer_id, start, ends_at)
         session = Session(
             **session_data.dict(),
+            ends_at=ends_at,
             volunteer_id=volunteer_id
         )
         self.db.add(session)
+        self.db.flush()
+        SearchIndex(self.db).index("session", session)
+        mark_dirty(self.db, "session", [session.id])
         self.db.commit()
         self.db.refresh(session)
+        feed_cache.invalidate_volunteer(volunteer_id)
         return session
     
     def update(self, session_id: int, session_data: SessionUpdate, volunteer_id: int) -> Session:
-        """Update a session."""
+        """Update a session. Moving it (or un-cancelling it) onto another session's time is refused."""
         session = self.get_by_id(session_id)
         if not session:
             raise HTTPException(
@@ -68,15 +238,43 @@ class SessionService:
             )
         
         update_data = session_data.dict(exclude_unset=True)
+        changes = {}
         for field, value in update_data.items():
+            old_value = getattr(session, field)
+            if field in NOTIFY_FIELDS and _normalize(old_value) != _normalize(value):
+                changes[field] = [_jsonable(old_value), _jsonable(value)]
             setattr(session, field, value)
         
+        if any(field in update_data for field in (*TIME_FIELDS, "status")):
+            start = _normalize(session.schedule)
+            session.ends_at = start + timedelta(minutes=session.duration_minutes)
+            if session.status != "cancelled":
+                self._check_volunteer_free(session.volunteer_id, start, session.ends_at, session.id)
+            if any(field in changes for field in TIME_FIELDS):
+                # Keep the enrolled students' copies of the times in step
+                self.db.execute(
+                    update(SessionEnrollment)
+                    .where(SessionEnrollment.session_id == session.id)
+                    .values(starts_at=start, ends_at=session.ends_at)
+                    .execution_options(synchronize_session=False)
+                )
+                reset_reminders(self.db, session.id)
+        
+        SearchIndex(self.db).index("session", session)
+        mark_dirty(self.db, "session", [session.id])
+        if changes:
+            # Committed with the update itself; notifying runs in a job worker
+            OutboxService(self.db).enqueue("session.changed", {"session_id": session.id, "changes": changes})
         self.db.commit()
         self.db.refresh(session)
+        self._invalidate_feeds(session)
         return session
     
     def delete(self, session_id: int, volunteer_id: int) -> None:
-        """Delete a session."""
+        """
+        Delete a session. It disappears at once; a background job removes
+        its enrollments and reminders and then the row itself.
+        """
         session = self.get_by_id(session_id)
         if not session:
             raise HTTPException(
@@ -91,8 +289,206 @@ class SessionService:
                 detail="You can only delete your own sessions"
             )
         
-        self.db.delete(session)
+        session.deleted_at = datetime.now(timezone.utc)
+        SearchIndex(self.db).remove("session", session.id)
+        mark_dirty(self.db, "session", [session.id])
+        OutboxService(self.db).enqueue("session.reap", {"session_id": session.id})
+        self.db.commit()
+        self._invalidate_feeds(session)
+
+
+def materialize_series(db: Session, series: SessionSeries, until: datetime) -> List:
+    """
+    Store a series' occurrences before ``until`` that are not stored yet,
+    as one bulk insert, and advance its horizon. Does not commit.
+
+    Occurrences that would overlap another of the volunteer's sessions are
+    left out; they are returned as (occurrence start, existing session).
+    """
+    start = _normalize(series.materialized_until)
+    if until <= start:
+        return []
+    length = timedelta(minutes=series.duration_minutes)
+    moments = list(Recurrence.parse(series.rrule).occurrences(
+        _normalize(series.dtstart), series.timezone, start, until
+    ))
+    series.materialized_until = until
+    conflicts = batch_volunteer_conflicts(db, series.volunteer_id, [(moment, moment + length) for moment in moments])
+    taken = {moment for moment, _ in conflicts}
+    moments = [moment for moment in moments if moment not in taken]
+    if not moments:
+        return conflicts
+    sessions = db.scalars(
+        insert(Session).returning(Session, sort_by_parameter_order=True),
+        [
+            {
+                "skill_id": series.skill_id,
+                "volunteer_id": series.volunteer_id,
+                "series_id": series.id,
+                "title": series.title,
+                "description": series.description,
+                "schedule": moment,
+                "duration_minutes": series.duration_minutes,
+                "ends_at": moment + length,
+                "meeting_link": series.meeting_link,
+                "status": "scheduled",
+            }
+            for moment in moments
+        ]
+    ).all()
+    SearchIndex(db).index_many("session", sessions)
+    mark_dirty(db, "session", [session.id for session in sessions])
+    return conflicts
+
+
+def series_has_more(series: SessionSeries) -> bool:
+    """Whether the rule has occurrences beyond the stored horizon."""
+    rule = Recurrence.parse(series.rrule)
+    if rule.count is None and rule.until is None:
+        return True
+    start = _normalize(series.materialized_until)
+    return next(rule.occurrences(_normalize(series.dtstart), series.timezone, start), None) is not None
+
+
+def _normalize(value):
+    """Compare datetimes as UTC; SQLite hands them back without a zone."""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _jsonable(value):
+    return _normalize(value).isoformat() if isinstance(value, datetime) else value
+
+
+class SessionSeriesService:
+    """Service for recurring session series."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_by_id(self, series_id: int) -> Optional[SessionSeries]:
+        """Get series by ID."""
+        return get_loader(self.db).load(SessionSeries, series_id)
+    
+    def get_owned(self, series_id: int, volunteer_id: int) -> SessionSeries:
+        """Get a series, checking that the volunteer runs it."""
+        series = self.get_by_id(series_id)
+        if not series:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Series not found"
+            )
+        if series.volunteer_id != volunteer_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only change your own series"
+            )
+        return series
+    
+    def create(self, series_data: SessionSeriesCreate, volunteer_id: int) -> SessionSeries:
+        """
+        Create a series and store its occurrences within the rolling horizon.
+        A background job moves the horizon forward from then on. Refused if
+        any stored occurrence would overlap the volunteer's other sessions.
+        """
+        skill = get_loader(self.db).load(Skill, series_data.skill_id)
+        if not skill:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Skill not found"
+            )
+        
+        dtstart = _normalize(series_data.dtstart)
+        series = SessionSeries(
+            **series_data.dict(exclude={"dtstart"}),
+            dtstart=dtstart,
+            volunteer_id=volunteer_id,
+            status="active",
+            materialized_until=dtstart
+        )
+        self.db.add(series)
+        self.db.flush()
+        now = datetime.now(timezone.utc)
+        conflicts = materialize_series(self.db, series, now + timedelta(days=settings.SERIES_HORIZON_DAYS))
+        if conflicts:
+            self.db.rollback()
+            occurrence, existing = conflicts[0]
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"{len(conflicts)} occurrence(s) overlap your other sessions; the first, "
+                    f"{occurrence.strftime('%Y-%m-%d %H:%M UTC')}, overlaps {describe(existing)}"
+                )
+            )
+        if series_has_more(series):
+            OutboxService(self.db).enqueue(
+                "series.materialize",
+                {"series_id": series.id},
+                run_at=now + timedelta(hours=settings.SERIES_REFRESH_HOURS)
+            )
         self.db.commit()
+        self.db.refresh(series)
+        feed_cache.invalidate_volunteer(volunteer_id)
+        return series
+    
+    def update(self, series_id: int, series_data: SessionSeriesUpdate, volunteer_id: int) -> SessionSeries:
+        """
+        Apply an edit to the series and, with one UPDATE, to every future
+        occurrence. Past occurrences keep their details.
+        """
+        series = self.get_owned(series_id, volunteer_id)
+        update_data = series_data.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(series, field, value)
+        
+        future = (
+            (Session.series_id == series.id)
+            & (Session.schedule >= datetime.now(timezone.utc))
+            & Session.deleted_at.is_(None)
+        )
+        values = {field: value for field, value in update_data.items() if field != "status"}
+        if update_data.get("status") == "cancelled":
+            values["status"] = "cancelled"
+            # Committed with the update; families hear about each occurrence they booked
+            enrolled = self.db.execute(
+                select(SessionEnrollment.session_id)
+                .join(Session, Session.id == SessionEnrollment.session_id)
+                .where(future, Session.status == "scheduled")
+                .distinct()
+            ).scalars().all()
+            outbox = OutboxService(self.db)
+            for session_id in enrolled:
+                outbox.enqueue(
+                    "session.changed",
+                    {"session_id": session_id, "changes": {"status": ["scheduled", "cancelled"]}}
+                )
+        
+        student_ids = []
+        if values:
+            self.db.flush()
+            student_ids = self.db.execute(
+                select(SessionEnrollment.student_id)
+                .join(Session, Session.id == SessionEnrollment.session_id)
+                .where(future)
+                .distinct()
+            ).scalars().all()
+            self.db.execute(
+                update(Session).where(future).values(**values).execution_options(synchronize_session=False)
+            )
+            get_loader(self.db).forget(Session)
+            future_ids = self.db.execute(select(Session.id).where(future)).scalars().all()
+            mark_dirty(self.db, "session", future_ids)
+            roster_cache.invalidate(future_ids)
+            if {"title", "description", "status"} & values.keys():
+                SearchIndex(self.db).index_many("session", self.db.execute(
+                    select(Session.id, Session.title, Session.description, Session.status).where(future)
+                ).all())
+        self.db.commit()
+        self.db.refresh(series)
+        feed_cache.invalidate_volunteer(series.volunteer_id)
+        feed_cache.invalidate_students(student_ids)
+        return series
 
 
 class SessionEnrollmentService:
@@ -103,8 +499,10 @@ class SessionEnrollmentService:
     
     def enroll_student(self, enrollment_data: SessionEnrollmentCreate, parent_id: int) -> SessionEnrollment:
         """Enroll a student in a session."""
+        loader = get_loader(self.db)
+        
         # Verify session exists
-        session = self.db.query(Session).filter(Session.id == enrollment_data.session_id).first()
+        session = loader.load(Session, enrollment_data.session_id)
         if not session:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -113,12 +511,9 @@ class SessionEnrollmentService:
         
         # Verify student belongs to parent
         from app.users.models import Student
-        student = self.db.query(Student).filter(
-            Student.id == enrollment_data.student_id,
-            Student.parent_id == parent_id
-        ).first()
+        student = loader.load(Student, enrollment_data.student_id)
         
-        if not student:
+        if not student or student.parent_id != parent_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Student not found or does not belong to you"
@@ -136,16 +531,30 @@ class SessionEnrollmentService:
                 detail="Student is already enrolled in this session"
             )
         
-        enrollment = SessionEnrollment(**enrollment_data.dict())
+        # Check the student is free at that time
+        start, end = _normalize(session.schedule), _normalize(session.ends_at)
+        conflicts = student_conflicts(self.db, student.id, start, end)
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{student.name} is already enrolled in {describe(conflicts[0])}"
+            )
+        
+        enrollment = SessionEnrollment(**enrollment_data.dict(), starts_at=start, ends_at=end)
         self.db.add(enrollment)
         self.db.commit()
         self.db.refresh(enrollment)
+        feed_cache.invalidate_students([enrollment.student_id])
+        roster_cache.invalidate([enrollment.session_id])
         return enrollment
     
     def get_student_enrollments(self, student_id: int) -> List[SessionEnrollment]:
-        """Get all enrollments for a student."""
-        return self.db.query(SessionEnrollment).filter(
-            SessionEnrollment.student_id == student_id
+        """Get all enrollments for a student, in sessions that still exist."""
+        return self.db.query(SessionEnrollment).join(
+            Session, Session.id == SessionEnrollment.session_id
+        ).filter(
+            SessionEnrollment.student_id == student_id,
+            Session.deleted_at.is_(None)
         ).all()
     
     def get_session_enrollments(self, session_id: int) -> List[SessionEnrollment]:
@@ -153,3 +562,79 @@ class SessionEnrollmentService:
         return self.db.query(SessionEnrollment).filter(
             SessionEnrollment.session_id == session_id
         ).all()
+
+
+class AttendanceService:
+    """Service for session check-ins (see app.sessions.attendance)."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def check_in(self, session_id: int, student_id: int, user_id: int) -> Tuple[datetime, bool]:
+        """
+        Queue a check-in for one of the parent's enrolled students; returns
+        (checked-in time, already checked in). Validated against the cached
+        roster, so a warm session costs no database work.
+        """
+        roster = roster_cache.get(self.db, session_id)
+        if roster is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+        entry = roster.students.get(student_id)
+        if entry is None or entry.parent_user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Student is not enrolled in this session"
+            )
+        now = datetime.now(timezone.utc)
+        refused = check_in_window(roster, now)
+        if refused:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=refused
+            )
+        checked_in_at, queued = attendance_queue.check_in(CheckIn(
+            enrollment_id=entry.enrollment_id,
+            session_id=session_id,
+            student_id=student_id,
+            checked_in_at=now,
+        ))
+        if checked_in_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many check-ins at once, please retry",
+                headers={"Retry-After": "1"}
+            )
+        return checked_in_at, not queued
+    
+    def get_session_attendance(self, session: Session) -> List[Dict]:
+        """Every enrolled student with their check-in time, including check-ins still queued here."""
+        rows = self.db.execute(
+            select(Student.id, Student.name, SessionEnrollment.enrolled_at, SessionAttendance.checked_in_at)
+            .select_from(SessionEnrollment)
+            .join(Student, Student.id == SessionEnrollment.student_id)
+            .outerjoin(SessionAttendance, SessionAttendance.enrollment_id == SessionEnrollment.id)
+            .where(SessionEnrollment.session_id == session.id)
+            .order_by(Student.name, Student.id)
+        ).all()
+        queued = attendance_queue.pending_for(session.id)
+        return [
+            {
+                "student_id": student_id,
+                "student_name": name,
+                "enrolled_at": enrolled_at,
+                "checked_in_at": checked_in_at or queued.get(student_id),
+            }
+            for student_id, name, enrolled_at, checked_in_at in rows
+        ]
+    
+    @staticmethod
+    def stats() -> Dict:
+        """This process's queue counters and roster cache hit rate."""
+        return {
+            **attendance_queue.stats(),
+            "roster_hits": roster_cache.counters["hits"],
+            "roster_loads": roster_cache.counters["loads"],
+        }
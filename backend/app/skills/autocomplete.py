@@ -0,0 +1,281 @@
+"""
+In-process autocomplete index for skill names.
+
+Two structures are kept in memory and updated incrementally by
+SkillService:
+- a prefix index: a sorted array of (word-start suffix, skill id) keys,
+  searched with bisect (the flattened form of a prefix trie), so
+  "py" matches both "Python" and "Intro to Python";
+- a trigram index over the words used in skill names, used to correct
+  misspelled query words ("pyhton" -> "python") when the prefix index
+  returns fewer results than requested. Indexing words rather than whole
+  names keeps the posting lists bounded by the vocabulary size.
+
+Full rebuilds (on startup, then every ``AUTOCOMPLETE_REFRESH_SECONDS`` to
+pick up other workers' writes) run in a background thread with their own
+database session; requests keep using the current index until the new
+one is swapped in. Adds and removals made during a rebuild are replayed
+onto the new index before the swap.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from app.core.config import settings
+from app.skills.models import Skill
+
+logger = logging.getLogger("app")
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Trigrams shared by more words than this are too common to rank with
+MAX_TRIGRAM_POSTINGS = 1000
+
+# Minimum Jaccard similarity for a vocabulary word to replace a query word
+MIN_WORD_SIMILARITY = 0.25
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace to single spaces."""
+    return " ".join(_WORD_PATTERN.findall(text.lower()))
+
+
+def _word_suffixes(name: str) -> List[str]:
+    """The normalized name starting at each word boundary."""
+    suffixes = []
+    position = 0
+    while position < len(name):
+        suffixes.append(name[position:])
+        next_space = name.find(" ", position)
+        if next_space == -1:
+            break
+        position = next_space + 1
+    return suffixes
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SkillAutocompleteIndex:
+    """Prefix + trigram index over skill names."""
+
+    def __init__(self):
+        self._names: Dict[int, str] = {}
+        self._normalized: Dict[int, str] = {}
+        self._prefix_keys: List[Tuple[str, int]] = []
+        self._vocabulary: Counter = Counter()
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._rebuild: Optional[threading.Thread] = None
+        self._journal: Optional[List[Tuple[int, Optional[str]]]] = None  # Changes made during a rebuild
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full build has completed."""
+        return self.built_at is not None
+
+    def rebuild_in_background(self, load: Callable[[], Iterable[Tuple[int, str]]]) -> None:
+        """
+        Rebuild from the rows returned by ``load`` in a background thread
+        (no-op while a rebuild is already running).
+        """
+        with self._lock:
+            if self._rebuild is not None:
+                return
+            self._journal = []
+            self._rebuild = threading.Thread(
+                target=self._run_rebuild, args=(load,), name="autocomplete-rebuild", daemon=True
+            )
+            self._rebuild.start()
+
+    def _run_rebuild(self, load: Callable[[], Iterable[Tuple[int, str]]]) -> None:
+        try:
+            self.build(load())
+        except Exception:
+            logger.exception("Skill autocomplete rebuild failed; keeping the current index")
+            with self._lock:
+                self._journal = None
+        finally:
+            with self._lock:
+                self._rebuild = None
+
+    def build(self, rows) -> None:
+        """Replace the index contents with (id, name) rows."""
+        names: Dict[int, str] = {}
+        normalized: Dict[int, str] = {}
+        prefix_keys: List[Tuple[str, int]] = []
+        vocabulary: Counter = Counter()
+        for skill_id, name in rows:
+            key = normalize(name)
+            names[skill_id] = name
+            normalized[skill_id] = key
+            prefix_keys.extend((suffix, skill_id) for suffix in _word_suffixes(key))
+            vocabulary.update(set(key.split()))
+        prefix_keys.sort()
+
+        trigrams: Dict[str, Set[str]] = {}
+        for word in vocabulary:
+            for trigram in _trigrams(word):
+                trigrams.setdefault(trigram, set()).add(word)
+
+        with self._lock:
+            self._names = names
+            self._normalized = normalized
+            self._prefix_keys = prefix_keys
+            self._vocabulary = vocabulary
+            self._trigrams = trigrams
+            # Replay writes the loaded rows may predate
+            journal, self._journal = self._journal, None
+            for skill_id, name in journal or ():
+                if name is None:
+                    self.remove(skill_id)
+                else:
+                    self.add(skill_id, name)
+            self.built_at = time.monotonic()
+
+    def add(self, skill_id: int, name: str) -> None:
+        """Insert a skill, or re-index it under a new name."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((skill_id, name))
+            self._remove(skill_id)
+            key = normalize(name)
+            self._names[skill_id] = name
+            self._normalized[skill_id] = key
+            for suffix in _word_suffixes(key):
+                insort(self._prefix_keys, (suffix, skill_id))
+            for word in set(key.split()):
+                if self._vocabulary[word] == 0:
+                    for trigram in _trigrams(word):
+                        self._trigrams.setdefault(trigram, set()).add(word)
+                self._vocabulary[word] += 1
+
+    def remove(self, skill_id: int) -> None:
+        """Drop a skill from the index (no-op if absent)."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((skill_id, None))
+            self._remove(skill_id)
+
+    def _remove(self, skill_id: int) -> None:
+        with self._lock:
+            key = self._normalized.pop(skill_id, None)
+            if key is None:
+                return
+            del self._names[skill_id]
+            for suffix in _word_suffixes(key):
+                position = bisect_left(self._prefix_keys, (suffix, skill_id))
+                if position < len(self._prefix_keys) and self._prefix_keys[position] == (suffix, skill_id):
+                    del self._prefix_keys[position]
+            for word in set(key.split()):
+                self._vocabulary[word] -= 1
+                if self._vocabulary[word] > 0:
+                    continue
+                del self._vocabulary[word]
+                for trigram in _trigrams(word):
+                    postings = self._trigrams.get(trigram)
+                    if postings is not None:
+                        postings.discard(word)
+                        if not postings:
+                            del self._trigrams[trigram]
+
+    def _prefix_matches(self, query: str, limit: int, exclude: Set[int] = frozenset()) -> List[int]:
+        matches: List[int] = []
+        seen: Set[int] = set(exclude)
+        position = bisect_left(self._prefix_keys, (query,))
+        keys = self._prefix_keys
+        while position < len(keys) and len(matches) < limit:
+            suffix, skill_id = keys[position]
+            if not suffix.startswith(query):
+                break
+            if skill_id not in seen:
+                seen.add(skill_id)
+                matches.append(skill_id)
+            position += 1
+        return matches
+
+    def _closest_word(self, word: str) -> Optional[str]:
+        """The vocabulary word most similar to ``word`` by trigram Jaccard similarity."""
+        if word in self._vocabulary:
+            return word
+        word_trigrams = _trigrams(word)
+        postings = sorted(
+            (self._trigrams[trigram] for trigram in word_trigrams if trigram in self._trigrams),
+            key=len
+        )
+        usable = [words for words in postings if len(words) <= MAX_TRIGRAM_POSTINGS] or postings[:1]
+        counts: Counter = Counter()
+        for words in usable:
+            counts.update(words)
+
+        # A word of n characters has at most n + 1 padded trigrams
+        scored = (
+            (shared / (len(word_trigrams) + len(candidate) + 1 - shared), candidate)
+            for candidate, shared in counts.items()
+        )
+        best = heapq.nlargest(1, scored)
+        if best and best[0][0] >= MIN_WORD_SIMILARITY:
+            return best[0][1]
+        return None
+
+    def _fuzzy_matches(self, query: str, limit: int, exclude: Set[int]) -> List[int]:
+        corrected = []
+        for word in query.split():
+            closest = self._closest_word(word)
+            if closest is None:
+                return []
+            corrected.append(closest)
+        corrected_query = " ".join(corrected)
+        if corrected_query == query:
+            return []
+        return self._prefix_matches(corrected_query, limit, exclude)
+
+    def suggest(self, text: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Prefix matches first, then matches for a spelling-corrected query, as (id, name) pairs."""
+        query = normalize(text)
+        if not query:
+            return []
+        with self._lock:
+            matches = self._prefix_matches(query, limit)
+            if len(matches) < limit and len(query) >= 3:
+                matches += self._fuzzy_matches(query, limit - len(matches), set(matches))
+            return [(skill_id, self._names[skill_id]) for skill_id in matches]
+
+
+skill_autocomplete = SkillAutocompleteIndex()
+
+
+def load_skill_names() -> List[Tuple[int, str]]:
+    """Every live skill's (id, name), read with a session of its own."""
+    from app.db.database import SessionLocal
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(Skill.id, Skill.name).where(Skill.deleted_at.is_(None)).execution_options(yield_per=5000)
+        ).all()
+    finally:
+        db.close()
+
+
+def get_autocomplete_index() -> SkillAutocompleteIndex:
+    """
+    Return the shared index, starting a background rebuild when it has
+    never been built or is older than AUTOCOMPLETE_REFRESH_SECONDS. Check
+    ``ready`` before relying on it: the first build may still be running.
+    """
+    index = skill_autocomplete
+    built_at = index.built_at
+    if built_at is None or time.monotonic() - built_at > settings.AUTOCOMPLETE_REFRESH_SECONDS:
+        index.rebuild_in_background(load_skill_names)
+    return index
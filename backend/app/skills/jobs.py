@@ -0,0 +1,54 @@
+"""
+Skill background jobs - cleanup after a skill is deleted.
+"""
+from typing import Any, Dict
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session as DBSession
+from app.core.config import settings
+from app.jobs.services import OutboxService, job_handler
+from app.search.services import SearchIndex
+from app.sessions.jobs import purge_sessions
+from app.sessions.models import Session, SessionSeries
+from app.skills.models import Skill
+from app.tags.models import SkillTag
+from app.videos.models import Video
+from app.videos.progress import forget_videos
+
+
+@job_handler("skill.reap")
+def reap_skill(db: DBSession, payload: Dict[str, Any]) -> None:
+    """
+    Remove one batch of a soft-deleted skill's sessions and videos.
+
+    Each run deletes at most ``REAP_BATCH_SIZE`` children and, if any may be
+    left, enqueues the next run in the same transaction. The skill row
+    itself goes, with its series, once no session or video references it.
+    """
+    skill_id = payload["skill_id"]
+    skill = db.get(Skill, skill_id)
+    if skill is None or skill.deleted_at is None:
+        return
+    limit = settings.REAP_BATCH_SIZE
+
+    session_ids = db.execute(
+        select(Session.id).where(Session.skill_id == skill_id).limit(limit)
+    ).scalars().all()
+    purge_sessions(db, session_ids)
+
+    video_ids = []
+    if len(session_ids) < limit:
+        video_ids = db.execute(
+            select(Video.id).where(Video.skill_id == skill_id).limit(limit - len(session_ids))
+        ).scalars().all()
+        SearchIndex(db).remove_many("video", video_ids)
+        forget_videos(db, video_ids)
+        db.execute(delete(Video).where(Video.id.in_(video_ids)))
+
+    if len(session_ids) + len(video_ids) == limit:
+        # Possibly more children; leave them to the next run
+        OutboxService(db).enqueue("skill.reap", {"skill_id": skill_id})
+        return
+    SearchIndex(db).remove("skill", skill_id)
+    db.execute(delete(SessionSeries).where(SessionSeries.skill_id == skill_id))
+    db.execute(delete(SkillTag).where(SkillTag.skill_id == skill_id))
+    db.execute(delete(Skill).where(Skill.id == skill_id))
@@ -17,10 +17,14 @@ class Skill(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
     description = Column(Text, nullable=True)
+    min_age = Column(Integer, nullable=True)  # Suitable student ages, inclusive; open-ended if unset
+    max_age = Column(Integer, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Set on delete; the row is reaped later
     
     # Relationships
     sessions = relationship("Session", back_populates="skill")
     videos = relationship("Video", back_populates="skill")
+    tags = relationship("Tag", secondary="skill_tags", order_by="Tag.name", viewonly=True)
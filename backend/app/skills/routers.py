@@ -1,16 +1,16 @@
 """
 Skill routers - API endpoints for skill operations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.database import get_db
+from app.db.database import get_db, DBSessionRoute
 from app.core.dependencies import require_volunteer, require_any_auth, get_current_user
 from app.users.models import User
-from app.skills.schemas import SkillCreate, SkillResponse, SkillUpdate
+from app.skills.schemas import SkillCreate, SkillResponse, SkillUpdate, SkillSuggestion
 from app.skills.services import SkillService
 
-router = APIRouter(prefix="/skills", tags=["skills"])
+router = APIRouter(prefix="/skills", tags=["skills"], route_class=DBSessionRoute)
 
 
 @router.post("/", response_model=SkillResponse, status_code=status.HTTP_201_CREATED)
@@ -40,6 +40,21 @@ async def get_all_skills(
     return skill_service.get_all(skip=skip, limit=limit)
 
 
+@router.get("/autocomplete", response_model=List[SkillSuggestion])
+async def autocomplete_skills(
+    q: str = Query(..., min_length=1, max_length=100, description="Partially typed skill name"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(require_any_auth),
+    db: Session = Depends(get_db)
+):
+    """Suggest skills by name prefix, falling back to fuzzy matches."""
+    skill_service = SkillService(db)
+    return [
+        SkillSuggestion(id=skill_id, name=name)
+        for skill_id, name in skill_service.autocomplete(q, limit)
+    ]
+
+
 @router.get("/{skill_id}", response_model=SkillResponse)
 async def get_skill(
     skill_id: int,
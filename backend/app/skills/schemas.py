@@ -2,33 +2,54 @@
 Pydantic schemas for skill-related operations.
 """
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from app.tags.schemas import tag_names
 
 
 class SkillBase(BaseModel):
     """Base skill schema."""
     name: str = Field(..., min_length=1, max_length=100, description="Skill name")
     description: Optional[str] = Field(None, max_length=1000, description="Skill description")
+    min_age: Optional[int] = Field(None, ge=0, le=100, description="Youngest suitable student age")
+    max_age: Optional[int] = Field(None, ge=0, le=100, description="Oldest suitable student age")
+    
+    @validator('max_age')
+    def validate_age_range(cls, v, values):
+        if v is not None and values.get('min_age') is not None and v < values['min_age']:
+            raise ValueError('max_age must not be below min_age')
+        return v
 
 
 class SkillCreate(SkillBase):
     """Schema for creating a new skill."""
-    pass
+    tags: Optional[List[str]] = Field(None, max_length=20, description="Interest tags taught; defaults to the skill name and each of its words")
 
 
 class SkillUpdate(BaseModel):
     """Schema for updating a skill."""
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=1000)
+    min_age: Optional[int] = Field(None, ge=0, le=100)
+    max_age: Optional[int] = Field(None, ge=0, le=100)
+    tags: Optional[List[str]] = Field(None, max_length=20)
 
 
 class SkillResponse(SkillBase):
     """Schema for skill response."""
     id: int
+    tags: List[str] = []
     created_by: Optional[int]
     created_at: datetime
     updated_at: Optional[datetime]
     
+    _tag_names = validator('tags', pre=True, allow_reuse=True)(tag_names)
+    
     class Config:
         from_attributes = True
+
+
+class SkillSuggestion(BaseModel):
+    """Schema for a skill autocomplete suggestion."""
+    id: int
+    name: str
@@ -1,11 +1,29 @@
 """
 Skill service layer - business logic for skill operations.
 """
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
+from datetime import datetime, timezone
 from fastapi import HTTPException, status
 from app.skills.models import Skill
+from app.sessions.models import Session as ClassSession
+from app.sessions.attendance import roster_cache
+from app.users.models import SessionEnrollment
+from app.videos.models import Video
+from app.feeds.cache import invalidate_on_commit
 from app.skills.schemas import SkillCreate, SkillUpdate
+from app.search.services import SearchIndex
+from app.db.loader import get_loader
+from app.skills.autocomplete import skill_autocomplete, get_autocomplete_index
+from app.jobs.services import OutboxService
+from app.recommendations.index import mark_dirty
+from app.tags.services import TagService, name_tags
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards, so user input only ever matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class SkillService:
@@ -16,21 +34,49 @@ class SkillService:
     
     def get_by_id(self, skill_id: int) -> Optional[Skill]:
         """Get skill by ID."""
-        return self.db.query(Skill).filter(Skill.id == skill_id).first()
+        return get_loader(self.db).load(Skill, skill_id)
     
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Skill]:
         """Get all skills with pagination."""
-        return self.db.query(Skill).offset(skip).limit(limit).all()
+        return (
+            self.db.query(Skill)
+            .options(selectinload(Skill.tags))
+            .filter(Skill.deleted_at.is_(None))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def autocomplete(self, query: str, limit: int = 10) -> List[tuple]:
+        """
+        Suggest (id, name) pairs for a partially typed skill name. Until the
+        in-memory index has been built, falls back to a name prefix query.
+        """
+        index = get_autocomplete_index()
+        if index.ready:
+            return index.suggest(query, limit)
+        return (
+            self.db.query(Skill.id, Skill.name)
+            .filter(Skill.deleted_at.is_(None), Skill.name.ilike(f"{_escape_like(query.strip())}%", escape="\\"))
+            .order_by(Skill.name)
+            .limit(limit)
+            .all()
+        )
     
     def create(self, skill_data: SkillCreate, created_by: int) -> Skill:
         """Create a new skill."""
+        tags = skill_data.tags
         skill = Skill(
-            **skill_data.dict(),
+            **skill_data.dict(exclude={"tags"}),
             created_by=created_by
         )
         self.db.add(skill)
+        self.db.flush()
+        TagService(self.db).set_skill_tags(skill, name_tags(skill.name) if tags is None else tags)
+        SearchIndex(self.db).index("skill", skill)
         self.db.commit()
         self.db.refresh(skill)
+        skill_autocomplete.add(skill.id, skill.name)
         return skill
     
     def update(self, skill_id: int, skill_data: SkillUpdate) -> Skill:
@@ -43,15 +89,33 @@ class SkillService:
             )
         
         update_data = skill_data.dict(exclude_unset=True)
+        tags = update_data.pop("tags", None)
+        # Checked against the merged values before anything on the skill changes
+        min_age = update_data.get("min_age", skill.min_age)
+        max_age = update_data.get("max_age", skill.max_age)
+        if min_age is not None and max_age is not None and max_age < min_age:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="max_age must not be below min_age"
+            )
         for field, value in update_data.items():
             setattr(skill, field, value)
+        if tags is not None:
+            TagService(self.db).set_skill_tags(skill, tags)
         
+        SearchIndex(self.db).index("skill", skill)
+        mark_dirty(self.db, "skill", [skill.id])
         self.db.commit()
         self.db.refresh(skill)
+        skill_autocomplete.add(skill.id, skill.name)
         return skill
     
     def delete(self, skill_id: int) -> None:
-        """Delete a skill."""
+        """
+        Delete a skill. It disappears at once, and so do its sessions (stamped
+        deleted in the same transaction) and videos (listed only under live
+        skills); a background job removes the rows in batches, the skill last.
+        """
         skill = self.get_by_id(skill_id)
         if not skill:
             raise HTTPException(
@@ -59,5 +123,34 @@ class SkillService:
                 detail="Skill not found"
             )
         
-        self.db.delete(skill)
+        now = datetime.now(timezone.utc)
+        skill.deleted_at = now
+        live = (ClassSession.skill_id == skill.id) & ClassSession.deleted_at.is_(None)
+        session_ids = self.db.execute(select(ClassSession.id).where(live)).scalars().all()
+        video_ids = self.db.execute(select(Video.id).where(Video.skill_id == skill.id)).scalars().all()
+        if session_ids:
+            volunteer_ids = self.db.execute(
+                select(ClassSession.volunteer_id).where(live).distinct()
+            ).scalars().all()
+            student_ids = self.db.execute(
+                select(SessionEnrollment.student_id)
+                .where(SessionEnrollment.session_id.in_(session_ids))
+                .distinct()
+            ).scalars().all()
+            self.db.execute(
+                update(ClassSession).where(live).values(deleted_at=now).execution_options(synchronize_session=False)
+            )
+            get_loader(self.db).forget(ClassSession)
+            invalidate_on_commit(self.db, "volunteer", volunteer_ids)
+            invalidate_on_commit(self.db, "student", student_ids)
+        search = SearchIndex(self.db)
+        search.remove("skill", skill.id)
+        search.remove_many("session", session_ids)
+        search.remove_many("video", video_ids)
+        mark_dirty(self.db, "skill", [skill.id])
+        mark_dirty(self.db, "session", session_ids)
+        mark_dirty(self.db, "video", video_ids)
+        OutboxService(self.db).enqueue("skill.reap", {"skill_id": skill.id})
         self.db.commit()
+        roster_cache.invalidate(session_ids)
+        skill_autocomplete.remove(skill_id)
@@ -0,0 +1 @@
+"""Tags microservice package."""
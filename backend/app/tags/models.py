@@ -0,0 +1,46 @@
+"""
+Tag models - normalized interest tags for students and skills.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class Tag(Base):
+    """
+    Tag model - one normalized interest ("robotics", "3d printing").
+    Names are lowercase with single spaces; see ``app.tags.services.normalize_tag``.
+    """
+    __tablename__ = "tags"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class StudentTag(Base):
+    """
+    StudentTag model - a student's interest in a tag. The primary key
+    serves student -> tags lookups, the second index tag -> students.
+    """
+    __tablename__ = "student_tags"
+    __table_args__ = (
+        Index("ix_student_tags_tag_student", "tag_id", "student_id"),
+    )
+    
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+
+
+class SkillTag(Base):
+    """
+    SkillTag model - a tag a skill teaches. Indexed both ways like
+    ``StudentTag``.
+    """
+    __tablename__ = "skill_tags"
+    __table_args__ = (
+        Index("ix_skill_tags_tag_skill", "tag_id", "skill_id"),
+    )
+    
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,66 @@
+"""
+Tag routers - API endpoints for interest tags.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import require_admin, require_volunteer, require_any_auth
+from app.users.models import User
+from app.users.schemas import StudentResponse
+from app.skills.schemas import SkillResponse
+from app.tags.models import Tag
+from app.tags.schemas import TagDemand
+from app.tags.services import TagService
+
+router = APIRouter(prefix="/tags", tags=["tags"], route_class=DBSessionRoute)
+
+
+def _get_tag(tag_service: TagService, name: str) -> Tag:
+    tag = tag_service.get_by_name(name)
+    if not tag:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tag not found"
+        )
+    return tag
+
+
+@router.get("/demand", response_model=List[TagDemand])
+async def get_tag_demand(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(require_volunteer),
+    db: Session = Depends(get_db)
+):
+    """
+    Most wanted tags with how many students want them and how many skills
+    and upcoming sessions teach them, to help volunteers choose what to teach.
+    """
+    tag_service = TagService(db)
+    return tag_service.demand(limit)
+
+
+@router.get("/{name}/skills", response_model=List[SkillResponse])
+async def get_tag_skills(
+    name: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(require_any_auth),
+    db: Session = Depends(get_db)
+):
+    """Get the skills that teach a tag."""
+    tag_service = TagService(db)
+    return tag_service.get_skills(_get_tag(tag_service, name), skip, limit)
+
+
+@router.get("/{name}/students", response_model=List[StudentResponse])
+async def get_tag_students(
+    name: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Get the students interested in a tag (admin only)."""
+    tag_service = TagService(db)
+    return tag_service.get_students(_get_tag(tag_service, name), skip, limit)
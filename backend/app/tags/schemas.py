@@ -0,0 +1,20 @@
+"""
+Pydantic schemas for tag-related operations.
+"""
+from pydantic import BaseModel
+from typing import Any, List
+
+
+def tag_names(value: Any) -> List[str]:
+    """Validator for ``tags`` fields on responses: ORM Tag rows become their names."""
+    if value is None:
+        return []
+    return [getattr(tag, "name", tag) for tag in value]
+
+
+class TagDemand(BaseModel):
+    """Interest in one tag against what is on offer."""
+    tag: str
+    students: int  # Students interested in it
+    skills: int  # Live skills teaching it
+    upcoming_sessions: int  # Scheduled sessions of those skills
@@ -0,0 +1,201 @@
+"""
+Tag service layer - normalizes interest text into tags and answers
+tag lookups in both directions.
+"""
+import json
+import re
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from app.tags.models import Tag, StudentTag, SkillTag
+from app.skills.models import Skill
+from app.sessions.models import Session as ClassSession
+from app.users.models import Student
+
+MAX_TAG_LENGTH = 50
+# Tags kept per student or skill
+MAX_TAGS = 20
+
+_SEPARATORS = re.compile(r"[,;\n]+")
+_SPACES = re.compile(r"\s+")
+# Word breaks in a skill name; "+" and "#" stay, for names like C++ and C#
+_WORD_BREAKS = re.compile(r"[\s,;/&:()\[\]-]+")
+# Words of a skill name that say nothing about its subject
+_FILLER_WORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+
+def normalize_tag(raw: str) -> Optional[str]:
+    """Lowercase, single-spaced, without surrounding punctuation; None if nothing is left or it is too long."""
+    name = _SPACES.sub(" ", raw).strip(" \t#.-_'\"").lower()
+    if not name or len(name) > MAX_TAG_LENGTH:
+        return None
+    return name
+
+
+def normalize_tags(raw: Iterable[str]) -> List[str]:
+    """Normalized, de-duplicated tags in their original order, at most ``MAX_TAGS``."""
+    names: Dict[str, None] = {}
+    for value in raw:
+        name = normalize_tag(str(value))
+        if name is not None:
+            names.setdefault(name)
+    return list(names)[:MAX_TAGS]
+
+
+def name_tags(name: str) -> List[str]:
+    """
+    Default tags for a skill: its whole name, then each word of it, so an
+    interest in "python" matches a skill called "Python Programming".
+    """
+    words = [word for word in _WORD_BREAKS.split(name) if word.lower() not in _FILLER_WORDS]
+    return normalize_tags([name, *words])
+
+
+def parse_interests(text: Optional[str]) -> List[str]:
+    """Tags from ``Student.interests``, which holds a JSON list or comma-separated text."""
+    if not text or not text.strip():
+        return []
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = None
+    if isinstance(value, list):
+        return normalize_tags(value)
+    if isinstance(value, str):
+        text = value
+    return normalize_tags(_SEPARATORS.split(text))
+
+
+class TagService:
+    """Service for tag-related operations."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def ensure(self, names: List[str]) -> Dict[str, int]:
+        """IDs for normalized tag names, creating the missing ones."""
+        if not names:
+            return {}
+        ids = dict(self.db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+        missing = [name for name in names if name not in ids]
+        if missing:
+            self._insert_ignoring_duplicates([{"name": name} for name in missing])
+            ids.update(self.db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing))).all())
+        return ids
+    
+    def _insert_ignoring_duplicates(self, rows: List[Dict]) -> None:
+        """Concurrent requests may create the same tag; the loser reuses the winner's row."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            self.db.execute(dialect_insert(Tag).on_conflict_do_nothing(index_elements=["name"]), rows)
+            return
+        for row in rows:
+            try:
+                with self.db.begin_nested():
+                    self.db.add(Tag(**row))
+            except IntegrityError:
+                pass
+    
+    def _replace(self, model, owner_column: str, owner_id: int, names: List[str]) -> None:
+        """Make the owner's tag rows match ``names``, touching only what changed. Does not commit."""
+        owner = getattr(model, owner_column)
+        wanted = self.ensure(names)
+        current = set(self.db.execute(select(model.tag_id).where(owner == owner_id)).scalars())
+        stale = current - set(wanted.values())
+        if stale:
+            self.db.execute(delete(model).where(owner == owner_id, model.tag_id.in_(stale)))
+        added = [tag_id for tag_id in wanted.values() if tag_id not in current]
+        if added:
+            self.db.execute(insert(model), [{owner_column: owner_id, "tag_id": tag_id} for tag_id in added])
+    
+    def set_student_tags(self, student: Student) -> None:
+        """Re-derive a student's tags from their interests text. Does not commit."""
+        self._replace(StudentTag, "student_id", student.id, parse_interests(student.interests))
+        self.db.expire(student, ["tags"])
+    
+    def set_skill_tags(self, skill: Skill, names: Iterable[str]) -> None:
+        """Replace a skill's tags. Does not commit."""
+        self._replace(SkillTag, "skill_id", skill.id, normalize_tags(names))
+        self.db.expire(skill, ["tags"])
+    
+    def get_by_name(self, name: str) -> Optional[Tag]:
+        """Get a tag by (un-normalized) name."""
+        name = normalize_tag(name)
+        if name is None:
+            return None
+        return self.db.query(Tag).filter(Tag.name == name).first()
+    
+    def get_students(self, tag: Tag, skip: int = 0, limit: int = 100) -> List[Student]:
+        """Students interested in a tag, via the (tag, student) index."""
+        return (
+            self.db.query(Student)
+            .options(selectinload(Student.tags))
+            .join(StudentTag, StudentTag.student_id == Student.id)
+            .filter(StudentTag.tag_id == tag.id)
+            .order_by(Student.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def get_skills(self, tag: Tag, skip: int = 0, limit: int = 100) -> List[Skill]:
+        """Live skills teaching a tag, via the (tag, skill) index."""
+        return (
+            self.db.query(Skill)
+            .options(selectinload(Skill.tags))
+            .join(SkillTag, SkillTag.skill_id == Skill.id)
+            .filter(SkillTag.tag_id == tag.id, Skill.deleted_at.is_(None))
+            .order_by(Skill.name, Skill.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def demand(self, limit: int = 20) -> List[Dict]:
+        """
+        The most wanted tags: interested students against live skills and
+        upcoming sessions on offer. Each count is one grouped scan of a
+        tag-first index, limited to the top tags after the first.
+        """
+        top = self.db.execute(
+            select(StudentTag.tag_id, func.count().label("students"))
+            .group_by(StudentTag.tag_id)
+            .order_by(func.count().desc(), StudentTag.tag_id)
+            .limit(limit)
+        ).all()
+        if not top:
+            return []
+        tag_ids = [row.tag_id for row in top]
+        names = dict(self.db.execute(select(Tag.id, Tag.name).where(Tag.id.in_(tag_ids))).all())
+        skills = dict(self.db.execute(
+            select(SkillTag.tag_id, func.count())
+            .join(Skill, Skill.id == SkillTag.skill_id)
+            .where(SkillTag.tag_id.in_(tag_ids), Skill.deleted_at.is_(None))
+            .group_by(SkillTag.tag_id)
+        ).all())
+        sessions = dict(self.db.execute(
+            select(SkillTag.tag_id, func.count(ClassSession.id))
+            .join(ClassSession, ClassSession.skill_id == SkillTag.skill_id)
+            .where(
+                SkillTag.tag_id.in_(tag_ids),
+                ClassSession.status == "scheduled",
+                ClassSession.schedule >= datetime.now(timezone.utc),
+                ClassSession.deleted_at.is_(None)
+            )
+            .group_by(SkillTag.tag_id)
+        ).all())
+        return [
+            {
+                "tag": names[row.tag_id],
+                "students": row.students,
+                "skills": skills.get(row.tag_id, 0),
+                "upcoming_sessions": sessions.get(row.tag_id, 0),
+            }
+            for row in top
+        ]
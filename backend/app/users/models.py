@@ -1,7 +1,7 @@
 """
 User models for the application.
 """
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -18,6 +18,7 @@ class User(Base):
     clerk_id = Column(String, unique=True, index=True, nullable=False)
     role = Column(String, nullable=False)  # ADMIN, VOLUNTEER, PARENT
     approved = Column(Boolean, default=False, nullable=False)
+    email = Column(String, nullable=True)  # Contact address for reminders (volunteers)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -60,6 +61,7 @@ class Student(Base):
     # Relationships
     parent = relationship("Parent", back_populates="students")
     enrollments = relationship("SessionEnrollment", back_populates="student")
+    tags = relationship("Tag", secondary="student_tags", order_by="Tag.name", viewonly=True)  # Derived from interests
 
 
 class SessionEnrollment(Base):
@@ -68,10 +70,19 @@ class SessionEnrollment(Base):
     Tracks which students are enrolled in which sessions.
     """
     __tablename__ = "session_enrollments"
+    __table_args__ = (
+        # Overlap probes for one student's booked time (see app.sessions.conflicts)
+        Index("ix_session_enrollments_student_starts", "student_id", "starts_at", "ends_at"),
+        # Change watermark for the weekly report rollups (see app.reports.rollups)
+        Index("ix_session_enrollments_enrolled_at", "enrolled_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
-    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False)
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False, index=True)
+    # Copied from the session, so a student's timetable can be probed without joining
+    starts_at = Column(DateTime(timezone=True), nullable=False)
+    ends_at = Column(DateTime(timezone=True), nullable=False)
     enrolled_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
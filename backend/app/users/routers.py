@@ -1,10 +1,12 @@
 """
 User routers - API endpoints for user operations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.database import get_db
+from app.db.database import get_db, DBSessionRoute
+from app.recommendations.schemas import RecommendationItem
+from app.recommendations.services import RecommendationService
 from app.core.dependencies import require_admin, require_parent, get_current_user
 from app.users.models import User
 from app.users.schemas import (
@@ -14,7 +16,7 @@ from app.users.schemas import (
 )
 from app.users.services import UserService, ParentService, StudentService
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=DBSessionRoute)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -33,6 +35,10 @@ async def register_user(
     existing_user = user_service.get_by_clerk_id(user_data.clerk_id)
     
     if existing_user:
+        if user_data.email and existing_user.email != user_data.email:
+            existing_user.email = user_data.email
+            db.commit()
+        
         # User exists - update role if different
         if existing_user.role != user_data.role:
             # Update role and approval status
@@ -196,7 +202,7 @@ async def get_student(
         )
     
     student_service = StudentService(db)
-    student = student_service.get_by_id(student_id)
+    student = await student_service.get_by_id_async(student_id)
     
     if not student or student.parent_id != parent.id:
         raise HTTPException(
@@ -207,6 +213,34 @@ async def get_student(
     return student
 
 
+@router.get("/students/{student_id}/recommendations", response_model=List[RecommendationItem])
+async def get_student_recommendations(
+    student_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(require_parent),
+    db: Session = Depends(get_db)
+):
+    """Upcoming sessions and videos matching a student's interests and age (must belong to current parent)."""
+    parent_service = ParentService(db)
+    parent = parent_service.get_by_user_id(current_user.id)
+    if not parent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Parent account not found"
+        )
+    
+    student_service = StudentService(db)
+    student = await student_service.get_by_id_async(student_id)
+    
+    if not student or student.parent_id != parent.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    
+    return RecommendationService(db).for_student(student, limit)
+
+
 @router.patch("/students/{student_id}", response_model=StudentResponse)
 async def update_student(
     student_id: int,
@@ -4,6 +4,7 @@ Pydantic schemas for user-related operations.
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List
 from datetime import datetime
+from app.tags.schemas import tag_names
 
 
 class UserBase(BaseModel):
@@ -15,6 +16,7 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     """Schema for creating a new user."""
     clerk_id: str = Field(..., description="Clerk user ID")
+    email: Optional[EmailStr] = Field(None, description="Contact email (used for session reminders)")
     
     @validator('role')
     def validate_role(cls, v):
@@ -33,6 +35,7 @@ class UserResponse(UserBase):
     """Schema for user response."""
     id: int
     clerk_id: str
+    email: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -77,8 +80,11 @@ class StudentResponse(BaseModel):
     name: str
     age: int
     interests: Optional[str]
+    tags: List[str] = []  # Normalized from interests
     created_at: datetime
     
+    _tag_names = validator('tags', pre=True, allow_reuse=True)(tag_names)
+    
     class Config:
         from_attributes = True
 
@@ -2,10 +2,12 @@
 User service layer - business logic for user operations.
 """
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import HTTPException, status
 from app.users.models import User, Parent, Student
 from app.users.schemas import UserCreate, UserUpdate, ParentCreate, StudentCreate, StudentUpdate
+from app.db.loader import get_loader
+from app.tags.services import TagService
 
 
 class UserService:
@@ -16,11 +18,11 @@ class UserService:
     
     def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        return get_loader(self.db).load(User, user_id)
     
     def get_by_clerk_id(self, clerk_id: str) -> Optional[User]:
         """Get user by Clerk ID."""
-        return self.db.query(User).filter(User.clerk_id == clerk_id).first()
+        return get_loader(self.db).load(User, clerk_id, attr="clerk_id")
     
     def create(self, user_data: UserCreate) -> User:
         """Create a new user."""
@@ -75,7 +77,7 @@ class ParentService:
     
     def get_by_user_id(self, user_id: int) -> Optional[Parent]:
         """Get parent by user ID."""
-        return self.db.query(Parent).filter(Parent.user_id == user_id).first()
+        return get_loader(self.db).load(Parent, user_id, attr="user_id")
     
     def get_by_email(self, email: str) -> Optional[Parent]:
         """Get parent by email."""
@@ -110,7 +112,7 @@ class ParentService:
     
     def get_students(self, parent_id: int) -> List[Student]:
         """Get all students for a parent."""
-        parent = self.db.query(Parent).filter(Parent.id == parent_id).first()
+        parent = get_loader(self.db).load(Parent, parent_id)
         if not parent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -127,12 +129,20 @@ class StudentService:
     
     def get_by_id(self, student_id: int) -> Optional[Student]:
         """Get student by ID."""
-        return self.db.query(Student).filter(Student.id == student_id).first()
+        return get_loader(self.db).load(Student, student_id)
+    
+    async def get_by_id_async(self, student_id: int) -> Optional[Student]:
+        """Get student by ID, batching with concurrent lookups (e.g. batched sub-requests)."""
+        return await get_loader(self.db).load_async(Student, student_id)
+    
+    def get_by_ids(self, student_ids: List[int]) -> Dict[int, Student]:
+        """Get several students in one query, keyed by ID."""
+        return get_loader(self.db).load_many(Student, student_ids)
     
     def create(self, student_data: StudentCreate, parent_id: int) -> Student:
         """Create a new student."""
         # Verify parent exists
-        parent = self.db.query(Parent).filter(Parent.id == parent_id).first()
+        parent = get_loader(self.db).load(Parent, parent_id)
         if not parent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -144,6 +154,8 @@ class StudentService:
             **student_data.dict()
         )
         self.db.add(student)
+        self.db.flush()
+        TagService(self.db).set_student_tags(student)
         self.db.commit()
         self.db.refresh(student)
         return student
@@ -167,6 +179,8 @@ class StudentService:
         update_data = student_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(student, field, value)
+        if "interests" in update_data:
+            TagService(self.db).set_student_tags(student)
         
         self.db.commit()
         self.db.refresh(student)
@@ -0,0 +1,333 @@
+"""
+Video metadata enrichment - title, length and thumbnail from the provider.
+
+Metadata comes from an oEmbed endpoint (``VIDEO_OEMBED_URL``) and is cached
+in ``video_metadata`` per YouTube ID. New and changed videos get a
+"video.enrich" job, so creating a video never waits on the provider. Videos
+that predate enrichment, and cached entries past their refresh time, are
+fetched in batches with::
+
+    python -m app.videos.enrichment
+
+All fetches in a process go through one ``MetadataClient``: a single pooled
+``httpx.AsyncClient`` on its own event loop thread, with a semaphore
+bounding requests in flight and a token bucket (the rate limiter's
+``MemoryBackend``) holding the process to ``VIDEO_METADATA_RATE_PER_SECOND``
+however many job workers share it. Transient failures (timeouts, 429, 5xx)
+are retried with backoff; a video the provider refuses (private or removed)
+is cached as unavailable.
+"""
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+import httpx
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DBSession
+from app.core.config import settings
+from app.core.ratelimit import MemoryBackend
+from app.jobs.services import job_handler
+from app.videos.models import Video, VideoMetadata
+from app.videos.youtube import canonical_url
+
+logger = logging.getLogger("app")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# The provider's answer for private, removed or non-embeddable videos
+UNAVAILABLE_STATUSES = frozenset({400, 401, 403, 404})
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+# A failing video is tried again after an hour, doubling up to the refresh interval
+ERROR_BACKOFF = timedelta(hours=1)
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one video's metadata."""
+    status: str  # ok, unavailable, error
+    title: Optional[str] = None
+    author_name: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    duration_seconds: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _text(data: Dict[str, Any], key: str, limit: int = 500) -> Optional[str]:
+    value = data.get(key)
+    return value[:limit] if isinstance(value, str) and value else None
+
+
+def parse_oembed(data: Any) -> FetchResult:
+    """Pick the fields we keep out of an oEmbed response."""
+    if not isinstance(data, dict):
+        return FetchResult("error", error="Response is not a JSON object")
+    duration = data.get("duration")
+    return FetchResult(
+        "ok",
+        title=_text(data, "title"),
+        author_name=_text(data, "author_name"),
+        thumbnail_url=_text(data, "thumbnail_url", 2000),
+        # YouTube's oEmbed has no length; other providers and proxies report it
+        duration_seconds=int(duration) if isinstance(duration, (int, float)) and duration >= 0 else None,
+    )
+
+
+class MetadataClient:
+    """Fetches metadata for batches of videos from any thread, sharing one connection pool."""
+
+    def __init__(self, url: str, concurrency: int, rate_per_second: float, max_retries: int, timeout: float):
+        self.url = url
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        # Small bucket, so bursts stay within a tenth of a second's worth of requests
+        self._bucket_size = max(1, math.ceil(rate_per_second / 10))
+        self._bucket_period = self._bucket_size / rate_per_second
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="video-metadata", daemon=True)
+                thread.start()
+                asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _setup(self) -> None:
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            timeout=self.timeout,
+            follow_redirects=True
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = MemoryBackend(max_keys=1)
+
+    def close(self) -> None:
+        """Close the connection pool and stop the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def fetch_many(self, youtube_ids: Sequence[str]) -> Dict[str, FetchResult]:
+        """Fetch several videos concurrently; blocks until all are done."""
+        if not youtube_ids:
+            return {}
+        loop = self._ensure_started()
+
+        async def fetch_all() -> List[FetchResult]:
+            return await asyncio.gather(*(self._fetch(youtube_id) for youtube_id in youtube_ids))
+
+        results = asyncio.run_coroutine_threadsafe(fetch_all(), loop).result()
+        return dict(zip(youtube_ids, results))
+
+    async def _take_token(self) -> None:
+        while True:
+            wait = self._bucket.token_bucket("requests", self._bucket_size, self._bucket_period, time.monotonic())
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    async def _fetch(self, youtube_id: str) -> FetchResult:
+        error = "not attempted"
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with self._semaphore:
+                await self._take_token()
+                try:
+                    response = await self._client.get(
+                        self.url, params={"url": canonical_url(youtube_id), "format": "json"}
+                    )
+                except httpx.HTTPError as exc:
+                    error = f"{type(exc).__name__}: {exc}"
+                else:
+                    if response.status_code == 200:
+                        try:
+                            return parse_oembed(response.json())
+                        except ValueError:
+                            return FetchResult("error", error="Response is not JSON")
+                    error = f"HTTP {response.status_code}"
+                    if response.status_code in UNAVAILABLE_STATUSES:
+                        return FetchResult("unavailable", error=error)
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                    retry_after = response.headers.get("Retry-After")
+            if attempt < self.max_retries:
+                # Back off outside the semaphore so other videos keep going
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.0)
+                if retry_after and retry_after.isdigit():
+                    delay = min(RETRY_MAX_SECONDS, float(retry_after))
+                await asyncio.sleep(delay)
+        return FetchResult("error", error=error)
+
+
+metadata_client = MetadataClient(
+    url=settings.VIDEO_OEMBED_URL,
+    concurrency=settings.VIDEO_METADATA_CONCURRENCY,
+    rate_per_second=settings.VIDEO_METADATA_RATE_PER_SECOND,
+    max_retries=settings.VIDEO_METADATA_MAX_RETRIES,
+    timeout=settings.VIDEO_METADATA_TIMEOUT_SECONDS,
+)
+
+
+def needs_fetch(db: DBSession, youtube_id: str) -> bool:
+    """Whether a video's cached metadata is missing or due for a refresh (a primary key read)."""
+    cached = db.get(VideoMetadata, youtube_id)
+    if cached is None:
+        return True
+    next_fetch_at = cached.next_fetch_at
+    if next_fetch_at.tzinfo is None:
+        next_fetch_at = next_fetch_at.replace(tzinfo=timezone.utc)
+    return next_fetch_at <= datetime.now(timezone.utc)
+
+
+def due_youtube_ids(db: DBSession, after: str = "", limit: int = 500) -> List[str]:
+    """
+    Video IDs after ``after`` whose metadata is missing or due, in ID order:
+    a walk of ``ix_videos_youtube_id`` with a primary key probe per video.
+    """
+    return db.execute(
+        select(Video.youtube_id)
+        .outerjoin(VideoMetadata, VideoMetadata.youtube_id == Video.youtube_id)
+        .where(
+            Video.youtube_id > after,
+            (VideoMetadata.youtube_id.is_(None)) | (VideoMetadata.next_fetch_at <= datetime.now(timezone.utc))
+        )
+        .group_by(Video.youtube_id)
+        .order_by(Video.youtube_id)
+        .limit(limit)
+    ).scalars().all()
+
+
+def enrich(db: DBSession, youtube_ids: Sequence[str], client: Optional[MetadataClient] = None) -> Dict[str, int]:
+    """
+    Fetch and cache metadata for the given videos; returns counts by
+    outcome. Fetches before touching the database, so no transaction is
+    open while waiting on the provider. Does not commit.
+    """
+    results = (client or metadata_client).fetch_many(list(youtube_ids))
+    if not results:
+        return {}
+    now = datetime.now(timezone.utc)
+    previous = dict(db.execute(
+        select(VideoMetadata.youtube_id, VideoMetadata.attempts).where(VideoMetadata.youtube_id.in_(results))
+    ).all())
+
+    fetched, failed = [], []
+    for youtube_id, result in results.items():
+        if result.status == "error":
+            attempts = previous.get(youtube_id, 0) + 1
+            backoff = min(ERROR_BACKOFF * 2 ** (attempts - 1), timedelta(days=settings.VIDEO_METADATA_TTL_DAYS))
+            failed.append({
+                "youtube_id": youtube_id, "status": "error", "attempts": attempts,
+                "last_error": result.error[:2000], "fetched_at": now, "next_fetch_at": now + backoff,
+            })
+        else:
+            fetched.append({
+                "youtube_id": youtube_id, "status": result.status, "title": result.title,
+                "author_name": result.author_name, "thumbnail_url": result.thumbnail_url,
+                "duration_seconds": result.duration_seconds, "attempts": 0, "last_error": result.error,
+                "fetched_at": now, "next_fetch_at": now + timedelta(days=settings.VIDEO_METADATA_TTL_DAYS),
+            })
+    _upsert(db, fetched, ("status", "title", "author_name", "thumbnail_url", "duration_seconds",
+                          "attempts", "last_error", "fetched_at", "next_fetch_at"))
+    # A failed refresh keeps whatever was fetched before
+    _upsert(db, failed, ("attempts", "last_error", "next_fetch_at"))
+    counts: Dict[str, int] = {}
+    for result in results.values():
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return counts
+
+
+def _upsert(db: DBSession, rows: List[Dict[str, Any]], update_columns: Sequence[str]) -> None:
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(VideoMetadata)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["youtube_id"],
+                set_={column: statement.excluded[column] for column in update_columns}
+            ),
+            rows
+        )
+        return
+    for row in rows:
+        cached = db.get(VideoMetadata, row["youtube_id"])
+        if cached is None:
+            db.add(VideoMetadata(**row))
+        else:
+            for column in update_columns:
+                setattr(cached, column, row[column])
+
+
+@job_handler("video.enrich")
+def enrich_videos(db: DBSession, payload: Dict[str, Any]) -> None:
+    """Fetch metadata for newly added or changed videos."""
+    counts = enrich(db, payload["youtube_ids"])
+    if counts.get("error"):
+        logger.warning("Video metadata: %s of %s fetches failed", counts["error"], len(payload["youtube_ids"]))
+
+
+def backfill(batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Fetch every missing or due video's metadata, one committed batch at a time."""
+    from app.db.database import SessionLocal
+    batch_size = batch_size or settings.VIDEO_METADATA_BATCH_SIZE
+    totals: Dict[str, int] = {}
+    after = ""
+    started = time.monotonic()
+    while True:
+        db = SessionLocal()
+        try:
+            youtube_ids = due_youtube_ids(db, after, batch_size)
+            db.commit()
+            if not youtube_ids:
+                break
+            for status, count in enrich(db, youtube_ids).items():
+                totals[status] = totals.get(status, 0) + count
+            db.commit()
+        finally:
+            db.close()
+        after = youtube_ids[-1]
+        done = sum(totals.values())
+        logger.info("Video metadata: %s fetched (%.1f/s) %s", done, done / (time.monotonic() - started), totals)
+    return totals
+
+
+def main() -> None:
+    """Run the backfill in the foreground."""
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Map every model before the first query resolves relationships
+    from app.users.models import User  # noqa: F401
+    from app.skills.models import Skill  # noqa: F401
+    from app.sessions.models import Session  # noqa: F401
+    from app.tags.models import Tag  # noqa: F401
+    try:
+        totals = backfill()
+    finally:
+        metadata_client.close()
+    logger.info("Video metadata backfill finished: %s", totals)
+
+
+if __name__ == "__main__":
+    main()
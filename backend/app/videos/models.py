@@ -1,7 +1,7 @@
 """
 Video models for storing YouTube video links.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -13,15 +13,92 @@ class Video(Base):
     No raw video uploads - only URLs are stored.
     """
     __tablename__ = "videos"
+    __table_args__ = (
+        # Per-skill listings, and finding a deleted skill's videos to reap
+        Index("ix_videos_skill_id", "skill_id"),
+        # One row per video per skill, and point reads by video ID
+        Index(
+            "uq_videos_skill_youtube_id", "skill_id", "youtube_id", unique=True,
+            postgresql_where=text("youtube_id IS NOT NULL"),
+            sqlite_where=text("youtube_id IS NOT NULL")
+        ),
+        Index("ix_videos_youtube_id", "youtube_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    youtube_url = Column(String, nullable=False)  # Full YouTube URL
+    youtube_url = Column(String, nullable=False)  # Canonical watch URL, rebuilt from youtube_id
+    youtube_id = Column(String(11), nullable=True)  # See app/videos/youtube.py
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     skill = relationship("Skill", back_populates="videos")
+    details = relationship(
+        "VideoMetadata",
+        primaryjoin="Video.youtube_id == foreign(VideoMetadata.youtube_id)",
+        uselist=False,
+        viewonly=True,
+        lazy="joined"
+    )
+
+
+class VideoMetadata(Base):
+    """
+    VideoMetadata model - title, length and thumbnail fetched from the
+    video provider, cached per YouTube ID (shared by every skill listing
+    the video). Filled in the background; see app/videos/enrichment.py.
+    """
+    __tablename__ = "video_metadata"
+    __table_args__ = (
+        Index("ix_video_metadata_next_fetch_at", "next_fetch_at"),
+    )
+    
+    youtube_id = Column(String(11), primary_key=True)
+    status = Column(String, nullable=False)  # ok, unavailable (private or removed), error
+    title = Column(String, nullable=True)
+    author_name = Column(String, nullable=True)
+    thumbnail_url = Column(String, nullable=True)
+    duration_seconds = Column(Integer, nullable=True)  # Only if the provider reports it
+    attempts = Column(Integer, nullable=False, default=0)  # Consecutive failed fetches
+    last_error = Column(Text, nullable=True)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+    next_fetch_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class VideoProgress(Base):
+    """
+    VideoProgress model - how far a student got in a video. Written only
+    by the progress buffer's batched upserts (app/videos/progress.py).
+    """
+    __tablename__ = "video_progress"
+    __table_args__ = (
+        Index("ix_video_progress_video_id", "video_id"),
+    )
+    
+    student_id = Column(Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    position_seconds = Column(Integer, nullable=False, default=0)  # Where they last were
+    furthest_seconds = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Integer, nullable=True)  # As reported by the player
+    watched_seconds = Column(Integer, nullable=False, default=0)  # Time spent playing
+    views = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    last_event_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class VideoViewCounter(Base):
+    """
+    VideoViewCounter model - one shard of a video's view counters. Flushes
+    add to a random shard, so concurrent writers rarely touch the same row;
+    a video's totals are the sum over its shards.
+    """
+    __tablename__ = "video_view_counters"
+    
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+    watched_seconds = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,327 @@
+"""
+Write-behind buffer for video progress events.
+
+Players send a heartbeat every few seconds while a video plays. Writing
+each one would mean a row update per viewer per heartbeat, so events are
+folded in memory into one entry per (student, video) instead, and a
+background thread writes the entries out every
+``VIDEO_PROGRESS_FLUSH_SECONDS`` as one batched upsert into
+``video_progress``. Per-video totals go to ``video_view_counters``, spread
+over ``VIDEO_VIEW_COUNTER_SHARDS`` rows per video so concurrent flushes
+(one per API process) rarely wait on each other's row locks.
+
+Loss window: events live only in memory until flushed, so a crash loses at
+most the last flush interval. A clean shutdown flushes first. If the
+database is unavailable a failed batch is merged back and retried on the
+next flush; once ``VIDEO_PROGRESS_MAX_PENDING`` entries are waiting, new
+events are dropped and counted rather than growing memory without bound.
+"""
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session as DBSession
+from app.core.config import settings
+from app.videos.models import Video, VideoProgress, VideoViewCounter
+
+logger = logging.getLogger("app")
+
+EVENTS = ("play", "heartbeat", "ended")
+# Forward jumps longer than this between heartbeats are seeks, not watching
+MAX_HEARTBEAT_ADVANCE = 60
+# Share of the video that counts as finished
+COMPLETION_RATIO = 0.9
+# (student, video) positions remembered after a flush, for watch time across flushes
+MAX_REMEMBERED = 100000
+
+Key = Tuple[int, int]
+
+
+@dataclass
+class PendingProgress:
+    """Events for one (student, video) folded together since the last flush."""
+    position_seconds: int
+    furthest_seconds: int
+    duration_seconds: Optional[int]
+    watched_seconds: int
+    views: int
+    completed_at: Optional[datetime]
+    last_event_at: datetime
+
+    def merge_older(self, older: "PendingProgress") -> None:
+        """Fold in an entry from before this one (a batch put back after a failed flush)."""
+        self.furthest_seconds = max(self.furthest_seconds, older.furthest_seconds)
+        self.duration_seconds = self.duration_seconds or older.duration_seconds
+        self.watched_seconds += older.watched_seconds
+        self.views += older.views
+        self.completed_at = older.completed_at or self.completed_at
+
+
+class ProgressBuffer:
+    """Thread-safe in-memory buffer of progress events with a periodic flusher thread."""
+
+    def __init__(self, flush_seconds: float, max_pending: int, shards: int):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.shards = shards
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Key, PendingProgress] = {}
+        self._oldest_pending: Optional[float] = None  # Monotonic time of the oldest unflushed event
+        self._positions: "OrderedDict[Key, int]" = OrderedDict()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters: Dict[str, int] = {
+            "events": 0, "dropped": 0, "flushes": 0, "flush_failures": 0, "rows_flushed": 0,
+        }
+        self.last_flush_at: Optional[datetime] = None
+        self.last_flush_seconds = 0.0
+
+    # -- ingestion ------------------------------------------------------
+
+    def record(
+        self,
+        student_id: int,
+        video_id: int,
+        event: str,
+        position_seconds: int,
+        duration_seconds: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> bool:
+        """Fold one player event into the buffer; False if it was dropped for backpressure."""
+        now = now or datetime.now(timezone.utc)
+        key = (student_id, video_id)
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= self.max_pending:
+                    self.counters["dropped"] += 1
+                    return False
+                entry = self._pending[key] = PendingProgress(
+                    position_seconds=0, furthest_seconds=0, duration_seconds=None,
+                    watched_seconds=0, views=0, completed_at=None, last_event_at=now,
+                )
+                if self._oldest_pending is None:
+                    self._oldest_pending = time.monotonic()
+                if len(self._pending) >= self.max_pending // 2:
+                    self._wake.set()  # Flush early rather than start dropping
+
+            if duration_seconds:
+                entry.duration_seconds = duration_seconds
+            if entry.duration_seconds:
+                position_seconds = min(position_seconds, entry.duration_seconds)
+            previous = self._positions.get(key)
+            if event == "heartbeat" and previous is not None:
+                advance = position_seconds - previous
+                if 0 < advance <= MAX_HEARTBEAT_ADVANCE:
+                    entry.watched_seconds += advance
+            if event == "play":
+                entry.views = 1  # One view per student and video per flush at most
+            entry.position_seconds = position_seconds
+            entry.furthest_seconds = max(entry.furthest_seconds, position_seconds)
+            entry.last_event_at = now
+            finished = event == "ended" or (
+                entry.duration_seconds and entry.furthest_seconds >= COMPLETION_RATIO * entry.duration_seconds
+            )
+            if finished and entry.completed_at is None:
+                entry.completed_at = now
+
+            self._positions[key] = position_seconds
+            self._positions.move_to_end(key)
+            if len(self._positions) > MAX_REMEMBERED:
+                self._positions.popitem(last=False)
+            self.counters["events"] += 1
+        return True
+
+    # -- flushing -------------------------------------------------------
+
+    def flush(self, session_factory: Callable[[], DBSession]) -> int:
+        """Write out everything buffered so far; returns the rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                oldest, self._oldest_pending = self._oldest_pending, None
+            if not batch:
+                return 0
+            started = time.monotonic()
+            db = session_factory()
+            try:
+                written = self._write(db, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._put_back(batch, oldest)
+                with self._lock:
+                    self.counters["flush_failures"] += 1
+                raise
+            finally:
+                db.close()
+            with self._lock:
+                self.counters["flushes"] += 1
+                self.counters["rows_flushed"] += written
+                self.last_flush_at = datetime.now(timezone.utc)
+                self.last_flush_seconds = time.monotonic() - started
+            return written
+
+    def _put_back(self, batch: Dict[Key, PendingProgress], oldest: Optional[float]) -> None:
+        with self._lock:
+            for key, entry in batch.items():
+                newer = self._pending.get(key)
+                if newer is not None:
+                    newer.merge_older(entry)
+                elif len(self._pending) < self.max_pending:
+                    self._pending[key] = entry
+                else:
+                    self.counters["dropped"] += 1
+            if oldest is not None:
+                self._oldest_pending = min(oldest, self._oldest_pending or oldest)
+
+    def _write(self, db: DBSession, batch: Dict[Key, PendingProgress]) -> int:
+        # Videos deleted since their events arrived are skipped
+        existing = set(db.execute(
+            select(Video.id).where(Video.id.in_({video_id for _, video_id in batch}))
+        ).scalars())
+        keys = sorted(key for key in batch if key[1] in existing)  # Fixed lock order between flushers
+        if not keys:
+            return 0
+        rows = []
+        for student_id, video_id in keys:
+            entry = batch[(student_id, video_id)]
+            rows.append({
+                "student_id": student_id,
+                "video_id": video_id,
+                "position_seconds": entry.position_seconds,
+                "furthest_seconds": entry.furthest_seconds,
+                "duration_seconds": entry.duration_seconds,
+                "watched_seconds": entry.watched_seconds,
+                "views": entry.views,
+                "completed_at": entry.completed_at,
+                "last_event_at": entry.last_event_at,
+            })
+        totals: Dict[int, List[int]] = {}
+        for row in rows:
+            total = totals.setdefault(row["video_id"], [0, 0])
+            total[0] += row["views"]
+            total[1] += row["watched_seconds"]
+        shard = random.randrange(self.shards)
+        counters = [
+            {"video_id": video_id, "shard": shard, "views": views, "watched_seconds": watched}
+            for video_id, (views, watched) in sorted(totals.items())
+            if views or watched
+        ]
+
+        insert, greatest = _dialect_helpers(db)
+        progress = insert(VideoProgress)
+        new, old = progress.excluded, VideoProgress.__table__.c
+        db.execute(
+            progress.on_conflict_do_update(
+                index_elements=["student_id", "video_id"],
+                set_={
+                    "position_seconds": case(
+                        (new.last_event_at >= old.last_event_at, new.position_seconds),
+                        else_=old.position_seconds
+                    ),
+                    "furthest_seconds": greatest(old.furthest_seconds, new.furthest_seconds),
+                    "duration_seconds": func.coalesce(new.duration_seconds, old.duration_seconds),
+                    "watched_seconds": old.watched_seconds + new.watched_seconds,
+                    "views": old.views + new.views,
+                    "completed_at": func.coalesce(old.completed_at, new.completed_at),
+                    "last_event_at": greatest(old.last_event_at, new.last_event_at),
+                }
+            ),
+            rows
+        )
+        if counters:
+            counter = insert(VideoViewCounter)
+            new, old = counter.excluded, VideoViewCounter.__table__.c
+            db.execute(
+                counter.on_conflict_do_update(
+                    index_elements=["video_id", "shard"],
+                    set_={"views": old.views + new.views, "watched_seconds": old.watched_seconds + new.watched_seconds}
+                ),
+                counters
+            )
+        return len(rows)
+
+    # -- background thread ----------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start the flusher thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="video-progress-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the flusher thread after a final flush."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        from app.db.database import SessionLocal
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                self.flush(SessionLocal)
+            except Exception:
+                logger.exception("Video progress flush failed; the batch will be retried")
+            if stopping:
+                return
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+
+    def stats(self) -> Dict:
+        """Buffer size, counters and flush lag (age of the oldest unflushed event)."""
+        with self._lock:
+            oldest = self._oldest_pending
+            return {
+                "running": self.running,
+                "pending": len(self._pending),
+                "flush_lag_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+                "last_flush_at": self.last_flush_at,
+                "last_flush_seconds": round(self.last_flush_seconds, 3),
+                **self.counters,
+            }
+
+
+def forget_videos(db: DBSession, video_ids: Sequence[int]) -> None:
+    """
+    Delete the progress and view counter rows of videos about to be
+    deleted, rather than rely on ON DELETE CASCADE (off by default on
+    SQLite). Does not commit.
+    """
+    db.execute(delete(VideoProgress).where(VideoProgress.video_id.in_(video_ids)))
+    db.execute(delete(VideoViewCounter).where(VideoViewCounter.video_id.in_(video_ids)))
+
+
+def _dialect_helpers(db: DBSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert, func.greatest
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert, func.max  # SQLite's multi-argument max() is scalar
+    raise NotImplementedError(f"Progress upserts are not implemented for {dialect}")
+
+
+progress_buffer = ProgressBuffer(
+    flush_seconds=settings.VIDEO_PROGRESS_FLUSH_SECONDS,
+    max_pending=settings.VIDEO_PROGRESS_MAX_PENDING,
+    shards=settings.VIDEO_VIEW_COUNTER_SHARDS,
+)
@@ -1,16 +1,21 @@
 """
 Video routers - API endpoints for video operations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Path, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.database import get_db
-from app.core.dependencies import require_volunteer, require_any_auth, get_current_user
+from app.db.database import get_db, DBSessionRoute
+from app.core.dependencies import require_admin, require_parent, require_volunteer, require_any_auth, get_current_user
 from app.users.models import User
-from app.videos.schemas import VideoCreate, VideoResponse, VideoUpdate
+from app.videos.schemas import (
+    VideoCreate, VideoResponse, VideoUpdate,
+    ProgressBatch, ProgressAccepted, VideoProgressResponse, VideoStats, ProgressBufferStats
+)
 from app.videos.services import VideoService
+from app.videos.progress import progress_buffer
+from app.users.services import ParentService, StudentService
 
-router = APIRouter(prefix="/videos", tags=["videos"])
+router = APIRouter(prefix="/videos", tags=["videos"], route_class=DBSessionRoute)
 
 
 @router.post("/", response_model=VideoResponse, status_code=status.HTTP_201_CREATED)
@@ -52,6 +57,70 @@ async def get_videos_by_skill(
     return video_service.get_by_skill(skill_id)
 
 
+def _require_parent_account(db: Session, current_user: User):
+    parent = ParentService(db).get_by_user_id(current_user.id)
+    if not parent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Parent account not found"
+        )
+    return parent
+
+
+@router.post("/progress", response_model=ProgressAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def record_progress(
+    batch: ProgressBatch,
+    current_user: User = Depends(require_parent),
+    db: Session = Depends(get_db)
+):
+    """
+    Record player events (play, heartbeat every few seconds, ended) for the
+    parent's students. Events are buffered and written within
+    VIDEO_PROGRESS_FLUSH_SECONDS.
+    """
+    parent = _require_parent_account(db, current_user)
+    video_service = VideoService(db)
+    accepted, dropped = video_service.record_progress(batch.events, parent.id)
+    return ProgressAccepted(accepted=accepted, dropped=dropped)
+
+
+@router.get("/progress/stats", response_model=ProgressBufferStats)
+async def get_progress_buffer_stats(
+    current_user: User = Depends(require_admin)
+):
+    """Get this process's progress buffer size, counters and flush lag (admin only)."""
+    return progress_buffer.stats()
+
+
+@router.get("/progress/students/{student_id}", response_model=List[VideoProgressResponse])
+async def get_student_progress(
+    student_id: int,
+    current_user: User = Depends(require_parent),
+    db: Session = Depends(get_db)
+):
+    """Get a student's progress in the videos they watched (must belong to current parent)."""
+    parent = _require_parent_account(db, current_user)
+    student = await StudentService(db).get_by_id_async(student_id)
+    if not student or student.parent_id != parent.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    video_service = VideoService(db)
+    return video_service.get_student_progress(student_id)
+
+
+@router.get("/youtube/{youtube_id}", response_model=List[VideoResponse])
+async def get_videos_by_youtube_id(
+    youtube_id: str = Path(..., min_length=11, max_length=11),
+    current_user: User = Depends(require_any_auth),
+    db: Session = Depends(get_db)
+):
+    """Get the entries for a YouTube video ID, across skills."""
+    video_service = VideoService(db)
+    return video_service.get_by_youtube_id(youtube_id)
+
+
 @router.get("/{video_id}", response_model=VideoResponse)
 async def get_video(
     video_id: int,
@@ -69,6 +138,22 @@ async def get_video(
     return video
 
 
+@router.get("/{video_id}/stats", response_model=VideoStats)
+async def get_video_stats(
+    video_id: int,
+    current_user: User = Depends(require_volunteer),
+    db: Session = Depends(get_db)
+):
+    """Get a video's view counters (volunteers and admins)."""
+    video_service = VideoService(db)
+    if not video_service.get_by_id(video_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+    return video_service.get_stats(video_id)
+
+
 @router.patch("/{video_id}", response_model=VideoResponse)
 async def update_video(
     video_id: int,
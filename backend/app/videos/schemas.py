@@ -2,9 +2,9 @@
 Pydantic schemas for video-related operations.
 """
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-import re
+from app.videos.youtube import normalize_url
 
 
 class VideoBase(BaseModel):
@@ -13,19 +13,15 @@ class VideoBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Video title")
     description: Optional[str] = Field(None, max_length=2000, description="Video description")
     youtube_url: str = Field(..., description="YouTube video URL (unlisted videos only)")
-    
-    @validator('youtube_url')
-    def validate_youtube_url(cls, v):
-        """Validate that the URL is a YouTube URL."""
-        youtube_pattern = r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})'
-        if not re.match(youtube_pattern, v) and not v.startswith('https://www.youtube.com/') and not v.startswith('https://youtu.be/'):
-            raise ValueError('Must be a valid YouTube URL')
-        return v
 
 
 class VideoCreate(VideoBase):
     """Schema for creating a new video."""
-    pass
+    
+    @validator('youtube_url')
+    def validate_youtube_url(cls, v):
+        """Validate that the URL is a YouTube video URL and store its canonical form."""
+        return normalize_url(v)
 
 
 class VideoUpdate(BaseModel):
@@ -38,18 +34,95 @@ class VideoUpdate(BaseModel):
     @validator('youtube_url')
     def validate_youtube_url(cls, v):
         if v:
-            youtube_pattern = r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})'
-            if not re.match(youtube_pattern, v) and not v.startswith('https://www.youtube.com/') and not v.startswith('https://youtu.be/'):
-                raise ValueError('Must be a valid YouTube URL')
+            return normalize_url(v)
         return v
 
 
+class VideoDetails(BaseModel):
+    """Metadata fetched from YouTube in the background."""
+    status: str  # ok, unavailable (private or removed), error
+    title: Optional[str]
+    author_name: Optional[str]
+    thumbnail_url: Optional[str]
+    duration_seconds: Optional[int]
+    fetched_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class VideoResponse(VideoBase):
     """Schema for video response."""
     id: int
+    youtube_id: Optional[str]  # Unset for rows whose URL predates parsing and matched no video
+    details: Optional[VideoDetails] = None  # Unset until the metadata has been fetched
     created_by: Optional[int]
     created_at: datetime
     updated_at: Optional[datetime]
     
     class Config:
         from_attributes = True
+
+
+class ProgressEvent(BaseModel):
+    """One player event for a student watching a video."""
+    student_id: int
+    video_id: int
+    event: str = Field("heartbeat", description="play, heartbeat or ended")
+    position_seconds: int = Field(..., ge=0, le=86400)
+    duration_seconds: Optional[int] = Field(None, ge=1, le=86400)
+    
+    @validator('event')
+    def validate_event(cls, v):
+        if v not in ("play", "heartbeat", "ended"):
+            raise ValueError('event must be play, heartbeat or ended')
+        return v
+
+
+class ProgressBatch(BaseModel):
+    """Player events sent together (a player may queue a few while offline)."""
+    events: List[ProgressEvent] = Field(..., min_length=1, max_length=100)
+
+
+class ProgressAccepted(BaseModel):
+    """Events taken into the buffer; they are written within one flush interval."""
+    accepted: int
+    dropped: int
+
+
+class VideoProgressResponse(BaseModel):
+    """Schema for a student's progress in one video."""
+    video_id: int
+    position_seconds: int
+    furthest_seconds: int
+    duration_seconds: Optional[int]
+    watched_seconds: int
+    views: int
+    completed_at: Optional[datetime]
+    last_event_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class VideoStats(BaseModel):
+    """View counters for one video."""
+    video_id: int
+    views: int
+    watched_seconds: int
+    viewers: int  # Distinct students
+    completions: int
+
+
+class ProgressBufferStats(BaseModel):
+    """State of this process's progress buffer."""
+    running: bool
+    pending: int  # (student, video) entries waiting to be written
+    flush_lag_seconds: float  # Age of the oldest unwritten event
+    last_flush_at: Optional[datetime]
+    last_flush_seconds: float
+    events: int
+    dropped: int
+    flushes: int
+    flush_failures: int
+    rows_flushed: int
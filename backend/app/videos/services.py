@@ -1,12 +1,22 @@
 """
 Video service layer - business logic for video operations.
 """
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException, status
-from app.videos.models import Video
-from app.videos.schemas import VideoCreate, VideoUpdate
+from app.videos.models import Video, VideoProgress, VideoViewCounter
+from app.videos.schemas import VideoCreate, VideoUpdate, ProgressEvent
+from app.videos.progress import forget_videos, progress_buffer
+from app.users.models import Student
 from app.skills.models import Skill
+from app.search.services import SearchIndex
+from app.db.loader import get_loader
+from app.recommendations.index import mark_dirty
+from app.videos.youtube import parse_video_id
+from app.videos.enrichment import needs_fetch
+from app.jobs.services import OutboxService
 
 
 class VideoService:
@@ -16,33 +26,82 @@ class VideoService:
         self.db = db
     
     def get_by_id(self, video_id: int) -> Optional[Video]:
-        """Get video by ID."""
-        return self.db.query(Video).filter(Video.id == video_id).first()
+        """Get video by ID; None once its skill is deleted."""
+        loader = get_loader(self.db)
+        video = loader.load(Video, video_id)
+        if video is None or loader.load(Skill, video.skill_id) is None:
+            return None
+        return video
+    
+    def _live(self):
+        """Videos of skills that are not deleted; a deleted skill's videos await the reap job."""
+        return self.db.query(Video).join(Skill, Skill.id == Video.skill_id).filter(Skill.deleted_at.is_(None))
     
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Video]:
         """Get all videos with pagination."""
-        return self.db.query(Video).offset(skip).limit(limit).all()
+        return self._live().offset(skip).limit(limit).all()
     
     def get_by_skill(self, skill_id: int) -> List[Video]:
         """Get all videos for a skill."""
-        return self.db.query(Video).filter(Video.skill_id == skill_id).all()
+        return self._live().filter(Video.skill_id == skill_id).all()
+    
+    def get_by_youtube_id(self, youtube_id: str) -> List[Video]:
+        """Get every entry for a YouTube video (one per skill at most)."""
+        return self._live().filter(Video.youtube_id == youtube_id).order_by(Video.id).all()
+    
+    def _check_not_duplicate(self, skill_id: int, youtube_id: Optional[str], video_id: Optional[int] = None) -> None:
+        """Refuse a second entry for the same video under one skill (unique index point read)."""
+        if youtube_id is None:
+            return
+        query = self.db.query(Video.id).filter(Video.skill_id == skill_id, Video.youtube_id == youtube_id)
+        if video_id is not None:
+            query = query.filter(Video.id != video_id)
+        existing = query.first()
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"This video is already listed for the skill (video {existing.id})"
+            )
+    
+    def _enqueue_enrichment(self, video: Video) -> None:
+        """Fetch the video's metadata in the background unless it is cached already."""
+        if video.youtube_id and needs_fetch(self.db, video.youtube_id):
+            OutboxService(self.db).enqueue("video.enrich", {"youtube_ids": [video.youtube_id]})
+    
+    def _commit(self) -> None:
+        """Commit; a concurrent request adding the same video loses on the unique index."""
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This video is already listed for the skill"
+            )
     
     def create(self, video_data: VideoCreate, created_by: int) -> Video:
         """Create a new video entry (stores YouTube URL only)."""
         # Verify skill exists
-        skill = self.db.query(Skill).filter(Skill.id == video_data.skill_id).first()
+        skill = get_loader(self.db).load(Skill, video_data.skill_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Skill not found"
             )
         
+        youtube_id = parse_video_id(video_data.youtube_url)
+        self._check_not_duplicate(video_data.skill_id, youtube_id)
         video = Video(
             **video_data.dict(),
+            youtube_id=youtube_id,
             created_by=created_by
         )
         self.db.add(video)
-        self.db.commit()
+        self.db.flush()
+        self._enqueue_enrichment(video)
+        SearchIndex(self.db).index("video", video)
+        mark_dirty(self.db, "video", [video.id])
+        self._commit()
         self.db.refresh(video)
         return video
     
@@ -65,8 +124,14 @@ class VideoService:
         update_data = video_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(video, field, value)
+        if "youtube_url" in update_data or "skill_id" in update_data:
+            video.youtube_id = parse_video_id(video.youtube_url)
+            self._check_not_duplicate(video.skill_id, video.youtube_id, video.id)
+            self._enqueue_enrichment(video)
         
-        self.db.commit()
+        SearchIndex(self.db).index("video", video)
+        mark_dirty(self.db, "video", [video.id])
+        self._commit()
         self.db.refresh(video)
         return video
     
@@ -86,5 +151,58 @@ class VideoService:
                 detail="You can only delete your own videos"
             )
         
+        SearchIndex(self.db).remove("video", video.id)
+        mark_dirty(self.db, "video", [video.id])
+        forget_videos(self.db, [video.id])
         self.db.delete(video)
         self.db.commit()
+    
+    def record_progress(self, events: List[ProgressEvent], parent_id: int) -> Tuple[int, int]:
+        """
+        Buffer player events for the parent's students; returns (accepted,
+        dropped). The only database work is one ownership check.
+        """
+        student_ids = {event.student_id for event in events}
+        owned = set(self.db.execute(
+            select(Student.id).where(Student.id.in_(student_ids), Student.parent_id == parent_id)
+        ).scalars())
+        if owned != student_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Student not found"
+            )
+        accepted = sum(
+            progress_buffer.record(
+                event.student_id, event.video_id, event.event, event.position_seconds, event.duration_seconds
+            )
+            for event in events
+        )
+        return accepted, len(events) - accepted
+    
+    def get_student_progress(self, student_id: int) -> List[VideoProgress]:
+        """A student's progress in every video they started, most recent first."""
+        return (
+            self.db.query(VideoProgress)
+            .filter(VideoProgress.student_id == student_id)
+            .order_by(VideoProgress.last_event_at.desc())
+            .all()
+        )
+    
+    def get_stats(self, video_id: int) -> Dict[str, int]:
+        """View counters for a video: its counter shards summed, plus per-student totals."""
+        views, watched = self.db.execute(
+            select(func.coalesce(func.sum(VideoViewCounter.views), 0),
+                   func.coalesce(func.sum(VideoViewCounter.watched_seconds), 0))
+            .where(VideoViewCounter.video_id == video_id)
+        ).one()
+        viewers, completions = self.db.execute(
+            select(func.count(), func.count(VideoProgress.completed_at))
+            .where(VideoProgress.video_id == video_id)
+        ).one()
+        return {
+            "video_id": video_id,
+            "views": views,
+            "watched_seconds": watched,
+            "viewers": viewers,
+            "completions": completions,
+        }
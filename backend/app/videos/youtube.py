@@ -0,0 +1,63 @@
+"""
+YouTube URL parsing.
+
+Every accepted URL shape is reduced to the 11-character video ID, which is
+what identifies a video; the stored URL is rebuilt from it. Patterns are
+compiled once at import.
+
+Accepted forms (with or without scheme, ``www.`` or ``m.``)::
+
+    youtube.com/watch?v=ID        youtu.be/ID
+    youtube.com/shorts/ID         youtube.com/embed/ID
+    youtube.com/live/ID           youtube.com/v/ID
+    youtube-nocookie.com/embed/ID
+"""
+import re
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+VIDEO_ID_LENGTH = 11
+
+_VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+_HOSTS = re.compile(r"(?:www\.|m\.|music\.)?(youtube\.com|youtube-nocookie\.com|youtu\.be)")
+_PATH = re.compile(r"/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})(?:[/?#]|$)")
+_SHORT_PATH = re.compile(r"/([A-Za-z0-9_-]{11})(?:[/?#]|$)")
+
+
+def parse_video_id(url: str) -> Optional[str]:
+    """The video ID in a YouTube URL, or None if it is not a video URL."""
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    host = _HOSTS.fullmatch((parts.hostname or "").lower())
+    if not host:
+        return None
+    if host.group(1) == "youtu.be":
+        match = _SHORT_PATH.match(parts.path)
+        return match.group(1) if match else None
+    if parts.path.rstrip("/") == "/watch":
+        values = parse_qs(parts.query).get("v", [])
+        if values and _VIDEO_ID.fullmatch(values[0]):
+            return values[0]
+        return None
+    match = _PATH.match(parts.path)
+    return match.group(1) if match else None
+
+
+def canonical_url(video_id: str) -> str:
+    """The URL stored for a video ID."""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def normalize_url(url: str) -> str:
+    """
+    Validator helper: the canonical URL for any accepted form; raises
+    ValueError otherwise.
+    """
+    video_id = parse_video_id(url)
+    if video_id is None:
+        raise ValueError("Must be a YouTube video URL (watch, youtu.be, shorts or embed link)")
+    return canonical_url(video_id)
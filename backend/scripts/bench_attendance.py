@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Check-in load test: a burst of parents checking their children in to one
+session as it starts.
+
+Seeds a throwaway SQLite database with one session and ``--parents``
+parents of ``--kids`` enrolled students each, then drives
+``POST /sessions/{id}/check-in`` in-process over ASGI with open-loop
+arrivals at ``--rate`` per second (0: all at once):
+
+    python scripts/bench_attendance.py [--mode queued|direct] [--parents 1000] [--kids 3] [--rate 300]
+
+``--mode direct`` swaps the roster cache and queue for the old path: an
+enrollment query, then an insert and commit per request. In ``queued``
+mode the script exits non-zero if any request fails, a check-in is not
+written, or p99 latency exceeds ``--max-p99-ms``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def seed(parents: int, kids: int) -> int:
+    """One session starting in two minutes, with every student enrolled; returns its id."""
+    from sqlalchemy import insert, select
+    from app.db.database import Base, SessionLocal, engine
+    from app.sessions.models import Session
+    from app.skills.models import Skill
+    from app.users.models import Parent, SessionEnrollment, Student, User
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    volunteer = User(clerk_id="bench-volunteer", role="VOLUNTEER", approved=True)
+    db.add(volunteer)
+    db.flush()
+    skill = Skill(name="Robotics", description="Load test", created_by=volunteer.id)
+    db.add(skill)
+    db.flush()
+    start = datetime.now(timezone.utc) + timedelta(minutes=2)
+    session = Session(
+        skill_id=skill.id, volunteer_id=volunteer.id, title="Load test", schedule=start,
+        duration_minutes=60, ends_at=start + timedelta(minutes=60)
+    )
+    db.add(session)
+    db.flush()
+
+    db.execute(insert(User), [{"clerk_id": f"p{n}", "role": "PARENT", "approved": True} for n in range(parents)])
+    user_ids = dict(db.execute(select(User.clerk_id, User.id).where(User.role == "PARENT")).all())
+    db.execute(insert(Parent), [{"user_id": user_ids[f"p{n}"], "email": f"p{n}@example.org"} for n in range(parents)])
+    parent_ids = dict(db.execute(select(Parent.user_id, Parent.id)).all())
+    db.execute(insert(Student), [
+        {"parent_id": parent_ids[user_ids[f"p{n}"]], "name": f"Student {n}-{k}", "age": 10}
+        for n in range(parents) for k in range(kids)
+    ])
+    db.execute(insert(SessionEnrollment), [
+        {"student_id": student_id, "session_id": session.id, "starts_at": session.schedule, "ends_at": session.ends_at}
+        for student_id in db.execute(select(Student.id).order_by(Student.id)).scalars()
+    ])
+    db.commit()
+    session_id = session.id
+    db.close()
+    return session_id
+
+
+def use_direct_writes() -> None:
+    """The per-request path the queue replaced: look up the enrollment, insert, commit."""
+    from app.sessions.models import SessionAttendance
+    from app.sessions.services import AttendanceService
+    from app.users.models import Parent, SessionEnrollment, Student
+
+    def check_in(self, session_id, student_id, user_id):
+        enrollment = (
+            self.db.query(SessionEnrollment.id)
+            .join(Student, Student.id == SessionEnrollment.student_id)
+            .join(Parent, Parent.id == Student.parent_id)
+            .filter(
+                SessionEnrollment.session_id == session_id,
+                SessionEnrollment.student_id == student_id,
+                Parent.user_id == user_id
+            )
+            .first()
+        )
+        now = datetime.now(timezone.utc)
+        self.db.add(SessionAttendance(
+            enrollment_id=enrollment.id, session_id=session_id, student_id=student_id, checked_in_at=now
+        ))
+        self.db.commit()
+        return now, False
+
+    AttendanceService.check_in = check_in
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+async def run(args: argparse.Namespace) -> int:
+    from jose import jwt
+    from app.db.database import SessionLocal
+    from app.main import app
+    from app.sessions.attendance import attendance_queue, roster_cache
+    from app.sessions.models import SessionAttendance
+
+    session_id = seed(args.parents, args.kids)
+    if args.mode == "direct":
+        use_direct_writes()
+    else:
+        attendance_queue.start()
+
+    path = f"/api/v1/sessions/{session_id}/check-in"
+    tokens = [jwt.encode({"sub": f"p{n}"}, "unused", algorithm="HS256") for n in range(args.parents)]
+    latencies = []
+    statuses = {}
+
+    async def check_in(parent: int, student_id: int, arrival: float) -> None:
+        await asyncio.sleep(arrival)
+        body = json.dumps({"student_id": student_id}).encode()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "server": ("bench", 80), "client": ("127.0.0.1", 1), "root_path": "",
+            "path": path, "raw_path": path.encode(), "query_string": b"",
+            "headers": [
+                (b"authorization", f"Bearer {tokens[parent]}".encode()),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses[message["status"]] = statuses.get(message["status"], 0) + 1
+
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        latencies.append(time.perf_counter() - started)
+
+    # Students were created parent by parent, so ids run 1..parents*kids in that order
+    arrivals = [
+        (parent, parent * args.kids + kid + 1)
+        for parent in range(args.parents) for kid in range(args.kids)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        check_in(parent, student_id, number / args.rate if args.rate else 0.0)
+        for number, (parent, student_id) in enumerate(arrivals)
+    ))
+    wall = time.perf_counter() - started
+    if args.mode == "queued":
+        attendance_queue.stop(timeout=30)
+
+    db = SessionLocal()
+    written = db.query(SessionAttendance).count()
+    db.close()
+    p99 = percentile(latencies, .99)
+    print(
+        f"[{args.mode}, {args.rate or 'all at once'}/s] {len(latencies)} check-ins in {wall:.2f}s "
+        f"({len(latencies) / wall:.0f}/s), statuses {statuses}"
+    )
+    print(
+        f"  latency p50 {percentile(latencies, .5):.1f} ms  p95 {percentile(latencies, .95):.1f} ms  "
+        f"p99 {p99:.1f} ms  max {max(latencies) * 1000:.1f} ms"
+    )
+    if args.mode == "queued":
+        stats = attendance_queue.stats()
+        print(f"  flushes {stats['flushes']}, rows {stats['rows_flushed']}, roster loads {roster_cache.counters['loads']}")
+    print(f"  rows written {written}")
+
+    if set(statuses) != {202} or written != len(arrivals):
+        print("FAIL: not every check-in was accepted and written")
+        return 1
+    if args.mode == "queued" and p99 > args.max_p99_ms:
+        print(f"FAIL: p99 above {args.max_p99_ms} ms")
+        return 1
+    print("OK")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["queued", "direct"], default="queued")
+    parser.add_argument("--parents", type=int, default=1000)
+    parser.add_argument("--kids", type=int, default=3, help="Enrolled students per parent")
+    parser.add_argument("--rate", type=float, default=300.0, help="Arrivals per second; 0 sends all at once")
+    parser.add_argument("--max-p99-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-attendance-")
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        RATE_LIMIT_ENABLED="false",
+        CONCURRENCY_LIMIT_ENABLED="false",
+        IDEMPOTENCY_ENABLED="false",
+    )
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Adaptive concurrency limit simulation.
+
+Runs closed-loop async clients against a stand-in ASGI app for a few
+seconds, with and without ConcurrencyLimitMiddleware:
+
+* ``mix``: a healthy mix of fast cached endpoints (1 ms) and database
+  endpoints (30 ms, enough connections for every client). Nothing is
+  overloaded, so the limit must not shrink and throughput must match the
+  unlimited run.
+* ``overload``: 300 clients against a database of 10 connections at 20 ms
+  per query. The limit should shrink and shed load so that health checks
+  and sign-in stay fast.
+
+    python scripts/bench_concurrency.py [--scenario mix|overload|all] [--seconds 6]
+
+Exits non-zero when the ``mix`` run loses more than 10% of the unlimited
+throughput or ends below the initial limit.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.concurrency import AdaptiveConcurrencyLimiter, ConcurrencyLimitMiddleware  # noqa: E402
+
+INITIAL_LIMIT = 20
+
+
+def stand_in_app(database: asyncio.Semaphore, query_seconds: float):
+    """Health checks answer at once, cached routes take 1 ms, the rest wait on the database."""
+    async def app(scope, receive, send):
+        path = scope["path"]
+        scope["endpoint"] = path  # As the router does
+        if path.startswith("/api/v1/health"):
+            pass
+        elif path.startswith("/api/v1/skills/autocomplete"):
+            await asyncio.sleep(0.001)
+        else:
+            async with database:
+                await asyncio.sleep(query_seconds)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+    return app
+
+
+async def simulate(clients, seconds: float, connections: int, query_seconds: float, limited: bool):
+    app = stand_in_app(asyncio.Semaphore(connections), query_seconds)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=INITIAL_LIMIT)
+    target = ConcurrencyLimitMiddleware(app, limiter) if limited else app
+    latencies = {}
+    statuses = {}
+    stop = time.monotonic() + seconds
+
+    async def client(paths, pause: float, rng: random.Random):
+        while time.monotonic() < stop:
+            path = rng.choice(paths)
+            status = {}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+
+            started = time.monotonic()
+            await target({"type": "http", "path": path, "headers": []}, None, send)
+            statuses[status["code"]] = statuses.get(status["code"], 0) + 1
+            if status["code"] == 200:
+                latencies.setdefault(path.split("/")[3], []).append(time.monotonic() - started)
+            else:
+                await asyncio.sleep(0.05)
+            if pause:
+                await asyncio.sleep(pause)
+
+    await asyncio.gather(*(client(paths, pause, random.Random(number)) for number, (paths, pause) in enumerate(clients)))
+    return limiter, statuses, latencies
+
+
+def percentile(values, fraction):
+    return round(sorted(values)[int(len(values) * fraction)] * 1000, 1) if values else None
+
+
+def report(label, limiter, statuses, latencies, limited):
+    completed = statuses.get(200, 0)
+    print(f"  {label:10s} completed {completed:6d}  statuses {statuses}")
+    for route, values in sorted(latencies.items()):
+        print(f"    {route:10s} p50 {percentile(values, .5)} ms  p99 {percentile(values, .99)} ms")
+    if limited:
+        stats = limiter.stats()
+        print(f"    limit {stats['limit']}  rtt ratio {stats['rtt_ratio']}  shed {sum(stats['shed'].values())}")
+    return completed
+
+
+def mix(seconds: float) -> bool:
+    print("mix: 30 clients, 1 ms cached and 30 ms database routes, no overload")
+    clients = [(["/api/v1/skills/autocomplete", "/api/v1/sessions/"], 0.0)] * 30
+    results = {}
+    for limited in (False, True):
+        limiter, statuses, latencies = asyncio.run(simulate(clients, seconds, 30, 0.03, limited))
+        results[limited] = (report("limited" if limited else "unlimited", limiter, statuses, latencies, limited), limiter)
+    completed, limiter = results[True]
+    passed = completed >= 0.9 * results[False][0] and limiter.limit >= INITIAL_LIMIT
+    print("  OK" if passed else "  FAIL: the limit shrank without overload")
+    return passed
+
+
+def overload(seconds: float) -> bool:
+    print("overload: 300 clients, 10 connections at 20 ms per query")
+    clients = (
+        [(["/api/v1/sessions/"], 0.0)] * 300
+        + [(["/api/v1/health"], 0.05), (["/api/v1/users/me"], 0.05)]
+    )
+    for limited in (False, True):
+        limiter, statuses, latencies = asyncio.run(simulate(clients, seconds, 10, 0.02, limited))
+        report("limited" if limited else "unlimited", limiter, statuses, latencies, limited)
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", choices=["mix", "overload", "all"], default="all")
+    parser.add_argument("--seconds", type=float, default=6.0)
+    args = parser.parse_args()
+    passed = True
+    if args.scenario in ("mix", "all"):
+        passed = mix(args.seconds) and passed
+    if args.scenario in ("overload", "all"):
+        passed = overload(args.seconds) and passed
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
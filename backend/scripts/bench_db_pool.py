@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Pool utilization benchmark: how many pool connections requests hold while
+slow clients download or upload.
+
+Drives the app in-process over ASGI against a throwaway SQLite database
+(QueuePool, 5 + 10 overflow). Each client makes sequential GETs; some
+read every response body with a delay, some send their request body
+slowly, the rest are fast. A sampler records checked-out connections.
+
+    python scripts/bench_db_pool.py [--mode release|hold] [--slow-readers 6] [--max-mean 1.0]
+
+``--mode hold`` disables DBSessionRoute's early release, so sessions are
+closed by ``get_db`` after the response has been sent (the old
+behaviour). In ``release`` mode the script exits non-zero if any request
+fails, the pool saturates, or the mean checked-out count exceeds
+``--max-mean``.
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PATHS = ["/api/v1/users/me", "/api/v1/sessions/", "/api/v1/skills/"]
+
+
+async def run(args: argparse.Namespace) -> int:
+    from jose import jwt
+    import app.db.database as database
+    from app.db.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.users.models import User
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add(User(clerk_id="bench", role="VOLUNTEER", approved=True, email="bench@example.org"))
+    db.commit()
+    db.close()
+
+    if args.mode == "hold":
+        database._release_db = lambda request: None
+
+    token = jwt.encode({"sub": "bench"}, "unused", algorithm="HS256")
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    statuses = []
+    samples = []
+
+    async def request(path: str, kind: str) -> None:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "server": ("bench", 80), "client": ("127.0.0.1", 1), "root_path": "",
+            "path": path, "raw_path": path.encode(), "query_string": b"", "headers": headers,
+        }
+
+        async def receive():
+            if kind == "upload":
+                await asyncio.sleep(args.upload_delay)
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+            elif message["type"] == "http.response.body" and kind == "download":
+                await asyncio.sleep(args.download_delay)
+
+        await app(scope, receive, send)
+
+    async def client(kind: str, rng: random.Random) -> None:
+        for _ in range(args.requests):
+            await request(rng.choice(PATHS), kind)
+
+    async def sampler(stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            samples.append(engine.pool.checkedout())
+            await asyncio.sleep(0.001)
+
+    kinds = (
+        ["download"] * args.slow_readers
+        + ["upload"] * args.slow_writers
+        + ["fast"] * (args.clients - args.slow_readers - args.slow_writers)
+    )
+    stop = asyncio.Event()
+    sampling = asyncio.create_task(sampler(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(client(kind, random.Random(number)) for number, kind in enumerate(kinds)))
+    wall = time.perf_counter() - started
+    stop.set()
+    await sampling
+
+    peak = max(samples)
+    mean = sum(samples) / len(samples)
+    print(
+        f"[{args.mode}] {len(statuses)} requests in {wall:.2f}s, statuses {sorted(set(statuses))}, "
+        f"peak checked out {peak}, mean {mean:.2f} ({engine.pool.status()})"
+    )
+    if set(statuses) != {200}:
+        print("FAIL: not every request succeeded")
+        return 1
+    capacity = engine.pool.size() + engine.pool._max_overflow
+    if args.mode == "release" and (peak >= capacity or mean > args.max_mean):
+        print(f"FAIL: pool saturated ({capacity}) or mean above {args.max_mean}")
+        return 1
+    print("OK")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["release", "hold"], default="release")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=10, help="GETs per client")
+    parser.add_argument("--slow-readers", type=int, default=6)
+    parser.add_argument("--slow-writers", type=int, default=2)
+    parser.add_argument("--download-delay", type=float, default=0.2)
+    parser.add_argument("--upload-delay", type=float, default=0.05)
+    parser.add_argument("--max-mean", type=float, default=1.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-db-pool-")
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        RATE_LIMIT_ENABLED="false",
+        CONCURRENCY_LIMIT_ENABLED="false",
+    )
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
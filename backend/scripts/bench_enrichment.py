@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Video metadata backfill against a local stand-in oEmbed server.
+
+Starts a threaded HTTP server that answers like YouTube's oEmbed endpoint
+(after ``--latency`` seconds), points ``VIDEO_OEMBED_URL`` at it, seeds a
+throwaway SQLite database with ``--videos`` videos and runs the backfill
+(``python -m app.videos.enrichment``) with the rate cap at ``--rate``:
+
+    python scripts/bench_enrichment.py [--videos 3000] [--rate 100] [--concurrency 16]
+
+The defaults match the shipped settings; ``--videos 50000 --rate 400
+--concurrency 32`` repeats the full-size backfill.
+
+Besides ordinary videos the corpus holds private ones, which the server
+refuses with 401, and flaky ones, which get two 503s (the first with
+Retry-After) before succeeding. Exits non-zero unless every video is
+cached with the right status, flaky ones took exactly three requests,
+nothing is left due, and no one-second window saw more than 15% over
+the cap (the bucket holds a tenth of a second's worth, plus timing jitter).
+"""
+import argparse
+import bisect
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+PRIVATE = [f"PRIV{n:07d}" for n in range(5)]
+FLAKY = [f"FLAK{n:07d}" for n in range(5)]
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """oEmbed stand-in: 401 for PRIV ids, two 503s for FLAK ids, JSON for the rest."""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.02
+    lock = threading.Lock()
+    times = []
+    requests_by_id = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        youtube_id = parse_qs(urlsplit(self.path).query)["url"][0][-11:]
+        with self.lock:
+            self.times.append(time.monotonic())
+            seen = self.requests_by_id[youtube_id] = self.requests_by_id.get(youtube_id, 0) + 1
+        time.sleep(self.latency)
+        headers = {"Content-Type": "application/json"}
+        if youtube_id in PRIVATE:
+            status, body = 401, b"Unauthorized"
+        elif youtube_id in FLAKY and seen <= 2:
+            status, body = 503, b"Service Unavailable"
+            if seen == 1:
+                headers["Retry-After"] = "1"
+        else:
+            status, body = 200, json.dumps({
+                "title": f"Video {youtube_id}",
+                "author_name": "Stand-in channel",
+                "thumbnail_url": f"https://i.ytimg.com/vi/{youtube_id}/hqdefault.jpg",
+                "duration": 300,
+            }).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def seed(videos: int) -> None:
+    from sqlalchemy import insert
+    from app.db.database import Base, SessionLocal, engine
+    from app.skills.models import Skill
+    from app.users.models import User
+    from app.videos.models import Video
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    volunteer = User(clerk_id="bench-volunteer", role="VOLUNTEER", approved=True)
+    db.add(volunteer)
+    db.flush()
+    skill = Skill(name="Robotics", description="Backfill test", created_by=volunteer.id)
+    db.add(skill)
+    db.flush()
+    youtube_ids = PRIVATE + FLAKY + [f"v{n:010d}" for n in range(videos - len(PRIVATE) - len(FLAKY))]
+    db.execute(insert(Video), [
+        {
+            "skill_id": skill.id, "title": youtube_id, "created_by": volunteer.id, "youtube_id": youtube_id,
+            "youtube_url": f"https://www.youtube.com/watch?v={youtube_id}",
+        }
+        for youtube_id in youtube_ids
+    ])
+    db.commit()
+    db.close()
+
+
+def run(args: argparse.Namespace) -> int:
+    from app.db.database import SessionLocal
+    from app.videos import enrichment
+    from app.videos.models import VideoMetadata
+
+    seed(args.videos)
+    started = time.monotonic()
+    try:
+        totals = enrichment.backfill()
+    finally:
+        enrichment.metadata_client.close()
+    elapsed = time.monotonic() - started
+
+    times = sorted(StandIn.times)
+    peak = max(bisect.bisect_left(times, moment + 1.0) - index for index, moment in enumerate(times))
+    db = SessionLocal()
+    statuses = dict(db.query(VideoMetadata.youtube_id, VideoMetadata.status).all())
+    left = enrichment.due_youtube_ids(db, "", 10)
+    db.close()
+
+    print(
+        f"{args.videos} videos in {elapsed:.1f}s ({args.videos / elapsed:.0f}/s, cap {args.rate:.0f}/s), "
+        f"{len(times)} requests, busiest second {peak}, outcomes {totals}"
+    )
+    checks = {
+        "private videos cached as unavailable": all(statuses.get(i) == "unavailable" for i in PRIVATE),
+        "503s retried until the fetch succeeded": all(
+            statuses.get(i) == "ok" and StandIn.requests_by_id.get(i) == 3 for i in FLAKY
+        ),
+        "every video cached, none left due": len(statuses) == args.videos and not left,
+        "busiest second within 15% of the cap": peak <= args.rate * 1.15,
+    }
+    for name, passed in checks.items():
+        print(f"  {'ok  ' if passed else 'FAIL'} {name}")
+    return 0 if all(checks.values()) else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=100.0, help="VIDEO_METADATA_RATE_PER_SECOND")
+    parser.add_argument("--concurrency", type=int, default=16, help="VIDEO_METADATA_CONCURRENCY")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stand-in server seconds per request")
+    args = parser.parse_args()
+
+    StandIn.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix="bench-enrichment-")
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        VIDEO_OEMBED_URL=f"http://127.0.0.1:{server.server_address[1]}/oembed",
+        VIDEO_METADATA_RATE_PER_SECOND=str(args.rate),
+        VIDEO_METADATA_CONCURRENCY=str(args.concurrency),
+    )
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        import app.main  # noqa: F401  (maps every model)
+        return run(args)
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Export memory check: stream a million synthetic enrollments and fail if
+peak RSS grows past a fixed budget.
+
+Runs against a throwaway SQLite database, so it needs nothing but the
+backend requirements:
+
+    python scripts/bench_exports.py [--rows 1000000] [--rss-budget-mb 64] [--format csv]
+
+Exits non-zero when the export is short or RSS grew past the budget.
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--rss-budget-mb", type=float, default=64.0)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-exports-")
+    try:
+        return run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args: argparse.Namespace, workdir: str) -> int:
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    from sqlalchemy import text
+    from app.db.database import Base, engine
+    import app.main  # noqa: F401  (maps every model)
+    from app.exports.services import ExportService
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO session_enrollments (student_id, session_id, starts_at, ends_at, enrolled_at) "
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows) "
+            "SELECT x, x, '2024-01-01 10:00:00', '2024-01-01 11:00:00', '2024-01-01 00:00:00' FROM n"
+        ), {"rows": args.rows})
+
+    # ru_maxrss is in KiB on Linux
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    lines = 0
+    for chunk in ExportService("enrollments").stream(args.format):
+        lines += chunk.count("\n")
+    elapsed = time.perf_counter() - started
+    growth_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+
+    expected = args.rows + (1 if args.format == "csv" else 0)
+    print(f"{lines} lines in {elapsed:.1f}s, peak RSS growth {growth_mb:.1f} MB (budget {args.rss_budget_mb} MB)")
+    if lines != expected:
+        print(f"FAIL: expected {expected} lines")
+        return 1
+    if growth_mb > args.rss_budget_mb:
+        print("FAIL: RSS budget exceeded")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
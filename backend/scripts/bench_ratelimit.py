@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Rate limiter overhead benchmark and backend checks.
+
+Measures the middleware's cost per request against a no-op inner app,
+then checks token bucket, sliding window and the per-IP ceiling for
+user-keyed policies on the in-memory backend and, when ``fakeredis`` is
+installed, on the Redis backend (``fakeredis.FakeAsyncRedis``):
+
+    python scripts/bench_ratelimit.py [--calls 200000]
+
+Exits non-zero when a check fails.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jose import jwt  # noqa: E402
+from app.core.ratelimit import MemoryBackend, RateLimiter, RateLimitMiddleware, RedisBackend, parse_policies  # noqa: E402
+
+POLICIES = (
+    "POST /register=1000000000/minute:token:ip;"
+    "POST /enroll=1000000000/minute:sliding:user;"
+    "POST /bucket=3/second:token:user;"
+    "POST /window=3/second:sliding:ip"
+)
+
+
+def bearer(subject: str) -> bytes:
+    return b"Bearer " + jwt.encode({"sub": subject}, "unused", algorithm="HS256").encode()
+
+
+def scope(method: str, path: str, subject: str = "user_1", ip: str = "10.0.0.1") -> dict:
+    return {
+        "type": "http", "method": method, "path": path, "client": (ip, 1),
+        "headers": [(b"host", b"bench"), (b"authorization", bearer(subject)), (b"accept", b"*/*")],
+    }
+
+
+async def noop(scope, receive, send):
+    pass
+
+
+async def per_call(app, request_scope: dict, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        await app(request_scope, None, None)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def overhead(calls: int) -> None:
+    middleware = RateLimitMiddleware(noop, RateLimiter(parse_policies(POLICIES)))
+    for label, request_scope in (
+        ("unmatched route", scope("GET", "/skills")),
+        ("token bucket, ip key", scope("POST", "/register")),
+        ("sliding window, user", scope("POST", "/enroll")),
+    ):
+        cost = await per_call(middleware, request_scope, calls) - await per_call(noop, request_scope, calls)
+        print(f"  {label:22s} {cost:.2f} us")
+
+
+async def resolve(value):
+    return await value if asyncio.iscoroutine(value) or hasattr(value, "__await__") else value
+
+
+async def checks(backend, label: str) -> bool:
+    limiter = RateLimiter(parse_policies(POLICIES), backend=backend, ip_ceiling_factor=2)
+    bucket, window = limiter.match("POST", "/bucket"), limiter.match("POST", "/window")
+    results = {}
+
+    user = scope("POST", "/bucket", subject="alice", ip="10.0.0.2")
+    hits = [await resolve(limiter.check(bucket, user, now=100.0)) for _ in range(5)]
+    results["token bucket allows the burst, then refuses"] = [h == 0 for h in hits] == [True] * 3 + [False] * 2
+    results["token bucket refills"] = await resolve(limiter.check(bucket, user, now=100.4)) == 0
+
+    anonymous = scope("POST", "/window", ip="10.0.0.3")
+    hits = [await resolve(limiter.check(window, anonymous, now=200.1)) for _ in range(4)]
+    results["sliding window caps a window"] = [h == 0 for h in hits] == [True] * 3 + [False]
+    results["sliding window frees up later"] = await resolve(limiter.check(window, anonymous, now=202.5)) == 0
+
+    # Rotating forged subjects from one IP: a fresh user bucket each time, but a shared IP ceiling
+    forged = [
+        await resolve(limiter.check(bucket, scope("POST", "/bucket", subject=f"bot{n}", ip="10.0.0.4"), now=300.0))
+        for n in range(10)
+    ]
+    results["forged subjects stop at the IP ceiling"] = sum(h == 0 for h in forged) == 3 * 2
+
+    print(f"  {label}:")
+    for name, passed in results.items():
+        print(f"    {'ok  ' if passed else 'FAIL'} {name}")
+    return all(results.values())
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"Middleware overhead ({args.calls} calls each):")
+    await overhead(args.calls)
+    print("Backend checks:")
+    passed = await checks(MemoryBackend(), "memory")
+    try:
+        import fakeredis
+    except ImportError:
+        print("  redis: skipped (pip install fakeredis)")
+    else:
+        passed = await checks(RedisBackend(fakeredis.FakeAsyncRedis()), "redis (fakeredis)") and passed
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
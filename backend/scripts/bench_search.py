@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Full-text search latency: index a synthetic corpus and time random queries.
+
+Indexes ``--documents`` documents (split evenly between skills, sessions
+and videos; four-word titles, thirty-word descriptions drawn from a
+50,000-word vocabulary), then times ``--queries`` random one- and
+two-term searches through ``SearchIndex.search`` and prints p50/p95/p99:
+
+    python scripts/bench_search.py [--documents 100000] [--queries 500] [--max-p95-ms 50]
+
+Without ``DATABASE_URL`` it runs against a throwaway SQLite database
+(FTS5). With ``DATABASE_URL`` set it measures that database's backend,
+e.g. the Postgres tsvector/GIN index; the database must already be
+migrated (``alembic upgrade head``). Synthetic documents use reference
+ids far above real ones and are removed afterwards. Exits non-zero when
+p95 exceeds ``--max-p95-ms``.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+KIND_NAMES = ("skill", "session", "video")
+# Synthetic documents are indexed under ids no real row will reach
+FIRST_REF_ID = 1_000_000_000
+BATCH_SIZE = 1000
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"] + ["an", "el", "in", "or", "us"]
+
+
+def vocabulary(rng: random.Random, size: int):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def document(rng: random.Random, words, kind: str, ref_id: int) -> SimpleNamespace:
+    title = " ".join(rng.choices(words, k=4))
+    return SimpleNamespace(
+        id=ref_id, name=title, title=title, status="scheduled",
+        description=" ".join(rng.choices(words, k=30))
+    )
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def run(args: argparse.Namespace) -> int:
+    from sqlalchemy import text
+    from app.db.database import Base, SessionLocal, engine
+    import app.main  # noqa: F401  (maps every model)
+    from app.search.services import SearchIndex, ensure_sqlite_index
+
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        Base.metadata.create_all(engine)
+        ensure_sqlite_index(engine)
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng, 50_000)
+    ref_ids = {kind: [] for kind in KIND_NAMES}
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        index = SearchIndex(db)
+        for first in range(0, args.documents, BATCH_SIZE):
+            batch = {kind: [] for kind in KIND_NAMES}
+            for number in range(first, min(first + BATCH_SIZE, args.documents)):
+                kind = KIND_NAMES[number % len(KIND_NAMES)]
+                batch[kind].append(document(rng, words, kind, FIRST_REF_ID + number))
+            for kind, documents in batch.items():
+                index.index_many(kind, documents)
+                ref_ids[kind].extend(doc.id for doc in documents)
+            db.commit()
+        print(f"[{dialect}] indexed {args.documents} documents in {time.perf_counter() - started:.1f}s")
+        if dialect == "postgresql":
+            # Fresh statistics and an empty GIN pending list, as a settled index would have
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(text("VACUUM ANALYZE search_documents"))
+
+        queries = [" ".join(rng.choices(words, k=rng.choice([1, 2]))) for _ in range(args.queries)]
+        for query in queries[:20]:
+            index.search(query, limit=20)
+        latencies, hits = [], 0
+        for query in queries:
+            started = time.perf_counter()
+            hits += len(index.search(query, limit=20))
+            latencies.append(time.perf_counter() - started)
+        db.commit()
+    finally:
+        db.rollback()
+        for kind, ids in ref_ids.items():
+            for first in range(0, len(ids), BATCH_SIZE):
+                SearchIndex(db).remove_many(kind, ids[first:first + BATCH_SIZE])
+        db.commit()
+        db.close()
+
+    p95 = percentile(latencies, .95)
+    print(
+        f"  {args.queries} queries, {hits / args.queries:.1f} hits each: p50 {percentile(latencies, .5):.2f} ms  "
+        f"p95 {p95:.2f} ms  p99 {percentile(latencies, .99):.2f} ms"
+    )
+    if p95 > args.max_p95_ms:
+        print(f"FAIL: p95 above {args.max_p95_ms} ms")
+        return 1
+    print("OK")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--max-p95-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    workdir = None
+    if not os.environ.get("DATABASE_URL"):
+        workdir = tempfile.mkdtemp(prefix="bench-search-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    try:
+        return run(args)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())